@@ -0,0 +1,501 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Dict, Callable
+from numpy import typing as tp
+from time import perf_counter
+from datetime import datetime, timezone
+
+import numpy as np
+import platform
+import json
+import sys
+
+from main import GameLogic, AIPlayer, BoardStateData
+from positions import load_positions
+from cascades import read_corpus
+
+
+# Times the engine, the AI and the board codec on the same seeded positions every run,
+# so a change that slows down one of them shows up as a number instead of a feeling.
+#
+# Usage:
+#   python benchmarks.py --output=baseline.json
+#   python benchmarks.py --baseline=baseline.json  # exits with 1 if anything got slower than the tolerance
+#
+# Every position is a random board with counts 0 to 3 (and empty tiles) owned at random, made from the seed,
+# so the same seed gives the same positions on any machine. Timings are the best of --repeats runs.
+# --position-file=FILE uses the positions in a position file or text file of positions instead.
+# --corpus=FILE also times the worst case chain reactions cascades.py found, each with its own move.
+# The AI is timed next to the per-tile heuristic it replaced on the first --per-tile-positions positions (0 skips it),
+# ai_turn_speedup and ai_live_turn_speedup are how many times faster AIPlayer's turns are than that one's.
+
+
+DEFAULT_SIZES: List[Tuple[int, int]] = [(5, 5), (26, 9), (100, 100)]
+# 26x9 is the biggest board ConsoleDisplay can show (26 rows, 9 coloumns), 100x100 is headless only
+
+DEFAULT_PER_TILE_POSITIONS: int = 5
+# The per-tile heuristic checks every tile against a list of pieces, a 100x100 turn takes it seconds
+
+COMPARED_METRICS: List[str] = [
+    'moves_per_second',
+    'cascade_ms_mean',
+    'wave_ms_mean',
+    'ai_turn_ms_p50',
+    'ai_turn_ms_p90',
+    'ai_live_turn_ms_p50',
+    'ai_live_turn_ms_p90',
+    'pack_boards_per_second',
+    'unpack_boards_per_second',
+    'unpack_many_boards_per_second',
+    'encode_boards_per_second',
+    'decode_boards_per_second',
+]
+# The metrics that get checked against a baseline
+# p99s are still written out but with a hundred positions they're close to the slowest single call, which is mostly noise
+# Anything else in the results (like how many cascades there were) is just there to explain the numbers
+
+
+def _is_timing(name: str) -> bool:
+    return name.endswith('_per_second') or ('_ms' in name)
+
+
+def _higher_is_better(name: str) -> bool:
+    return name.endswith('_per_second')
+
+
+class PerTileAIPlayer:
+    """
+        AIPlayer's heuristic as it was before the markers worked on whole grids, one tile at a time on lists.
+        Kept to time AIPlayer against (see bench_per_tile_ai) and for tests/test_ai_scoring.py to check it against.
+    """
+
+    def __init__(self, board: List[List[int]], pieces: List[Tuple[int, int]]) -> None:
+        self.board: List[List[int]] = board
+        self.pieces: List[Tuple[int, int]] = pieces
+        self.rows: int = len(board)
+        self.coloumns: int = len(board[0])
+        self.points_board: List[List[int]] = [[0 if (i, j) in pieces else -30 for j in range(self.coloumns)] for i in range(self.rows)]
+
+    def _neighbours(self, x: int, y: int) -> List[Tuple[int, int]]:
+        return [(a, b) for a, b in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)) if (0 <= a < self.rows) and (0 <= b < self.coloumns)]
+
+    def _corners(self, x: int, y: int) -> List[Tuple[int, int]]:
+        return [(a, b) for a, b in ((x - 1, y - 1), (x - 1, y + 1), (x + 1, y - 1), (x + 1, y + 1))
+                if (0 <= a < self.rows) and (0 <= b < self.coloumns)]
+
+    def _on_edge_marker(self, point: Tuple[int, int]) -> int:
+        return int(point[0] in (0, self.rows - 1)) + int(point[1] in (0, self.coloumns - 1))
+
+    def _has_three_neighbouring_bonus(self, point: Tuple[int, int], tile: int) -> int:
+        if tile != 3:
+            return 0
+        return sum(1 for a, b in self._neighbours(*point) if (self.board[a][b] == 3) and ((a, b) not in self.pieces))
+
+    def _has_three_neighbouring_penalty(self, point: Tuple[int, int], tile: int) -> int:
+        if tile == 3:
+            return 0
+        return int(any(self.board[a][b] == 3 for a, b in self._neighbours(*point)))
+
+    def _qualifies_for_corner(self, point: Tuple[int, int]) -> bool:
+        # The old check compared the tile's count to the list of pieces, which is never in it,
+        # so in the end it only asked for a neighbour that isn't a 1
+        return any((self.board[a][b] not in self.pieces) and (self.board[a][b] != 1) for a, b in self._neighbours(*point))
+
+    def _corner_marks(self, point: Tuple[int, int]) -> int:
+        return sum(max(0, self.board[a][b] - 1) for a, b in self._corners(*point) if (a, b) not in self.pieces)
+
+    def _can_make_corner_full(self, point: Tuple[int, int], tile: int) -> int:
+        if (tile == 3) or not self._qualifies_for_corner(point):
+            return 0
+        return self._corner_marks(point)
+
+    def _can_make_corner_burst(self, point: Tuple[int, int], tile: int) -> int:
+        if tile != 3:
+            return 0
+        return self._corner_marks(point)
+
+    def assign_scores(self) -> None:
+        for x, y in self.pieces:
+            tile: int = self.board[x][y]
+            current_score: int = self.points_board[x][y]
+            current_score -= 1 * self._on_edge_marker((x, y))
+            current_score -= 3 * self._has_three_neighbouring_penalty((x, y), tile)
+            current_score += 7 * self._has_three_neighbouring_bonus((x, y), tile)
+            current_score += 1 * self._can_make_corner_full((x, y), tile)
+            current_score -= 1 * self._can_make_corner_burst((x, y), tile)
+            self.points_board[x][y] = current_score
+
+    def decide_move(self) -> Tuple[int, int]:
+        max_score: int = -32
+        best_tiles: List[Tuple[int, int]] = []
+        for total_index in range(self.rows * self.coloumns):
+            x, y = divmod(total_index, self.coloumns)
+            if (x, y) not in self.pieces:
+                continue
+            if self.points_board[x][y] > max_score:
+                max_score = self.points_board[x][y]
+                best_tiles = []
+            if self.points_board[x][y] == max_score:
+                best_tiles.append((x, y))
+        if len(best_tiles) == 1:
+            return best_tiles[0]
+        selection_tiles: List[Tuple[int, int]] = []
+        for best_current_possible_value in [2, 1, 3]:
+            selection_tiles = [tile for tile in best_tiles if self.board[tile[0]][tile[1]] == best_current_possible_value]
+            if len(selection_tiles) != 0:
+                break
+        if len(selection_tiles) == 1:
+            return selection_tiles[0]
+        i_mid: int = self.rows // 2
+        j_mid: int = self.coloumns // 2
+        minimum_distance: int = self.rows + self.coloumns
+        best_tile: Tuple[int, int] = (0, 0)
+        for position in selection_tiles:
+            distance: int = abs(i_mid - position[0]) + abs(j_mid - position[1])
+            if distance < minimum_distance:
+                minimum_distance = distance
+                best_tile = position
+        return best_tile
+
+
+def random_positions(rows: int, coloumns: int, count: int, seed: int) -> List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]]:
+    """
+        count random (board, owners) positions, the same ones every time for the same seed.
+        About a third of the tiles are empty, the rest have 1 to 3 pieces of either player.
+    """
+    rng: np.random.Generator = np.random.default_rng([seed, rows, coloumns])
+    positions: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]] = []
+    for _ in range(count):
+        board: tp.NDArray[np.int8] = np.where(rng.random((rows, coloumns)) < 0.35, 0,
+                                              rng.integers(1, 4, size=(rows, coloumns))).astype(np.int8)
+        owners: tp.NDArray[np.int8] = np.where(board > 0, rng.integers(1, 3, size=(rows, coloumns)), 0).astype(np.int8)
+        # Both players need a piece or the game would already be over
+        owners.flat[0], owners.flat[-1] = 1, 2
+        board.flat[0], board.flat[-1] = max(board.flat[0], 1), max(board.flat[-1], 1)
+        positions.append((board, owners))
+    return positions
+
+
+def file_positions(path: str, count: int) -> List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]]:
+    """
+        The first count positions from a file (see positions.load_positions) that both players have pieces in,
+        since the benchmarks play from every position with white to move.
+    """
+    boards, owners, _, _ = load_positions(path)
+    flat_owners: tp.NDArray[np.int8] = owners.reshape(len(owners), -1)
+    playable: tp.NDArray[np.intp] = np.flatnonzero((flat_owners == 1).any(axis=1) & (flat_owners == 2).any(axis=1)
+                                                   & (flat_owners <= 2).all(axis=1))[:count]
+    return [(boards[index], owners[index]) for index in playable.tolist()]
+
+
+def _percentile_ms(samples: List[float], percentile: float) -> float:
+    return float(np.percentile(samples, percentile)) * 1000
+
+
+def bench_moves(positions: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]], plies: int, seed: int) -> Dict[str, float]:
+    # Random moves from every position with apply_move, chain reactions and all
+    rows, coloumns = positions[0][0].shape
+    rng: np.random.Generator = np.random.default_rng(seed)
+    game: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+    moves: int = 0
+    elapsed: float = 0.0
+    for board, owners in positions:
+        game.load_position(board, owners)
+        for _ in range(plies):
+            mine: tp.NDArray[np.intp] = np.flatnonzero(game.owners == game._current_owner())
+            move: Tuple[int, int] = divmod(int(mine[rng.integers(len(mine))]), coloumns)
+            start: float = perf_counter()
+            winner, _ = game.apply_move(move)
+            elapsed += perf_counter() - start
+            moves += 1
+            if winner != 0:
+                break
+    return {'moves': moves, 'moves_per_second': moves / elapsed}
+
+
+def bench_cascades(positions: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]], seed: int,
+                   moves: List[Tuple[int, int]] | None = None) -> Dict[str, float]:
+    # One move per position on one of the mover's 3s, so it always starts a chain reaction, or the given moves
+    rows, coloumns = positions[0][0].shape
+    rng: np.random.Generator = np.random.default_rng(seed)
+    game: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+    times: List[float] = []
+    waves: int = 0
+    for index, (board, owners) in enumerate(positions):
+        game.load_position(board, owners)
+        threes: tp.NDArray[np.intp] = np.flatnonzero((game.owners == 1) & (game.board == 3))
+        if (len(threes) == 0) and (moves is None):
+            continue
+        move: Tuple[int, int] = moves[index] if moves is not None else divmod(int(threes[rng.integers(len(threes))]), coloumns)
+        start: float = perf_counter()
+        _, explosions = game.apply_move(move)
+        times.append(perf_counter() - start)
+        waves += len(explosions)
+    if times == []:
+        return {'cascades': 0}
+    return {
+        'cascades': len(times),
+        'waves_mean': waves / len(times),
+        'cascade_ms_mean': float(np.mean(times)) * 1000,
+        'cascade_ms_p99': _percentile_ms(times, 99),
+        'wave_ms_mean': sum(times) * 1000 / max(waves, 1),
+    }
+
+
+def bench_ai(positions: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]], seed: int) -> Dict[str, float]:
+    # play_turn scores the whole board from lists every time,
+    # play_live_turn is how AIPlayer plays a game it follows and only rescores around the last move
+    rows, coloumns = positions[0][0].shape
+    rng: np.random.Generator = np.random.default_rng(seed)
+    game: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+    turn_times: List[float] = []
+    live_turn_times: List[float] = []
+    for board, owners in positions:
+        game.load_position(board, owners)
+        ai: AIPlayer = AIPlayer()
+        start: float = perf_counter()
+        ai.play_turn(current_game_board=game.get_board(), ai_pieces=game.get_whites())
+        turn_times.append(perf_counter() - start)
+
+        ai.attach_game(game, 2)
+        whites: tp.NDArray[np.intp] = np.flatnonzero(game.owners == 1)
+        winner, _ = game.apply_move(divmod(int(whites[rng.integers(len(whites))]), coloumns))
+        if winner != 0:
+            continue
+        start = perf_counter()
+        ai.play_live_turn()
+        live_turn_times.append(perf_counter() - start)
+    results: Dict[str, float] = {}
+    for name, samples in (('ai_turn', turn_times), ('ai_live_turn', live_turn_times)):
+        for percentile in (50, 90, 99):
+            results[f'{name}_ms_p{percentile}'] = _percentile_ms(samples, percentile)
+    return results
+
+
+def bench_per_tile_ai(positions: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]]) -> Dict[str, float]:
+    # The same turn as play_turn in bench_ai, scored by the heuristic AIPlayer had before its markers used NumPy
+    turn_times: List[float] = []
+    for board, owners in positions:
+        board_lists: List[List[int]] = board.tolist()
+        whites: List[Tuple[int, int]] = [(i, j) for i, j in np.argwhere(owners == 1).tolist()]
+        start: float = perf_counter()
+        reference: PerTileAIPlayer = PerTileAIPlayer(board_lists, whites)
+        reference.assign_scores()
+        reference.decide_move()
+        turn_times.append(perf_counter() - start)
+    return {f'ai_per_tile_turn_ms_p{percentile}': _percentile_ms(turn_times, percentile) for percentile in (50, 90)}
+
+
+def _boards_per_second(function: Callable, items: List, repeats: int) -> float:
+    # Best of repeats, the codec calls are short enough that one slow run is just noise
+    best: float = float('inf')
+    for _ in range(repeats):
+        start: float = perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, perf_counter() - start)
+    return len(items) / best
+
+
+def bench_codec(positions: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]], repeats: int) -> Dict[str, float]:
+    rows, coloumns = positions[0][0].shape
+    packed: List[bytes] = [BoardStateData.pack(board, owners) for board, owners in positions]
+    results: Dict[str, float] = {
+        'pack_boards_per_second': _boards_per_second(lambda position: BoardStateData.pack(*position), positions, repeats),
+        'unpack_boards_per_second': _boards_per_second(lambda data: BoardStateData.unpack(data, rows, coloumns), packed, repeats),
+    }
+    packed_array: tp.NDArray[np.uint8] = np.frombuffer(b''.join(packed), dtype=np.uint8).reshape(len(packed), -1)
+    results['unpack_many_boards_per_second'] = len(packed) * _boards_per_second(
+        lambda array: BoardStateData.unpack_many(array, rows, coloumns), [packed_array], repeats)
+    if (rows, coloumns) == (5, 5):
+        # The old 10 byte format only fits 5x5
+        data: BoardStateData = BoardStateData()
+        lists: List[Tuple[List[List[int]], List[Tuple[int, int]]]] = [
+            (board.tolist(), [(i, j) for i, j in np.argwhere(owners == 1).tolist()]) for board, owners in positions]
+        encoded: List[bytes] = [data.encode_board(board, whites) for board, whites in lists]
+        results['encode_boards_per_second'] = _boards_per_second(lambda item: data.encode_board(*item), lists, repeats)
+        results['decode_boards_per_second'] = _boards_per_second(data.decode_board, encoded, repeats)
+    return results
+
+
+def _best_of(function: Callable[[], Dict[str, float]], repeats: int) -> Dict[str, float]:
+    # Runs a whole benchmark repeats times on the same positions and keeps the best value of every metric
+    best: Dict[str, float] = {}
+    for _ in range(repeats):
+        for name, value in function().items():
+            if (name not in best) or (not _is_timing(name)):
+                best[name] = value
+            elif _higher_is_better(name):
+                best[name] = max(best[name], value)
+            else:
+                best[name] = min(best[name], value)
+    return best
+
+
+def run_benchmarks(sizes: List[Tuple[int, int]], seed: int, positions_per_size: int, plies: int, repeats: int,
+                   log: Callable[[str], None] = lambda text: None, position_file: str = '', corpus_file: str = '',
+                   per_tile_positions: int = DEFAULT_PER_TILE_POSITIONS) -> Dict:
+    """
+        Runs every benchmark on every board size, returns the results in the same form --output writes them.
+        With a position_file its positions get used instead and sizes is ignored.
+        With a corpus_file its chain reactions get timed too, under 'corpus'.
+        The per-tile heuristic only gets timed once on the first per_tile_positions positions, it's too slow for more.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    loaded: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]] = []
+    if position_file:
+        loaded = file_positions(position_file, positions_per_size)
+        try:
+            assert loaded != []
+        except AssertionError as assertion_error:
+            raise ValueError(f"{position_file} has no positions that both players have pieces in") from assertion_error
+        sizes = [loaded[0][0].shape]
+    for rows, coloumns in sizes:
+        size_name: str = f'{rows}x{coloumns}'
+        positions: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]] = loaded or random_positions(rows, coloumns, positions_per_size, seed)
+        size_results: Dict[str, float] = {}
+        log(f"[#] {size_name}: moves")
+        size_results.update(_best_of(lambda: bench_moves(positions, plies, seed), repeats))
+        log(f"[#] {size_name}: cascades")
+        size_results.update(_best_of(lambda: bench_cascades(positions, seed), repeats))
+        log(f"[#] {size_name}: AI")
+        size_results.update(_best_of(lambda: bench_ai(positions, seed), repeats))
+        if per_tile_positions > 0:
+            log(f"[#] {size_name}: per-tile AI")
+            size_results.update(bench_per_tile_ai(positions[:per_tile_positions]))
+            for name in ('ai_turn', 'ai_live_turn'):
+                size_results[f'{name}_speedup'] = size_results['ai_per_tile_turn_ms_p50'] / size_results[f'{name}_ms_p50']
+        log(f"[#] {size_name}: codec")
+        size_results.update(bench_codec(positions, repeats))
+        results[size_name] = size_results
+    if corpus_file:
+        boards, owners, moves = read_corpus(corpus_file)
+        corpus: List[Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]] = list(zip(boards, owners))
+        corpus_moves: List[Tuple[int, int]] = [(x, y) for x, y in moves.tolist()]
+        log("[#] corpus: cascades")
+        results['corpus'] = _best_of(lambda: bench_cascades(corpus, seed, corpus_moves), repeats)
+    return {
+        'meta': {
+            'seed': seed,
+            'positions': positions_per_size,
+            'position_file': position_file,
+            'corpus_file': corpus_file,
+            'per_tile_positions': per_tile_positions,
+            'plies': plies,
+            'repeats': repeats,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        },
+        'results': results,
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+        Every metric that got worse than the baseline by more than tolerance (0.25 is 25%), as lines to print.
+        Sizes or metrics that only one of them has are skipped.
+    """
+    regressions: List[str] = []
+    for size_name, size_results in results['results'].items():
+        baseline_results: Dict[str, float] = baseline['results'].get(size_name, {})
+        for name in COMPARED_METRICS:
+            if (name not in size_results) or (name not in baseline_results) or (baseline_results[name] <= 0):
+                continue
+            change: float = size_results[name] / baseline_results[name] - 1
+            if (-change if _higher_is_better(name) else change) > tolerance:
+                regressions.append(f"{size_name} {name}: {baseline_results[name]:.4g} -> {size_results[name]:.4g} ({change:+.1%})")
+    return regressions
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    rows, coloumns = text.split('x')
+    return (int(rows), int(coloumns))
+
+
+def main(launch_args: List[str]) -> int:
+    sizes: List[Tuple[int, int]] = DEFAULT_SIZES
+    seed: int = 0
+    positions_per_size: int = 100
+    plies: int = 20
+    repeats: int = 5
+    output_path: str = '-'
+    baseline_path: str = ''
+    tolerance: float = 0.25
+    position_file: str = ''
+    corpus_file: str = ''
+    per_tile_positions: int = DEFAULT_PER_TILE_POSITIONS
+
+    for string in launch_args[1:]:
+        string = string.strip()
+        key, _, value = string.partition('=')
+        key = key.lower()
+        try:
+            match key:
+                case '--sizes':
+                    sizes = [_parse_size(size) for size in value.lower().split(',')]
+                case '--seed':
+                    seed = int(value)
+                case '--positions':
+                    positions_per_size = int(value)
+                case '--plies':
+                    plies = int(value)
+                case '--repeats':
+                    repeats = int(value)
+                case '--output':
+                    output_path = value
+                case '--baseline':
+                    baseline_path = value
+                case '--tolerance':
+                    tolerance = float(value)
+                case '--position-file':
+                    position_file = value
+                case '--corpus':
+                    corpus_file = value
+                case '--per-tile-positions':
+                    per_tile_positions = int(value)
+                case _:
+                    print(f"[#] Unknown option {string}", file=sys.stderr)
+                    return 1
+        except ValueError:
+            print(f"[#] Bad value for {key}: '{value}'", file=sys.stderr)
+            return 1
+
+    baseline: Dict | None = None
+    if baseline_path:
+        try:
+            with open(baseline_path) as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError) as error:
+            print(f"[#] Couldn't read the baseline: {error}", file=sys.stderr)
+            return 1
+
+    try:
+        results: Dict = run_benchmarks(sizes, seed, positions_per_size, plies, repeats,
+                                       log=lambda text: print(text, file=sys.stderr), position_file=position_file,
+                                       corpus_file=corpus_file, per_tile_positions=per_tile_positions)
+    except (OSError, ValueError) as error:
+        print(f"[#] Couldn't load the positions: {error}", file=sys.stderr)
+        return 1
+    if output_path == '-':
+        print(json.dumps(results, indent=4))
+    else:
+        with open(output_path, 'w') as output_file:
+            json.dump(results, output_file, indent=4)
+
+    if baseline is None:
+        return 0
+    if baseline['meta'].get('seed') != seed:
+        print("[#] The baseline was made with a different seed, so the positions aren't the same", file=sys.stderr)
+    regressions: List[str] = compare(results, baseline, tolerance)
+    for line in regressions:
+        print(f"[#] Slower: {line}", file=sys.stderr)
+    if regressions == []:
+        print(f"[#] Nothing got more than {tolerance:.0%} slower than the baseline", file=sys.stderr)
+        return 0
+    return 1
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))
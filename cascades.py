@@ -0,0 +1,336 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Dict, Callable
+from numpy import typing as tp
+from time import perf_counter
+
+import numpy as np
+import re
+import sys
+
+from main import BatchGameLogic, BoardStateData, row_name, parse_coordinates, derive_seed
+from positions import load_positions
+
+
+# Looks for the positions with the longest chain reactions, for stress testing how fast they get resolved.
+# Every candidate is a board and a move for white on one of their 3s. A batch of random candidates gets measured first
+# (that's the random search, and where the distribution of chain reaction lengths comes from), then the best of them
+# get hill climbed: every generation each one gets --mutants copies with a few tiles changed, and keeps the best copy
+# if it's at least as long. The longest ones found are written as a corpus, a text file of positions
+# with the move to play in a comment before each, that benchmarks.py --corpus=FILE times.
+#
+# Usage:
+#   python cascades.py --size=9x9 --generations=300 --output=9x9.cascades
+#   python benchmarks.py --corpus=9x9.cascades
+#
+# --objective picks what "longest" means:
+#   waves (explosion waves, each one is a _spread call and a tick of the console game),
+#   tiles (how many tiles it changed) or explosions (how many pieces exploded, counting every wave)
+# Ties go to the candidate with more explosions, since that's the most work for the engine.
+
+
+OBJECTIVES: List[str] = ['waves', 'tiles', 'explosions']
+
+TILE_STATES: tp.NDArray[np.int8] = np.array([[0, 0], [1, 1], [2, 1], [3, 1], [1, 2], [2, 2], [3, 2]], dtype=np.int8)
+# (count, owner) of every tile a mutation can put down: empty, or 1 to 3 pieces of either player
+
+
+def _finish_candidates(rng: np.random.Generator, boards: tp.NDArray[np.int8], owners: tp.NDArray[np.int8],
+                       moves: tp.NDArray[np.intp]) -> None:
+    # The tile played on is always white's 3 so it starts a chain reaction,
+    # and black needs a piece somewhere or the game would already be over
+    candidates: tp.NDArray[np.intp] = np.arange(len(boards))
+    flat_boards: tp.NDArray[np.int8] = boards.reshape(len(boards), -1)
+    flat_owners: tp.NDArray[np.int8] = owners.reshape(len(owners), -1)
+    flat_boards[candidates, moves] = 3
+    flat_owners[candidates, moves] = 1
+    no_black: tp.NDArray[np.intp] = np.flatnonzero(~(flat_owners == 2).any(axis=1))
+    tiles: tp.NDArray[np.intp] = rng.integers(0, flat_boards.shape[1] - 1, size=no_black.size)
+    tiles += tiles >= moves[no_black]  # Anywhere but the move
+    flat_boards[no_black, tiles] = 1
+    flat_owners[no_black, tiles] = 2
+    return
+
+
+def random_candidates(rng: np.random.Generator, count: int, rows: int,
+                      coloumns: int) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8], tp.NDArray[np.intp]]:
+    """
+        count random candidates as (boards, owners, moves), with every tile state as likely as the others
+        and moves as flat indices (x * coloumns + y).
+    """
+    states: tp.NDArray[np.int8] = TILE_STATES[rng.integers(0, len(TILE_STATES), size=(count, rows, coloumns))]
+    boards: tp.NDArray[np.int8] = np.ascontiguousarray(states[..., 0])
+    owners: tp.NDArray[np.int8] = np.ascontiguousarray(states[..., 1])
+    moves: tp.NDArray[np.intp] = rng.integers(0, rows * coloumns, size=count).astype(np.intp)
+    _finish_candidates(rng, boards, owners, moves)
+    return (boards, owners, moves)
+
+
+def file_candidates(rng: np.random.Generator, path: str,
+                    count: int) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8], tp.NDArray[np.intp]]:
+    """
+        count candidates made from the positions in a file (see positions.load_positions), like ones from real games.
+        Positions with black to move get the colours swapped, and the move is one of the mover's pieces made into a 3.
+        Raises ValueError if none of the positions have both players' pieces on the board.
+    """
+    boards, owners, to_move, first_moves = load_positions(path)
+    flat_owners: tp.NDArray[np.int8] = owners.reshape(len(owners), -1)
+    playable: tp.NDArray[np.intp] = np.flatnonzero((first_moves == 0) & (flat_owners <= 2).all(axis=1)
+                                                   & (flat_owners == 1).any(axis=1) & (flat_owners == 2).any(axis=1))
+    try:
+        assert playable.size > 0
+    except AssertionError as assertion_error:
+        raise ValueError(f"{path} has no two player positions that both players have pieces in") from assertion_error
+    picked: tp.NDArray[np.intp] = playable[rng.permutation(playable.size)[np.arange(count) % playable.size]]
+    boards = boards[picked].copy()
+    owners = owners[picked].copy()
+    black_to_move: tp.NDArray[np.bool_] = to_move[picked] == 2
+    owners[black_to_move] = np.where(owners[black_to_move] > 0, 3 - owners[black_to_move], 0)
+    # A random one of white's pieces, the same way BatchGameLogic.random_moves picks
+    keys: tp.NDArray[np.float64] = np.where(owners.reshape(count, -1) == 1, rng.random((count, boards[0].size)), -1.0)
+    moves: tp.NDArray[np.intp] = np.argmax(keys, axis=1).astype(np.intp)
+    _finish_candidates(rng, boards, owners, moves)
+    return (boards, owners, moves)
+
+
+def mutate(rng: np.random.Generator, boards: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], moves: tp.NDArray[np.intp],
+           max_changes: int = 3) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8], tp.NDArray[np.intp]]:
+    """
+        Copies of the candidates with 1 to max_changes random tiles set to a random state,
+        and one in four of them playing a random other tile instead.
+    """
+    count: int = len(boards)
+    boards = boards.copy()
+    owners = owners.copy()
+    flat_boards: tp.NDArray[np.int8] = boards.reshape(count, -1)
+    flat_owners: tp.NDArray[np.int8] = owners.reshape(count, -1)
+    changes: tp.NDArray[np.int64] = rng.integers(1, max_changes + 1, size=count)
+    for change in range(max_changes):
+        changing: tp.NDArray[np.intp] = np.flatnonzero(changes > change)
+        tiles: tp.NDArray[np.int64] = rng.integers(0, flat_boards.shape[1], size=changing.size)
+        states: tp.NDArray[np.int8] = TILE_STATES[rng.integers(0, len(TILE_STATES), size=changing.size)]
+        flat_boards[changing, tiles] = states[:, 0]
+        flat_owners[changing, tiles] = states[:, 1]
+    moves = np.where(rng.random(count) < 0.25, rng.integers(0, flat_boards.shape[1], size=count), moves).astype(np.intp)
+    _finish_candidates(rng, boards, owners, moves)
+    return (boards, owners, moves)
+
+
+def measure_cascades(boards: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], moves: tp.NDArray[np.intp],
+                     chunk: int = 4096) -> Dict[str, tp.NDArray[np.int64]]:
+    """
+        Plays every candidate's move with BatchGameLogic, chunk of them at a time,
+        and returns how long each chain reaction was by every objective.
+    """
+    count, rows, coloumns = np.shape(boards)
+    lengths: Dict[str, tp.NDArray[np.int64]] = {objective: np.zeros(count, dtype=np.int64) for objective in OBJECTIVES}
+    for start in range(0, count, chunk):
+        end: int = min(start + chunk, count)
+        batch: BatchGameLogic = BatchGameLogic(end - start, rows, coloumns)
+        batch.track_cascades = True
+        batch.load_positions(boards[start:end], owners[start:end], np.ones(end - start, dtype=np.uint8),
+                             np.zeros(end - start, dtype=np.uint8))
+        lengths['waves'][start:end] = batch.apply_moves(np.stack(np.divmod(moves[start:end], coloumns), axis=1))
+        lengths['tiles'][start:end] = batch.cascade_tiles
+        lengths['explosions'][start:end] = batch.cascade_explosions
+    return lengths
+
+
+def _scores(lengths: Dict[str, tp.NDArray[np.int64]], objective: str) -> tp.NDArray[np.int64]:
+    # The objective first, then explosions to break ties
+    return (lengths[objective] << 32) + np.minimum(lengths['explosions'], 2**32 - 1)
+
+
+def hill_climb(boards: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], moves: tp.NDArray[np.intp], objective: str,
+               generations: int, mutants: int, seed: int, max_changes: int = 3,
+               log: Callable[[str], None] = lambda text: None
+               ) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8], tp.NDArray[np.intp], Dict[str, tp.NDArray[np.int64]]]:
+    """
+        Makes the candidates' chain reactions longer by objective, a generation at a time (see the top of the file).
+        Returns the candidates it ended up with and their lengths, same as measure_cascades.
+    """
+    rng: np.random.Generator = np.random.default_rng(seed)
+    count: int = len(boards)
+    lengths: Dict[str, tp.NDArray[np.int64]] = measure_cascades(boards, owners, moves)
+    scores: tp.NDArray[np.int64] = _scores(lengths, objective)
+    for generation in range(1, generations + 1):
+        child_boards, child_owners, child_moves = mutate(rng, np.repeat(boards, mutants, axis=0),
+                                                         np.repeat(owners, mutants, axis=0), np.repeat(moves, mutants), max_changes)
+        child_lengths: Dict[str, tp.NDArray[np.int64]] = measure_cascades(child_boards, child_owners, child_moves)
+        child_scores: tp.NDArray[np.int64] = _scores(child_lengths, objective).reshape(count, mutants)
+        best_children: tp.NDArray[np.intp] = np.arange(count) * mutants + np.argmax(child_scores, axis=1)
+        # Equal ones get taken too so it can wander across flat stretches
+        improved: tp.NDArray[np.intp] = np.flatnonzero(child_scores.max(axis=1) >= scores)
+        boards[improved] = child_boards[best_children[improved]]
+        owners[improved] = child_owners[best_children[improved]]
+        moves[improved] = child_moves[best_children[improved]]
+        for name in OBJECTIVES:
+            lengths[name][improved] = child_lengths[name][best_children[improved]]
+        scores = _scores(lengths, objective)
+        if (generation % 25 == 0) or (generation == generations):
+            log(f"[#] Generation {generation}: longest {lengths[objective].max()} {objective}, "
+                f"mean {lengths[objective].mean():.1f}")
+    return (boards, owners, moves, lengths)
+
+
+def distribution_lines(name: str, values: tp.NDArray[np.int64], bars: int = 12, width: int = 40) -> List[str]:
+    """
+        A short text report of how values are spread: percentiles and a histogram of up to bars bars.
+    """
+    if len(values) == 0:
+        return [f"{name}: nothing"]
+    lines: List[str] = [f"{name}: mean {values.mean():.2f}, p50 {np.percentile(values, 50):.0f}, p90 {np.percentile(values, 90):.0f}, "
+                        f"p99 {np.percentile(values, 99):.0f}, max {values.max()}"]
+    edges: tp.NDArray[np.int64] = np.unique(np.linspace(values.min(), values.max() + 1, bars + 1).astype(np.int64))
+    counts, _ = np.histogram(values, bins=edges)
+    for low, high, bar_count in zip(edges[:-1].tolist(), edges[1:].tolist(), counts.tolist()):
+        label: str = f"{low}" if high - low == 1 else f"{low}-{high - 1}"
+        lines.append(f"    {label:>9} | {'#' * int(np.ceil(width * bar_count / counts.max()))} {bar_count}")
+    return lines
+
+
+def write_corpus(path: str, boards: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], moves: tp.NDArray[np.intp],
+                 lengths: Dict[str, tp.NDArray[np.int64]], objective: str, keep: int) -> int:
+    """
+        Writes the keep longest different candidates by objective, longest first, as text positions
+        with a "# move:" comment before each. Returns how many were written.
+    """
+    count, rows, coloumns = np.shape(boards)
+    # Hill climbing tends to end up with a few copies of the same candidate
+    keys: tp.NDArray = np.concatenate((boards.reshape(count, -1), owners.reshape(count, -1),
+                                       moves.astype(np.int64).view(np.int8).reshape(count, -1)), axis=1)
+    unique: tp.NDArray[np.intp] = np.unique(keys, axis=0, return_index=True)[1]
+    order: tp.NDArray[np.intp] = unique[np.argsort(-_scores(lengths, objective)[unique], kind='stable')][:keep]
+    blocks: List[str] = []
+    for index in order.tolist():
+        x, y = divmod(int(moves[index]), coloumns)
+        blocks.append(f"# move: {row_name(x)}{y + 1} ({lengths['waves'][index]} waves, {lengths['tiles'][index]} tiles, "
+                      f"{lengths['explosions'][index]} explosions)\n" + BoardStateData.to_text(boards[index], owners[index]))
+    with open(path, 'w', encoding='utf-8') as corpus_file:
+        corpus_file.write('\n'.join(blocks))
+    return len(blocks)
+
+
+def read_corpus(path: str) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8], tp.NDArray[np.intp]]:
+    """
+        Reads a corpus from write_corpus back as (boards, owners, moves), moves as (x, y) rows.
+        Raises ValueError if it isn't one.
+    """
+    boards, owners, _, _ = load_positions(path)
+    with open(path, encoding='utf-8') as corpus_file:
+        move_names: List[str] = re.findall(r'^# move: ([A-Z]+[0-9]+)', corpus_file.read(), flags=re.MULTILINE)
+    try:
+        assert (len(move_names) == len(boards)) and (len(boards) > 0)
+    except AssertionError as assertion_error:
+        raise ValueError(f"{path} has {len(boards)} positions and {len(move_names)} moves, it isn't a corpus") from assertion_error
+    rows, coloumns = boards.shape[1:]
+    moves: tp.NDArray[np.intp] = np.array([parse_coordinates(name, rows, coloumns) for name in move_names], dtype=np.intp) - 1
+    try:
+        assert (moves >= 0).all()
+    except AssertionError as assertion_error:
+        raise ValueError(f"{path} has moves that aren't on its {rows}x{coloumns} boards") from assertion_error
+    return (boards, owners, moves)
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    rows, coloumns = text.split('x')
+    return (int(rows), int(coloumns))
+
+
+def main(launch_args: List[str]) -> int:
+    rows: int = 9
+    coloumns: int = 9
+    objective: str = 'waves'
+    samples: int = 4096
+    population: int = 64
+    mutants: int = 16
+    generations: int = 200
+    max_changes: int = 3
+    seed: int = 0
+    start_path: str = ''
+    output_path: str = ''
+    keep: int = 32
+
+    for string in launch_args[1:]:
+        string = string.strip()
+        key, _, value = string.partition('=')
+        key = key.lower()  # Only the option, the value could be a file path
+        try:
+            match key:
+                case '--size':
+                    rows, coloumns = _parse_size(value.lower())
+                case '--objective':
+                    objective = value.lower()
+                case '--samples':
+                    samples = int(value)
+                case '--population':
+                    population = int(value)
+                case '--mutants':
+                    mutants = int(value)
+                case '--generations':
+                    generations = int(value)
+                case '--changes':
+                    max_changes = int(value)
+                case '--seed':
+                    seed = int(value)
+                case '--start':
+                    # Starts from the positions in this file instead of random ones
+                    start_path = value
+                case '--output':
+                    output_path = value
+                case '--keep':
+                    keep = int(value)
+                case _:
+                    print(f"[#] Unknown option {string}", file=sys.stderr)
+                    return 1
+        except ValueError:
+            print(f"[#] Bad value for {key}: '{value}'", file=sys.stderr)
+            return 1
+    if objective not in OBJECTIVES:
+        print(f"[#] Unknown objective '{objective}', pick one of: {', '.join(OBJECTIVES)}", file=sys.stderr)
+        return 1
+    try:
+        assert (rows > 1) and (coloumns > 1) and (min(samples, population, mutants, max_changes) > 0) and (generations >= 0)
+    except AssertionError:
+        print("[#] Boards have to be at least 2x2 and the counts at least 1", file=sys.stderr)
+        return 1
+
+    rng: np.random.Generator = np.random.default_rng(derive_seed(seed, 0))
+    start_time: float = perf_counter()
+    try:
+        if start_path:
+            boards, owners, moves = file_candidates(rng, start_path, samples)
+            rows, coloumns = boards.shape[1:]
+        else:
+            boards, owners, moves = random_candidates(rng, samples, rows, coloumns)
+    except (OSError, ValueError) as error:
+        print(f"[#] {error}", file=sys.stderr)
+        return 1
+    lengths: Dict[str, tp.NDArray[np.int64]] = measure_cascades(boards, owners, moves)
+    print(f"[#] {samples} {'starting' if start_path else 'random'} {rows}x{coloumns} candidates "
+          f"measured in {perf_counter() - start_time:.2f}s", file=sys.stderr)
+    for name in OBJECTIVES:
+        for line in distribution_lines(name, lengths[name]):
+            print(line, file=sys.stderr)
+
+    # The longest of the samples get climbed from
+    best: tp.NDArray[np.intp] = np.argsort(-_scores(lengths, objective), kind='stable')[:population]
+    start_time = perf_counter()
+    boards, owners, moves, lengths = hill_climb(boards[best], owners[best], moves[best], objective, generations, mutants,
+                                                derive_seed(seed, 1), max_changes, log=lambda text: print(text, file=sys.stderr))
+    print(f"[#] {generations} generations of {len(best)} x {mutants} in {perf_counter() - start_time:.2f}s", file=sys.stderr)
+    for line in distribution_lines(f"{objective} after hill climbing", lengths[objective]):
+        print(line, file=sys.stderr)
+
+    if output_path:
+        try:
+            written: int = write_corpus(output_path, boards, owners, moves, lengths, objective, keep)
+        except OSError as error:
+            print(f"[#] {error}", file=sys.stderr)
+            return 1
+        print(f"[#] Wrote the {written} longest to {output_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))
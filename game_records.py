@@ -0,0 +1,200 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Iterator, BinaryIO
+from numpy import typing as tp
+
+import numpy as np
+import struct
+import sys
+
+from main import GameLogic, BoardStateData
+
+
+# A compact log of whole games, so a game can be saved and played back later.
+# A game is stored as just its seed, board size and moves, every position comes from replaying them.
+#
+# File layout:
+#   8 byte file header: b'CLGR', format version (u16), 0 (u16)
+#   then one record per game, back to back:
+#       seed (u64), rows (u16), coloumns (u16), number of moves (u32)
+#       every move as a flat index (x * coloumns + y), u16 if the board has 65536 tiles or less and u32 if not
+# Everything is little endian.
+#
+# Usage:
+#   with GameRecordWriter('games.clgr') as writer:
+#       writer.write(GameRecord(seed, 5, 5, moves))
+#   for record in read_game_records('games.clgr'):
+#       replay = GameReplay(record)
+#       game = replay.position_at(10)
+
+
+FILE_MAGIC: bytes = b'CLGR'
+FORMAT_VERSION: int = 1
+FILE_HEADER: struct.Struct = struct.Struct('<4sHH')
+GAME_HEADER: struct.Struct = struct.Struct('<QHHI')
+
+
+class GameRecord:
+    def __init__(self, seed: int, rows: int, coloumns: int, moves: List[Tuple[int, int]] | None = None) -> None:
+        """
+            A whole game: the seed it was played with, the board size and every move in order.
+        """
+        self.seed: int = seed
+        self.rows: int = rows
+        self.coloumns: int = coloumns
+        self.moves: List[Tuple[int, int]] = [] if moves is None else moves
+
+    def _move_dtype(self) -> str:
+        return '<u2' if self.rows * self.coloumns <= 1 << 16 else '<u4'
+
+    def byte_size(self) -> int:
+        """ How many bytes the game takes up in a file """
+        return GAME_HEADER.size + len(self.moves) * np.dtype(self._move_dtype()).itemsize
+
+    def to_bytes(self) -> bytes:
+        flat_moves: tp.NDArray = np.array([x * self.coloumns + y for x, y in self.moves], dtype=self._move_dtype())
+        return GAME_HEADER.pack(self.seed, self.rows, self.coloumns, len(self.moves)) + flat_moves.tobytes()
+
+
+class GameRecordWriter:
+    """
+        Adds games to the end of a game record file, making it if it isn't there.
+        Every game goes out in a single write, so a crash can only ever cut off the last one.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.games_written: int = 0
+        self._file: BinaryIO = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(FILE_MAGIC, FORMAT_VERSION, 0))
+        else:
+            with open(path, 'rb') as existing_file:
+                _read_file_header(existing_file, path)
+
+    def write(self, record: GameRecord) -> None:
+        self._file.write(record.to_bytes())
+        self.games_written += 1
+        return
+
+    def flush(self) -> None:
+        self._file.flush()
+        return
+
+    def close(self) -> None:
+        self._file.close()
+        return
+
+    def __enter__(self) -> 'GameRecordWriter':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+        return
+
+
+def _read_file_header(game_file: BinaryIO, path: str) -> None:
+    header: bytes = game_file.read(FILE_HEADER.size)
+    try:
+        assert (len(header) == FILE_HEADER.size) and (header[:4] == FILE_MAGIC)
+    except AssertionError as assertion_error:
+        raise ValueError(f"{path} isn't a game record file") from assertion_error
+    _, version, _ = FILE_HEADER.unpack(header)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} is format version {version}, this only reads version {FORMAT_VERSION}")
+    return
+
+
+def read_game_records(path: str, offset: int = 0) -> Iterator[GameRecord]:
+    """
+        Goes through a game record file one game at a time, so only the current game is ever in memory.
+        A game that got cut off at the end of the file is skipped.
+        With an offset it starts from that byte instead of the first game, it has to be where a game starts
+        (FILE_HEADER.size plus the byte_size of every game before it).
+    """
+    with open(path, 'rb') as game_file:
+        _read_file_header(game_file, path)
+        if offset > FILE_HEADER.size:
+            game_file.seek(offset)
+        while True:
+            header: bytes = game_file.read(GAME_HEADER.size)
+            if len(header) < GAME_HEADER.size:
+                return
+            seed, rows, coloumns, move_count = GAME_HEADER.unpack(header)
+            record: GameRecord = GameRecord(seed, rows, coloumns)
+            move_dtype: np.dtype = np.dtype(record._move_dtype())
+            data: bytes = game_file.read(move_count * move_dtype.itemsize)
+            if len(data) < move_count * move_dtype.itemsize:
+                return
+            move_rows, move_coloumns = np.divmod(np.frombuffer(data, dtype=move_dtype), coloumns)
+            record.moves = list(zip(move_rows.tolist(), move_coloumns.tolist()))
+            yield record
+
+
+class GameReplay:
+    """
+        Plays a recorded game back on the headless engine.
+        A snapshot of the position is kept every keyframe_interval plies,
+        so getting to any ply only means replaying from the closest snapshot before it.
+    """
+
+    def __init__(self, record: GameRecord, keyframe_interval: int = 32) -> None:
+        try:
+            assert keyframe_interval > 0
+        except AssertionError as assertion_error:
+            raise ValueError("keyframe_interval has to be at least 1") from assertion_error
+        self.record: GameRecord = record
+        self.keyframe_interval: int = keyframe_interval
+        self.keyframes: List[Tuple[bytes, bool, bool, bool]] = []
+        # (packed tiles, white's turn, white's first move left, black's first move left)
+
+        game: GameLogic = GameLogic(rows=record.rows, coloumns=record.coloumns)
+        self.result: int = 0
+        for ply, move in enumerate(record.moves):
+            if ply % keyframe_interval == 0:
+                self.keyframes.append(self._snapshot(game))
+            self.result, _ = game.apply_move(move)
+
+    def __len__(self) -> int:
+        return len(self.record.moves)
+
+    def position_at(self, ply: int) -> GameLogic:
+        """
+            A new game in the position after the first ply moves (0 is the empty board, len(replay) the end).
+        """
+        try:
+            assert 0 <= ply <= len(self)
+        except AssertionError as assertion_error:
+            raise ValueError(f"Ply {ply} isn't in this game, it has {len(self)}") from assertion_error
+        keyframe: int = min(ply // self.keyframe_interval, len(self.keyframes) - 1) if self.keyframes else 0
+        game: GameLogic = GameLogic(rows=self.record.rows, coloumns=self.record.coloumns)
+        if self.keyframes:
+            packed, white_turn, first_move_white, first_move_black = self.keyframes[keyframe]
+            board, owners = BoardStateData.unpack(packed, self.record.rows, self.record.coloumns)
+            game.load_position(board, owners, white_turn, first_move_white, first_move_black)
+        for move in self.record.moves[keyframe * self.keyframe_interval:ply]:
+            game.apply_move(move)
+        return game
+
+    def _snapshot(self, game: GameLogic) -> Tuple[bytes, bool, bool, bool]:
+        return (game.packed_board(), game.white_turn, game.first_move_white, game.first_move_black)
+
+
+def main(launch_args: List[str]) -> int:
+    # Lists the games in a record file
+    if len(launch_args) != 2:
+        print("[#] Usage: python game_records.py FILE", file=sys.stderr)
+        return 1
+    try:
+        for index, record in enumerate(read_game_records(launch_args[1])):
+            replay: GameReplay = GameReplay(record)
+            print(f"[#] Game {index}: seed {record.seed}, {record.rows}x{record.coloumns}, "
+                  f"{len(replay)} moves, result {replay.result}")
+    except (OSError, ValueError) as error:
+        print(f"[#] {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))
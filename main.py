@@ -1,15 +1,17 @@
 #!/bin/python3.10
 
-from typing import List, Tuple, Callable
+from typing import List, Tuple, Dict, Set, Callable
+from collections import OrderedDict
 from numpy import typing as tp
-from random import getrandbits
-from time import sleep
+from random import Random
+from time import sleep, perf_counter
 
 import numpy as np
+import shutil
+import json
 import sys
 import os
-
-from copy import deepcopy
+import re
 
 try:
     from termcolor import colored  # type: ignore[pyright]
@@ -29,31 +31,140 @@ except ImportError:
 # Thanks for reading my code! https://github.com/FYI-PSA/
 
 
+ZOBRIST_COUNTS: int = 16
+# Counts from here up share a Zobrist key, they can't happen in a normal game anyway
+
+_zobrist_tables: Dict[Tuple[int, int, int], Tuple[tp.NDArray[np.uint64], tp.NDArray[np.uint64]]] = {}
+
+
+def zobrist_keys(rows: int, coloumns: int, players: int = 2) -> Tuple[tp.NDArray[np.uint64], tp.NDArray[np.uint64]]:
+    """
+        Random keys for Zobrist hashing a board of this size:
+            one for every (flat tile index, owner, count), empty tiles get 0 so they don't change the hash
+            and 2 * players - 1 for the turn state: players 2 and up to move, then every player's first move left
+            (for two that's black to move, white's first move left, black's first move left)
+        They come from a fixed seed so every process gets the same hash for the same position.
+    """
+    if (rows, coloumns, players) not in _zobrist_tables:
+        rng: np.random.Generator = np.random.default_rng([rows, coloumns] if players == 2 else [rows, coloumns, players])
+        tile_keys: tp.NDArray[np.uint64] = rng.integers(0, 2**64, size=(rows * coloumns, players + 1, ZOBRIST_COUNTS), dtype=np.uint64)
+        tile_keys[:, 0, 0] = 0
+        state_keys: tp.NDArray[np.uint64] = rng.integers(0, 2**64, size=2 * players - 1, dtype=np.uint64)
+        _zobrist_tables[(rows, coloumns, players)] = (tile_keys, state_keys)
+    return _zobrist_tables[(rows, coloumns, players)]
+
+
+# Streams a game seed gets split into, so every random thing in a game gets its own numbers
+SEED_STREAM_SIDES: int = 0  # which side the AI plays with --ai
+SEED_STREAM_WHITE: int = 1
+SEED_STREAM_BLACK: int = 2
+SEED_STREAM_OPENINGS: int = 3  # the random opening moves in tournament games
+
+
+def derive_seed(seed: int, *stream: int) -> int:
+    """
+        A 64-bit seed for one stream of a seed, like one game of a tournament or one player of a game.
+        Goes through NumPy's SeedSequence, so streams are independent of each other and don't depend on
+        which process or in what order they get asked for: derive_seed(seed, game, SEED_STREAM_WHITE)
+        is the same number on one core or a hundred.
+    """
+    sequence: np.random.SeedSequence = np.random.SeedSequence(seed, spawn_key=stream)
+    return int(sequence.generate_state(1, dtype=np.uint64)[0])
+
+
+class MetricsRegistry:
+    """
+        Counters and value distributions (like how long _spread took or how many pieces a wave exploded)
+        from inside GameLogic and AIPlayer, for finding out where the time goes.
+        Everything is off until enable() is called, and while it's off the instrumented code only checks metrics.enabled.
+        Use the module level one, main.metrics, so the engine and the AI both report to the same place.
+    """
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.counters: Dict[str, int] = {}
+        self.values: Dict[str, List[float]] = {}
+        # [how many, total, smallest, biggest] for every observed name
+        return
+
+    def enable(self) -> None:
+        self.enabled = True
+        return
+
+    def disable(self) -> None:
+        self.enabled = False
+        return
+
+    def reset(self) -> None:
+        self.counters = {}
+        self.values = {}
+        return
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+        return
+
+    def observe(self, name: str, value: float) -> None:
+        stats: List[float] | None = self.values.get(name)
+        if stats is None:
+            self.values[name] = [1, value, value, value]
+            return
+        stats[0] += 1
+        stats[1] += value
+        if value < stats[2]:
+            stats[2] = value
+        if value > stats[3]:
+            stats[3] = value
+        return
+
+    def lap(self, name: str, start: float) -> float:
+        """
+            Observes the milliseconds since start under name and returns the time now, to start the next lap from.
+        """
+        now: float = perf_counter()
+        self.observe(name, (now - start) * 1000)
+        return now
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {
+            'counters': dict(self.counters),
+            'values': {name: {'count': int(count), 'total': total, 'mean': total / count, 'min': smallest, 'max': biggest}
+                       for name, (count, total, smallest, biggest) in self.values.items()},
+        }
+
+    def dump_json(self, path: str) -> None:
+        with open(path, 'w') as metrics_file:
+            json.dump(self.to_dict(), metrics_file, indent=4)
+        return
+
+    def summary(self) -> List[str]:
+        lines: List[str] = [f"{name}: {value}" for name, value in sorted(self.counters.items())]
+        for name, (count, total, smallest, biggest) in sorted(self.values.items()):
+            lines.append(f"{name}: mean {total / count:.4g}, min {smallest:.4g}, max {biggest:.4g} over {int(count)}, total {total:.4g}")
+        return lines
+
+
+metrics: MetricsRegistry = MetricsRegistry()
+
+
 class GameLogic:
-    def __init__(self, rows: int = 5, coloumns: int = 5, board: List[List[int]] = []) -> None:
+    def __init__(self, rows: int = 5, coloumns: int = 5, board: List[List[int]] | tp.NDArray | str = []) -> None:
         self.rows: int = rows
         self.coloumns: int = coloumns
         self.has_custom_board: bool = False
-        # Not sure what to do with this
-        # Unfortunately it's currently unimplemented
-        # I don't want this in the game until someone asks
-        # For the pieces I could make 1-4 be white and 5-8 be black
-        _boardNumpyArray = tp.NDArray = np.array(board)
-        if  (
-                _boardNumpyArray.dtype != 'object'
-                and
-                np.shape(_boardNumpyArray) == (coloumns, rows)
-                and
-                all((all(isinstance(item, int) for item in row)) for row in board)
-            ):
-
-            self.board: List[List[int]] = board
-            self.has_custom_board = True
-        else:
-            self.board: List[List[int]] = [[0]*coloumns for _ in range(rows)]
+        # A starting board other than the empty one can be given, see load_board
+        self.board: tp.NDArray[np.int8] = np.zeros((rows, coloumns), dtype=np.int8)
 
         self.board_size: Tuple[int, int] = (self.rows, self.coloumns)
 
+        self.players: int = 2
+        # MultiPlayerGameLogic has more
+        self.owners: tp.NDArray[np.int8] = np.zeros(np.shape(self.board), dtype=np.int8)
+        # Who owns each tile, same numbers as check_gameover uses:
+        # 0 for nobody, 1 for white, 2 for black
+        self.piece_counts: List[int] = [self.rows * self.coloumns, 0, 0]
+        # How many tiles each owner has, indexed the same way
+
         self.first_move_white: bool = True
         self.first_move_black: bool = True
 
@@ -67,18 +178,86 @@ class GameLogic:
         self.four_pieces: List[Tuple[int, int]] = []
         # A list of all pieces that have reached 4
 
-        self.white_pieces: List[Tuple[int, int]] = []
-        self.black_pieces: List[Tuple[int, int]] = []
+        self._cascade_waves: int = 0
+        # Waves in the chain reaction going on right now, only counted while metrics are enabled
+
+        self.change_log: List[tp.NDArray[np.intp]] = []
+        # The tiles every move and explosion wave changed, in order, as flat indices (x * coloumns + y)
+        # so anything following the game (like AIPlayer.attach_game) can catch up on just those
+        self.change_log_start: int = 0
+        # How many entries have been dropped off the front of change_log since every reader was past them.
+        # Positions in the log given to and taken by changes_since and trim_change_log count those too
+        self._change_readers: Dict[int, int] = {}
+        # Every reader of the log and the position it has read up to, see add_change_reader
+        self._next_change_reader: int = 0
+
+        self._undo_journal: List[Tuple[tp.NDArray[np.intp], tp.NDArray[np.int8], tp.NDArray[np.int8]]] | None = None
+        # While make_move is running this keeps what the changed tiles were before, see make_move
+
+        self.cascade_cache: CascadeCache | None = None
+        # If set, moves that start a chain reaction look up how it ends instead of running every wave
+
+        self._zobrist_tile_keys, self._zobrist_state_keys = zobrist_keys(*np.shape(self.board), self.players)
+        self.zobrist_hash: int = self._hash_tiles(np.arange(self.board.size))
+        # The Zobrist hash of just the tiles, kept up to date as they change. See position_hash for the full one
 
         try:
             assert (self.rows > 1) and (self.coloumns > 1)
         except AssertionError as assertion_error:
             raise ValueError("The game board must at least be 2x2") from assertion_error
 
+        if len(board) > 0:
+            self.load_board(board)
+        return
+
+    def load_board(self, board: List[List[int]] | tp.NDArray | str) -> None:
+        """
+            Starts the game from a custom board instead of the empty one.
+            Args:
+                board:
+                    A rows x coloumns grid of tile codes, 0 for an empty tile, 1-4 for a white piece of that count
+                    and 5-8 for a black piece of 1-4 (the old 5x5 format's digits),
+                    or a position in BoardStateData's text format (which can also say whose turn it is)
+            Anyone with pieces on the board has had their first move, white moves first unless the text says otherwise.
+            Raises:
+                ValueError if it isn't one of those or isn't this game's size
+        """
+        if isinstance(board, str):
+            boards, owners, to_move = BoardStateData.from_text(board)
+            try:
+                assert len(boards) == 1
+            except AssertionError as assertion_error:
+                raise ValueError(f"Expected one position, the text has {len(boards)}") from assertion_error
+            counts: tp.NDArray[np.int8] = boards[0]
+            tile_owners: tp.NDArray[np.int8] = owners[0]
+            player_to_move: int = int(to_move[0])
+        else:
+            codes: tp.NDArray = np.asarray(board)
+            try:
+                assert (codes.dtype.kind in 'iu') and (codes.min(initial=0) >= 0) and (codes.max(initial=0) <= 8)
+            except AssertionError as assertion_error:
+                raise ValueError("A board grid has to be whole numbers from 0 to 8") from assertion_error
+            counts, tile_owners = BoardStateData._from_tile_codes(codes, 4)
+            player_to_move: int = 1
+        try:
+            assert np.shape(counts) == (self.rows, self.coloumns)
+        except AssertionError as assertion_error:
+            raise ValueError(f"The board is {'x'.join(map(str, np.shape(counts)))}, the game is {self.rows}x{self.coloumns}") from assertion_error
+        try:
+            assert 1 <= player_to_move <= self.players
+        except AssertionError as assertion_error:
+            raise ValueError(f"Player {player_to_move} can't move in a {self.players} player game") from assertion_error
+        self._load_start(counts, tile_owners, player_to_move)
+        self.has_custom_board = True
+        return
+
+    def _load_start(self, board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], player_to_move: int) -> None:
+        # load_position with the first moves worked out from who has pieces
+        self.load_position(board, owners, player_to_move == 1, not (owners == 1).any(), not (owners == 2).any())
         return
 
     def get_board(self) -> List[List[int]]:
-        return self.board
+        return self.board.tolist()
 
     def get_board_size(self) -> Tuple[int, int]:
         return self.board_size
@@ -93,10 +272,36 @@ class GameLogic:
         return self.white_turn
 
     def get_whites(self) -> List[Tuple[int, int]]:
-        return self.white_pieces
+        return self._get_pieces_of(1)
 
     def get_blacks(self) -> List[Tuple[int, int]]:
-        return self.black_pieces
+        return self._get_pieces_of(2)
+
+    def _get_pieces_of(self, owner: int) -> List[Tuple[int, int]]:
+        """
+            Builds the list of pieces for an owner (1 white, 2 black) from the ownership grid.
+            Pieces come out in row by row order.
+        """
+        return [(r, c) for r, c in np.argwhere(self.owners == owner).tolist()]
+
+    def get_owner(self, position: Tuple[int, int]) -> int:
+        """ Returns 0 for an empty tile, 1 for white's and 2 for black's """
+        return int(self.owners[position[0], position[1]])
+
+    def get_piece_count(self, owner: int) -> int:
+        return self.piece_counts[owner]
+
+    def _current_owner(self) -> int:
+        return 1 if self.white_turn else 2
+
+    def _set_owner(self, position: Tuple[int, int], owner: int) -> None:
+        previous_owner: int = int(self.owners[position[0], position[1]])
+        if previous_owner == owner:
+            return
+        self.piece_counts[previous_owner] -= 1
+        self.piece_counts[owner] += 1
+        self.owners[position[0], position[1]] = owner
+        return
 
     def is_valid_move(self, position: Tuple[int, int]) -> bool:
         """
@@ -109,144 +314,698 @@ class GameLogic:
             Returns:
                 True/False for if it's a valid move
         """
-        is_first_move: bool = True
-        if self.white_turn:
-            is_first_move = self.first_move_white
-        else:
-            is_first_move = self.first_move_black
-        selected_piece: int = self.board[position[0]][position[1]]
-        if is_first_move:
+        selected_piece: int = self.board[position[0], position[1]]
+        if self._has_first_move():
             if selected_piece == 0:
                 return True
             return False
 
-        if self.white_turn:
-            return position in self.white_pieces
-        else:
-            return position in self.black_pieces
+        return self.owners[position[0], position[1]] == self._current_owner()
 
-    def do_valid_move(self, get_input_method: Callable) -> None:
+    def do_valid_move(self, get_input_method: Callable) -> Tuple[int, int] | None:
         # get_input_method needs to accept a parameter
         # that shows if it's the first time asking or second time
+        # The console game paces the ticks itself, this just does one step
+        # Returns the move that was played, or None if it was an explosion tick
         if self.next_autotick:
-            self._spread()
-            sleep(0.5)
-            if self.four_pieces == []:
-                self.next_autotick = False
-                self.white_turn = not self.white_turn
-            return
+            self.autotick()
+            return None
         pos: Tuple[int, int] = get_input_method(0)
         while not self.is_valid_move(pos):
             pos = get_input_method(1)
+        if metrics.enabled:
+            metrics.count('moves')
         self._do_move(pos)
+        return pos
+
+    def apply_move(self, position: Tuple[int, int]) -> Tuple[int, List[List[Tuple[int, int]]]]:
+        """
+            Plays a move and resolves its whole chain reaction straight away.
+            Nothing here waits or asks for input, so it can run as fast as the CPU allows.
+            Args:
+                position:
+                    A tuple of (x, y), same as is_valid_move
+            Returns:
+                The result of check_gameover after the move,
+                and the explosion events: one list of exploded pieces for every wave
+            Raises:
+                ValueError if the move isn't valid or the last chain reaction wasn't finished
+        """
+        if self.next_autotick:
+            raise ValueError("The last chain reaction hasn't been resolved yet")
+        if not self.is_valid_move(position):
+            raise ValueError(f"{position} isn't a valid move for {self.get_turn_word()}")
+        if metrics.enabled and (self._undo_journal is None):
+            metrics.count('moves')  # Moves a search tries out with make_move aren't moves of the game
+        if (self.cascade_cache is not None) and self._starts_cascade(position):
+            return self._apply_cached_move(position)
+        self._do_move(position)
+        explosions: List[List[Tuple[int, int]]] = self.resolve_cascade()
+        return (self.check_gameover(), explosions)
+
+    def _starts_cascade(self, position: Tuple[int, int]) -> bool:
+        if self.first_move_white or self.first_move_black:
+            return False
+        return self.board[position[0], position[1]] == 3
+
+    def _apply_cached_move(self, position: Tuple[int, int]) -> Tuple[int, List[List[Tuple[int, int]]]]:
+        # The whole chain reaction only depends on the tiles, who's moving and where,
+        # so once it's been worked out it can be put down as a single change
+        cache: CascadeCache = self.cascade_cache  # type: ignore[assignment]
+        key: bytes = cache.make_key(self, position)
+        outcome: Tuple | None = cache.get(key)
+        if outcome is None:
+            change_log_length: int = len(self.change_log)
+            self._do_move(position)
+            explosions: List[List[Tuple[int, int]]] = self.resolve_cascade()
+            tiles: tp.NDArray[np.intp] = np.unique(np.concatenate(self.change_log[change_log_length:]))
+            turn_passed: bool = not self.next_autotick
+            # It only stops with pieces left to explode if someone won halfway through
+            # Kept as tuples so nothing a caller does to the explosions it got back can change the cached ones
+            cache.put(key, (tiles, self.board.flat[tiles], self.owners.flat[tiles],
+                            tuple(self.four_pieces), turn_passed, tuple(tuple(wave) for wave in explosions)))
+            return (self.check_gameover(), explosions)
+
+        tiles, counts, owners, four_pieces, turn_passed, explosions = outcome
+        self._begin_change(tiles)
+        self.board.flat[tiles] = counts
+        self.owners.flat[tiles] = owners
+        self._end_change(tiles)
+        self.piece_counts = np.bincount(self.owners.ravel(), minlength=self.players + 1).tolist()
+        self.four_pieces = list(four_pieces)
+        self.next_autotick = not turn_passed
+        if turn_passed:
+            self._pass_turn()
+        return (self.check_gameover(), [list(wave) for wave in explosions])
+
+    def make_move(self, position: Tuple[int, int]) -> Tuple[Tuple, List[Tuple[tp.NDArray[np.intp], tp.NDArray[np.int8], tp.NDArray[np.int8]]]]:
+        """
+            Same as apply_move, but remembers only the tiles that changed
+            so unmake_move can take the move back without the board ever being copied.
+            Returns the undo record to give to unmake_move.
+            Moves have to be taken back in the reverse order they were made.
+        """
+        saved_state: Tuple = (self._turn_state(), self.next_autotick, list(self.four_pieces), list(self.piece_counts), self.change_log_end(), self.zobrist_hash)
+        journal: List[Tuple[tp.NDArray[np.intp], tp.NDArray[np.int8], tp.NDArray[np.int8]]] = []
+        self._undo_journal = journal
+        try:
+            self.apply_move(position)
+        finally:
+            self._undo_journal = None
+        return (saved_state, journal)
+
+    def unmake_move(self, undo_record: Tuple[Tuple, List[Tuple[tp.NDArray[np.intp], tp.NDArray[np.int8], tp.NDArray[np.int8]]]]) -> None:
+        saved_state, journal = undo_record
+        for tiles, counts, owners in reversed(journal):
+            self.board.flat[tiles] = counts
+            self.owners.flat[tiles] = owners
+        turn_state, self.next_autotick, self.four_pieces, self.piece_counts, change_log_end, self.zobrist_hash = saved_state
+        self._restore_turn_state(turn_state)
+        del self.change_log[change_log_end - self.change_log_start:]
+        self._cascade_waves = 0  # A chain reaction that got taken back doesn't carry on into the next one
+        return
+
+    def change_log_end(self) -> int:
+        """ The position in the change log right after its last entry """
+        return self.change_log_start + len(self.change_log)
+
+    def changes_since(self, position: int) -> List[tp.NDArray[np.intp]]:
+        """
+            The change_log entries from position (an earlier change_log_end()) on.
+            Raises ValueError if they've already been trimmed off.
+        """
+        try:
+            assert position >= self.change_log_start
+        except AssertionError as assertion_error:
+            raise ValueError(f"Change {position} was trimmed off the log, it starts at {self.change_log_start}") from assertion_error
+        return self.change_log[position - self.change_log_start:]
+
+    def add_change_reader(self) -> int:
+        """
+            Signs up something that follows the change log, starting from the end of it.
+            Returns the reader's number for trim_change_log and remove_change_reader.
+            While there are readers, entries get dropped once all of them have read past them,
+            without any readers nothing is ever dropped.
+        """
+        reader: int = self._next_change_reader
+        self._next_change_reader += 1
+        self._change_readers[reader] = self.change_log_end()
+        return reader
+
+    def trim_change_log(self, reader: int, upto: int) -> None:
+        """
+            Says reader is done with every entry before position upto,
+            and drops the ones every reader is done with so a long game's log doesn't keep growing.
+        """
+        self._change_readers[reader] = upto
+        drop: int = min(self._change_readers.values()) - self.change_log_start
+        if drop > 0:
+            del self.change_log[:drop]
+            self.change_log_start += drop
+        return
+
+    def remove_change_reader(self, reader: int) -> None:
+        self._change_readers.pop(reader, None)
+        return
+
+    def load_position(self, board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8],
+                      white_turn: bool = True, first_move_white: bool = False, first_move_black: bool = False) -> None:
+        """
+            Puts the game in the given position, with every tile changed at once.
+            Anything over 3 will explode on the next autotick, same as in a normal game.
+        """
+        self._load_tiles(board, owners)
+        self.white_turn = white_turn
+        self.first_move_white = first_move_white
+        self.first_move_black = first_move_black
+        return
+
+    def _load_tiles(self, board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8]) -> None:
+        try:
+            assert (np.shape(board) == self.board.shape) and (np.shape(owners) == self.board.shape)
+        except AssertionError as assertion_error:
+            raise ValueError(f"The position has to be {self.rows}x{self.coloumns}") from assertion_error
+        try:
+            assert (np.min(owners) >= 0) and (np.max(owners) <= self.players)
+        except AssertionError as assertion_error:
+            raise ValueError(f"Tiles can only be owned by 0 (nobody) to {self.players}") from assertion_error
+        tiles: tp.NDArray[np.intp] = np.arange(self.board.size)
+        self._begin_change(tiles)
+        self.board[:] = board
+        self.owners[:] = owners
+        self._end_change(tiles)
+        self.piece_counts = np.bincount(self.owners.ravel(), minlength=self.players + 1).tolist()
+        self.four_pieces = [(r, c) for r, c in np.argwhere(self.board >= 4).tolist()]
+        self.next_autotick = self.four_pieces != []
+        return
+
+    def packed_board(self) -> bytes:
+        """
+            The tiles in BoardStateData's packed format, half a byte per tile.
+        """
+        return BoardStateData.pack(self.board, self.owners)
+
+    def position_hash(self) -> int:
+        """
+            Zobrist hash of the whole position (tiles, whose turn it is and who still has their first move),
+            the same position always gets the same number however it was reached.
+        """
+        position_hash: int = self.zobrist_hash
+        if not self.white_turn:
+            position_hash ^= int(self._zobrist_state_keys[0])
+        if self.first_move_white:
+            position_hash ^= int(self._zobrist_state_keys[1])
+        if self.first_move_black:
+            position_hash ^= int(self._zobrist_state_keys[2])
+        return position_hash
+
+    def _hash_tiles(self, tiles: tp.NDArray[np.intp]) -> int:
+        counts: tp.NDArray[np.int8] = np.minimum(self.board.flat[tiles], ZOBRIST_COUNTS - 1)
+        return int(np.bitwise_xor.reduce(self._zobrist_tile_keys[tiles, self.owners.flat[tiles], counts]))
+
+    def _begin_change(self, tiles: tp.NDArray[np.intp]) -> None:
+        # Has to be called right before the tiles change, and _end_change right after
+        self.change_log.append(tiles)
+        if self._undo_journal is not None:
+            self._undo_journal.append((tiles, self.board.flat[tiles], self.owners.flat[tiles]))
+        self.zobrist_hash ^= self._hash_tiles(tiles)  # Takes out the old keys
+        return
+
+    def _end_change(self, tiles: tp.NDArray[np.intp]) -> None:
+        self.zobrist_hash ^= self._hash_tiles(tiles)  # Puts in the new keys
         return
 
     def _do_move(self, position: Tuple[int, int]) -> None:
+        tile: tp.NDArray[np.intp] = np.array([position[0] * self.coloumns + position[1]], dtype=np.intp)
+        self._begin_change(tile)
+        value: int = 3
+        if not self._place_first_move(position):
+            value = self._add_to(position)
+        self._end_change(tile)
+        # If it needs to collapse to other pieces
+        # then it shouldn't change turns until that is finished
+        if value >= 4:
+            return
+
+        self._pass_turn()
+        return
+
+    # The turn order is kept behind these few methods so MultiPlayerGameLogic only has to swap them out
+
+    def _has_first_move(self) -> bool:
+        # If the player to move still has their first move
+        if self.white_turn:
+            return self.first_move_white
+        return self.first_move_black
+
+    def _place_first_move(self, position: Tuple[int, int]) -> bool:
+        # Puts down a first move, returns False if there are none left to place
         if self.first_move_white:
-            self.board[position[0]][position[1]] = 3
-            self.white_pieces.append(position)
+            self.board[position[0], position[1]] = 3
+            self._set_owner(position, 1)
             self.first_move_white = False
         elif self.first_move_black:
-            self.board[position[0]][position[1]] = 3
-            self.black_pieces.append(position)
+            self.board[position[0], position[1]] = 3
+            self._set_owner(position, 2)
             self.first_move_black = False
         else:
-            if self._add_to(position) >= 4:
-                return
-            # If it needs to collapse to other pieces
-            # then it shouldn't change turns until that is finished
+            return False
+        return True
 
+    def _pass_turn(self) -> None:
         self.white_turn = not self.white_turn  # Toggles between True and False
         return
 
+    def _turn_state(self) -> Tuple:
+        return (self.white_turn, self.first_move_white, self.first_move_black)
+
+    def _restore_turn_state(self, turn_state: Tuple) -> None:
+        self.white_turn, self.first_move_white, self.first_move_black = turn_state
+        return
+
     def _add_to(self, position: Tuple[int, int]) -> int:
-        self.board[position[0]][position[1]] += 1
-        value: int = self.board[position[0]][position[1]]
+        self.board[position[0], position[1]] += 1
+        value: int = int(self.board[position[0], position[1]])
         if value >= 4:
             self.next_autotick = True
             self.four_pieces.append(position)
         return value
 
-    def _spread(self) -> None:
-        # +1 c   + 1
-        # -1 r   + 1
-        # + 1 r  + 1
-        # - 1 c  + 1
+    def _spread(self) -> List[Tuple[int, int]]:
+        # Every piece that has reached 4 explodes at the same time as one wave:
+        #   it goes back to 0 and adds 1 to each of its neighbours (up, down, left, right)
+        #   and all those neighbours become the current player's pieces
 
         # Side note:
         # Based on my references, even if a piece is 3 and has 2 others collapse into it,
         # it can at most turn into a four and explode like normal
 
-        current_four_pieces: List[Tuple[int, int]] = deepcopy(self.four_pieces)
-        for piece in current_four_pieces:
-            r: int = piece[0]  # row
-            c: int = piece[1]  # coloumn
-            self.board[r][c] = 0
-            self.four_pieces.remove(piece)
-            if self.white_turn:
-                try:
-                    self.white_pieces.remove(piece)
-                except ValueError:
-                    pass
-            else:
-                try:
-                    self.black_pieces.remove(piece)
-                except ValueError:
-                    pass
-
-            # up
-            r_2: int = r - 1
-            c_2: int = c
-            if not (r_2 < 0 or r_2 >= self.rows):
-                self._handle_spread_adding((r_2, c_2))
-
-            # down
-            r_1: int = r + 1
-            c_1: int = c
-            if not (r_1 < 0 or r_1 >= self.rows):
-                self._handle_spread_adding((r_1, c_1))
-
-            # left
-            r_3: int = r
-            c_3: int = c - 1
-            if not (c_3 < 0 or c_3 >= self.coloumns):
-                self._handle_spread_adding((r_3, c_3))
-
-            # right
-            r_4: int = r
-            c_4: int = c + 1
-            if not (c_4 < 0 or c_4 >= self.coloumns):
-                self._handle_spread_adding((r_4, c_4))
-
-        return
-
-    def _handle_spread_adding(self, position: Tuple[int, int]):
-        self._add_to(position=position)
-        if self.white_turn:
-            if (position in self.black_pieces):
-                self.black_pieces.remove(position)
-            if (position not in self.white_pieces):
-                self.white_pieces.append(position)
-        else:
-            if (position in self.white_pieces):
-                self.white_pieces.remove(position)
-            if (position not in self.black_pieces):
-                self.black_pieces.append(position)
+        timing: bool = metrics.enabled and (self._undo_journal is None)
+        # Waves a search tries out with make_move aren't the game's, same as the 'moves' counter in apply_move
+        start: float = perf_counter() if timing else 0.0
+        mover: int = self._current_owner()
+        exploding: tp.NDArray[np.bool_] = self.board >= 4
+        exploded: List[Tuple[int, int]] = [(r, c) for r, c in np.argwhere(exploding).tolist()]
+
+        # The neighbour contributions are just the exploding mask shifted one tile in each direction
+        incoming: tp.NDArray[np.int8] = np.zeros_like(self.board)
+        incoming[1:, :] += exploding[:-1, :]  # down
+        incoming[:-1, :] += exploding[1:, :]  # up
+        incoming[:, 1:] += exploding[:, :-1]  # right
+        incoming[:, :-1] += exploding[:, 1:]  # left
+        changed_tiles: tp.NDArray[np.intp] = np.flatnonzero(exploding | (incoming > 0))
+        self._begin_change(changed_tiles)
+
+        adding_start: float = perf_counter() if timing else 0.0
+        self.board[exploding] = 0
+        self.owners[exploding & (self.owners == mover)] = 0
+        self.board += incoming
+        self.owners[incoming > 0] = mover
+        if timing:
+            metrics.lap('spread_adding_ms', adding_start)
+        self._end_change(changed_tiles)
+
+        self.piece_counts = np.bincount(self.owners.ravel(), minlength=self.players + 1).tolist()
+        self.four_pieces = [(r, c) for r, c in np.argwhere(self.board >= 4).tolist()]
+        if timing:
+            metrics.lap('spread_ms', start)
+            metrics.observe('explosions_per_wave', len(exploded))
+            metrics.observe('tiles_changed_per_wave', len(changed_tiles))
+            metrics.observe('four_pieces_per_wave', len(self.four_pieces))
+            self._cascade_waves += 1
+        return exploded
+
+    def _finish_autotick(self) -> None:
+        # Once nothing is left to explode the turn goes to the other player
+        if self.four_pieces == []:
+            self.next_autotick = False
+            self._pass_turn()
+            self._observe_cascade_waves()
+        return
+
+    def _observe_cascade_waves(self) -> None:
+        if metrics.enabled and (self._cascade_waves > 0):
+            metrics.observe('cascade_waves', self._cascade_waves)
+        self._cascade_waves = 0
         return
 
+    def autotick(self) -> List[Tuple[int, int]]:
+        """
+            Resolves a single explosion wave, returns the pieces that exploded in it.
+        """
+        exploded: List[Tuple[int, int]] = self._spread()
+        self._finish_autotick()
+        return exploded
+
+    def resolve_cascade(self, max_waves: int = -1) -> List[List[Tuple[int, int]]]:
+        """
+            Runs explosion waves until nothing is left to explode or the game is over,
+            without any of the pauses between ticks.
+            max_waves stops it early if it's not negative.
+            Returns the pieces that exploded, one list for every wave.
+        """
+        waves: List[List[Tuple[int, int]]] = []
+        while self.next_autotick and (len(waves) != max_waves) and (self.check_gameover() == 0):
+            waves.append(self.autotick())
+        if self.check_gameover() != 0:
+            # Someone won halfway through, so the chain reaction ends here even with pieces left to explode
+            self._observe_cascade_waves()
+        return waves
+
     def check_gameover(self) -> int:
-        if (self.white_pieces == [] and (not self.first_move_white)):
+        if (self.piece_counts[1] == 0 and (not self.first_move_white)):
             return 2  # if black won
-        elif (self.black_pieces == [] and (not self.first_move_black)):
+        elif (self.piece_counts[2] == 0 and (not self.first_move_black)):
             return 1  # if white won
         else:
             return 0  # if the game isn't over
 
 
+class MultiPlayerGameLogic(GameLogic):
+    """
+        The "Color Wars" game for more than two players, like the 4 player one on the apps in the README.
+        Players are numbered 1 to players and play in that order, the owner grid and the explosion waves are the same as
+        GameLogic's so a move costs the same however many players there are.
+        A player with no pieces left after their first move is out and gets skipped,
+        the last one left wins. check_gameover returns their number.
+    """
+    PLAYER_NAMES: List[str] = ["Nobody", "White", "Black", "Green", "Yellow"]
+
+    def __init__(self, rows: int = 5, coloumns: int = 5, players: int = 4, board: List[List[int]] = []) -> None:
+        try:
+            assert players >= 2
+        except AssertionError as assertion_error:
+            raise ValueError("There have to be at least 2 players") from assertion_error
+        super().__init__(rows=rows, coloumns=coloumns)
+        self.players = players
+        self.piece_counts = np.bincount(self.owners.ravel(), minlength=players + 1).tolist()
+        self._zobrist_tile_keys, self._zobrist_state_keys = zobrist_keys(rows, coloumns, players)
+        self.zobrist_hash = self._hash_tiles(np.arange(self.board.size))
+
+        self.turn: int = 1
+        # The player to move, used instead of white_turn
+        self.first_moves: List[bool] = [False] + [True] * players
+        # If each player still has their first move, indexed by player (0 is nobody)
+        # These two replace white_turn, first_move_white and first_move_black, which aren't kept up to date here
+        if len(board) > 0:
+            self.load_board(board)
+        return
+
+    def get_turn(self) -> int:
+        return self.turn
+
+    def get_turn_word(self) -> str:
+        if self.turn < len(self.PLAYER_NAMES):
+            return self.PLAYER_NAMES[self.turn]
+        return f"Player {self.turn}"
+
+    def get_white_turn(self) -> bool:
+        return self.turn == 1
+
+    def is_out(self, player: int) -> bool:
+        """ Returns True once a player has lost every piece they had """
+        return (not self.first_moves[player]) and (self.piece_counts[player] == 0)
+
+    def get_players_left(self) -> List[int]:
+        return [player for player in range(1, self.players + 1) if not self.is_out(player)]
+
+    def _current_owner(self) -> int:
+        return self.turn
+
+    def _has_first_move(self) -> bool:
+        return self.first_moves[self.turn]
+
+    def _place_first_move(self, position: Tuple[int, int]) -> bool:
+        if not self.first_moves[self.turn]:
+            return False
+        self.board[position[0], position[1]] = 3
+        self._set_owner(position, self.turn)
+        self.first_moves[self.turn] = False
+        return True
+
+    def _pass_turn(self) -> None:
+        # Goes round to the next player that's still in, if nobody else is the turn stays put
+        for step in range(1, self.players):
+            player: int = (self.turn + step - 1) % self.players + 1
+            if not self.is_out(player):
+                self.turn = player
+                return
+        return
+
+    def _turn_state(self) -> Tuple:
+        return (self.turn, list(self.first_moves))
+
+    def _restore_turn_state(self, turn_state: Tuple) -> None:
+        self.turn, first_moves = turn_state
+        self.first_moves = list(first_moves)
+        return
+
+    def _load_start(self, board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], player_to_move: int) -> None:
+        self.load_position(board, owners, player_to_move, [not (owners == player).any() for player in range(1, self.players + 1)])
+        return
+
+    def _starts_cascade(self, position: Tuple[int, int]) -> bool:
+        if any(self.first_moves):
+            return False
+        return self.board[position[0], position[1]] == 3
+
+    def load_position(self, board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8],  # type: ignore[override]
+                      turn: int = 1, first_moves: List[bool] | None = None) -> None:
+        """
+            Same as GameLogic.load_position, first_moves has one flag for every player starting with player 1.
+            Nobody has a first move left if it's not given.
+        """
+        if first_moves is None:
+            first_moves = [False] * self.players
+        try:
+            assert (1 <= turn <= self.players) and (len(first_moves) == self.players)
+        except AssertionError as assertion_error:
+            raise ValueError(f"The turn has to be a player from 1 to {self.players} with a first move flag for each") from assertion_error
+        self._load_tiles(board, owners)
+        self.turn = turn
+        self.first_moves = [False] + [bool(first_move) for first_move in first_moves]
+        return
+
+    def packed_board(self) -> bytes:
+        """
+            BoardStateData's half bytes only have room for two owners,
+            so here every tile is a byte with the owner in the top half and the count in the bottom half.
+        """
+        return ((self.owners.astype(np.uint8) << 4) | np.minimum(self.board, 15).astype(np.uint8)).tobytes()
+
+    def position_hash(self) -> int:
+        position_hash: int = self.zobrist_hash
+        if self.turn != 1:
+            position_hash ^= int(self._zobrist_state_keys[self.turn - 2])
+        for player in range(1, self.players + 1):
+            if self.first_moves[player]:
+                position_hash ^= int(self._zobrist_state_keys[self.players + player - 2])
+        return position_hash
+
+    def check_gameover(self) -> int:
+        if any(self.first_moves):
+            return 0  # Nobody can lose a piece until everyone's had their first move
+        players_left: List[int] = self.get_players_left()
+        if len(players_left) == 1:
+            return players_left[0]
+        return 0
+
+
+class BatchGameLogic:
+    """
+        Plays many games of the same board size at once, for generating self-play data.
+        All the boards live in one (games, rows, coloumns) tensor of counts and one of owners,
+        and every move and explosion wave is done for all of them together with NumPy.
+        The rules are the same as GameLogic's.
+    """
+
+    def __init__(self, games: int, rows: int = 5, coloumns: int = 5) -> None:
+        try:
+            assert (rows > 1) and (coloumns > 1)
+        except AssertionError as assertion_error:
+            raise ValueError("The game board must at least be 2x2") from assertion_error
+        self.games: int = games
+        self.rows: int = rows
+        self.coloumns: int = coloumns
+        self.boards: tp.NDArray[np.int8] = np.zeros((games, rows, coloumns), dtype=np.int8)
+        self.owners: tp.NDArray[np.int8] = np.zeros((games, rows, coloumns), dtype=np.int8)
+        # Same owner numbers as GameLogic: 0 for nobody, 1 for white, 2 for black
+        self.white_turn: tp.NDArray[np.bool_] = np.ones(games, dtype=np.bool_)
+        self.first_move_white: tp.NDArray[np.bool_] = np.ones(games, dtype=np.bool_)
+        self.first_move_black: tp.NDArray[np.bool_] = np.ones(games, dtype=np.bool_)
+        self._game_indices: tp.NDArray[np.intp] = np.arange(games)
+
+        self.track_cascades: bool = False
+        # If set, apply_moves also fills in these two for the move it just played (cascades.py uses them):
+        self.cascade_explosions: tp.NDArray[np.int64] = np.zeros(games, dtype=np.int64)
+        # how many pieces exploded over the whole chain reaction, counting a tile again every wave it explodes in
+        self.cascade_tiles: tp.NDArray[np.int64] = np.zeros(games, dtype=np.int64)
+        # and how many tiles it changed, the same tiles GameLogic puts in its change_log
+        return
+
+    def _current_owners(self) -> tp.NDArray[np.int8]:
+        return np.where(self.white_turn, 1, 2).astype(np.int8)
+
+    def load_position(self, board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8],
+                      white_turn: bool = True, first_move_white: bool = False, first_move_black: bool = False) -> None:
+        """
+            Puts every game in the same position, like GameLogic.load_position.
+        """
+        self.boards[:] = board
+        self.owners[:] = owners
+        self.white_turn[:] = white_turn
+        self.first_move_white[:] = first_move_white
+        self.first_move_black[:] = first_move_black
+        return
+
+    def load_positions(self, boards: tp.NDArray[np.int8], owners: tp.NDArray[np.int8],
+                       to_move: tp.NDArray[np.uint8], first_moves: tp.NDArray[np.uint8]) -> None:
+        """
+            Puts every game in its own position, all at once. The arguments are one of each for every game,
+            in the same form as a position file's records (see positions.py):
+            to_move is 1 or 2 and bit 0 of first_moves is set if white still has their first move, bit 1 for black.
+        """
+        try:
+            assert (np.shape(boards) == self.boards.shape) and (np.shape(owners) == self.boards.shape)
+            assert (len(to_move) == self.games) and (len(first_moves) == self.games)
+        except AssertionError as assertion_error:
+            raise ValueError(f"Needs {self.games} positions of {self.rows}x{self.coloumns}") from assertion_error
+        try:
+            assert (np.max(owners, initial=0) <= 2) and (np.min(owners, initial=0) >= 0)
+        except AssertionError as assertion_error:
+            raise ValueError("BatchGameLogic only plays two player games") from assertion_error
+        self.boards[:] = boards
+        self.owners[:] = owners
+        self.white_turn[:] = np.asarray(to_move) == 1
+        self.first_move_white[:] = (np.asarray(first_moves) & 1) != 0
+        self.first_move_black[:] = (np.asarray(first_moves) & 2) != 0
+        return
+
+    def check_gameover(self) -> tp.NDArray[np.int8]:
+        """ Same as GameLogic.check_gameover but for every game: 0 still going, 1 white won, 2 black won """
+        white_alive: tp.NDArray[np.bool_] = (self.owners == 1).any(axis=(1, 2))
+        black_alive: tp.NDArray[np.bool_] = (self.owners == 2).any(axis=(1, 2))
+        black_won: tp.NDArray[np.bool_] = (~white_alive) & (~self.first_move_white)
+        white_won: tp.NDArray[np.bool_] = (~black_alive) & (~self.first_move_black) & (~black_won)
+        return (black_won * 2 + white_won).astype(np.int8)
+
+    def legal_moves(self) -> tp.NDArray[np.bool_]:
+        """
+            Returns a (games, rows, coloumns) mask of where the current player of every game can play.
+            Finished games have no legal moves.
+        """
+        first_move: tp.NDArray[np.bool_] = np.where(self.white_turn, self.first_move_white, self.first_move_black)
+        own_pieces: tp.NDArray[np.bool_] = self.owners == self._current_owners()[:, None, None]
+        legal: tp.NDArray[np.bool_] = np.where(first_move[:, None, None], self.boards == 0, own_pieces)
+        legal &= (self.check_gameover() == 0)[:, None, None]
+        return legal
+
+    def random_moves(self, rng: np.random.Generator) -> tp.NDArray[np.intp]:
+        """
+            Picks a random legal move for every game, returns them as a (games, 2) array of (x, y).
+            Finished games get (0, 0) which apply_moves ignores anyway.
+        """
+        legal: tp.NDArray[np.bool_] = self.legal_moves().reshape(self.games, -1)
+        keys: tp.NDArray[np.float64] = np.where(legal, rng.random(legal.shape), -1.0)
+        flat_moves: tp.NDArray[np.intp] = np.argmax(keys, axis=1)
+        return np.stack(np.divmod(flat_moves, self.coloumns), axis=1)
+
+    def apply_moves(self, positions: tp.NDArray[np.intp]) -> tp.NDArray[np.int64]:
+        """
+            Plays one move in every game and resolves all of the chain reactions.
+            Args:
+                positions:
+                    A (games, 2) array of (x, y), same as GameLogic.is_valid_move.
+                    Moves for finished games are ignored.
+            Returns:
+                How many explosion waves each game's move took
+            Raises:
+                ValueError if a move in a game that's still going isn't valid
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        playing: tp.NDArray[np.bool_] = self.check_gameover() == 0
+        x: tp.NDArray[np.intp] = positions[:, 0]
+        y: tp.NDArray[np.intp] = positions[:, 1]
+        if (x < 0).any() or (x >= self.rows).any() or (y < 0).any() or (y >= self.coloumns).any():
+            raise ValueError("Moves have to be on the board")
+
+        movers: tp.NDArray[np.int8] = self._current_owners()
+        first_move: tp.NDArray[np.bool_] = np.where(self.white_turn, self.first_move_white, self.first_move_black)
+        valid: tp.NDArray[np.bool_] = np.where(first_move,
+                                               self.boards[self._game_indices, x, y] == 0,
+                                               self.owners[self._game_indices, x, y] == movers)
+        if (playing & ~valid).any():
+            raise ValueError(f"Invalid moves in games {np.flatnonzero(playing & ~valid).tolist()}")
+
+        placing: tp.NDArray[np.bool_] = playing & first_move
+        adding: tp.NDArray[np.bool_] = playing & ~first_move
+        self.boards[placing, x[placing], y[placing]] = 3
+        self.owners[placing, x[placing], y[placing]] = movers[placing]
+        self.first_move_white &= ~(placing & self.white_turn)
+        self.first_move_black &= ~(placing & ~self.white_turn)
+        self.boards[adding, x[adding], y[adding]] += 1
+
+        # Only the games that are still exploding get pulled out of the tensors for each wave,
+        # so a few long chain reactions don't cost a full pass over every game
+        waves: tp.NDArray[np.int64] = np.zeros(self.games, dtype=np.int64)
+        exploding_games: tp.NDArray[np.intp] = np.flatnonzero(adding & (self.boards[self._game_indices, x, y] >= 4))
+        exploded: tp.NDArray[np.bool_] = np.zeros((exploding_games.size if self.track_cascades else 0, self.rows, self.coloumns), dtype=np.bool_)
+        # Every tile that exploded at some point, only kept for track_cascades. Indexed like the first exploding_games
+        tracked_games: tp.NDArray[np.intp] = np.arange(exploding_games.size)
+        if self.track_cascades:
+            self.cascade_explosions[:] = 0
+            self.cascade_tiles[:] = playing
+        while exploding_games.size > 0:
+            waves[exploding_games] += 1
+            boards: tp.NDArray[np.int8] = self.boards[exploding_games]
+            owners: tp.NDArray[np.int8] = self.owners[exploding_games]
+            game_movers: tp.NDArray[np.int8] = movers[exploding_games][:, None, None]
+            if self.track_cascades:
+                exploding: tp.NDArray[np.bool_] = boards >= 4
+                self.cascade_explosions[exploding_games] += np.count_nonzero(exploding, axis=(1, 2))
+                exploded[tracked_games] |= exploding
+            self._spread(boards, owners, game_movers)
+            self.boards[exploding_games] = boards
+            self.owners[exploding_games] = owners
+            # Only the other player can run out of pieces in a chain reaction
+            still_going: tp.NDArray[np.bool_] = (boards >= 4).any(axis=(1, 2)) & (owners == (3 - game_movers)).any(axis=(1, 2))
+            exploding_games = exploding_games[still_going]
+            tracked_games = tracked_games[still_going]
+
+        if self.track_cascades and (exploded.size > 0):
+            # A wave changes the tiles that explode and their neighbours, so all of them together are every tile
+            # that exploded spread out by one. The tile played on is one of them
+            changed: tp.NDArray[np.bool_] = exploded.copy()
+            changed[:, 1:, :] |= exploded[:, :-1, :]
+            changed[:, :-1, :] |= exploded[:, 1:, :]
+            changed[:, :, 1:] |= exploded[:, :, :-1]
+            changed[:, :, :-1] |= exploded[:, :, 1:]
+            started: tp.NDArray[np.intp] = np.flatnonzero(adding & (waves > 0))
+            self.cascade_tiles[started] = np.count_nonzero(changed, axis=(1, 2))
+
+        # Like GameLogic, a game that ended in the middle of a chain reaction doesn't change turns
+        turn_over: tp.NDArray[np.bool_] = playing & ~(self.boards >= 4).any(axis=(1, 2))
+        self.white_turn ^= turn_over
+        return waves
+
+    @staticmethod
+    def _spread(boards: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], movers: tp.NDArray[np.int8]) -> None:
+        # One explosion wave for every game passed in, same as GameLogic._spread
+        exploding: tp.NDArray[np.bool_] = boards >= 4
+        boards[exploding] = 0
+        owners[exploding & (owners == movers)] = 0
+
+        incoming: tp.NDArray[np.int8] = np.zeros_like(boards)
+        incoming[:, 1:, :] += exploding[:, :-1, :]  # down
+        incoming[:, :-1, :] += exploding[:, 1:, :]  # up
+        incoming[:, :, 1:] += exploding[:, :, :-1]  # right
+        incoming[:, :, :-1] += exploding[:, :, 1:]  # left
+        boards += incoming
+        np.copyto(owners, np.broadcast_to(movers, owners.shape), where=incoming > 0)
+        return
+
+
 class BoardStateData:
-    # TODO:
-    # -- Expand these to work with any NxM grid if N and M are provided
-    #   -- Would let me use this in GameLogic for importing a board
 
     def __init__(self,
                  board: List[List[int]] = [[0]*5 for _ in range(5)],
@@ -276,15 +1035,206 @@ class BoardStateData:
         """
         return (self.game_board, self.white_pieces, self.black_pieces)
 
-    def _base9_to_integer(self, b9number: int) -> int:
-        result: int = 0
-        right_most: int = 0
-        nine_pow: int = 1
-        for _ in range(25):
-            b9number, right_most = divmod(b9number, 10)
-            result += right_most * nine_pow
-            nine_pow *= 9
-        return result
+    # Packed format, for any NxM board:
+    #   every tile is one 4 bit code, two tiles per byte (the first one in the high bits), row by row
+    #   0 is an empty tile, 1-7 a white piece of that count and 8-14 a black piece of count 1-7
+    #   An odd number of tiles leaves the low bits of the last byte as 0
+    # The old 5x5 format is still there as encode_board/decode_board:
+    #   a 25 digit base9 number (0 empty, 1-4 white, 5-8 black) with the top left tile as the lowest digit, in 10 bytes
+
+    BLACK_OFFSET: int = 7
+    MAX_COUNT: int = 7
+    # 3 plus one from every neighbour is as high as a tile can get, even halfway through a chain reaction
+
+    _LEGACY_POWERS: tp.NDArray[np.int64] = 9 ** np.arange(13, dtype=np.int64)
+    # The 25 digits get split into a low 13 and a high 12, so every part fits in an int64
+
+    @staticmethod
+    def pack(board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8]) -> bytes:
+        """
+            Packs a board of counts and its ownership grid (0 nobody, 1 white, 2 black) into ceil(N*M / 2) bytes.
+            Empty tiles have to be owned by nobody, like they are in GameLogic.
+            Raises ValueError if a count doesn't fit in a tile code.
+        """
+        codes: tp.NDArray[np.uint8] = BoardStateData._tile_codes(board, owners, BoardStateData.BLACK_OFFSET, BoardStateData.MAX_COUNT)
+        if codes.size % 2:
+            codes = np.append(codes, np.uint8(0))
+        return ((codes[0::2] << 4) | codes[1::2]).tobytes()
+
+    _NIBBLES: tp.NDArray[np.uint8] = np.array([[byte >> 4, byte & 15] for byte in range(256)], dtype=np.uint8)
+    _CODE_COUNTS: tp.NDArray[np.int8] = np.array([0, 1, 2, 3, 4, 5, 6, 7, 1, 2, 3, 4, 5, 6, 7, 0], dtype=np.int8)
+    _CODE_OWNERS: tp.NDArray[np.int8] = np.array([0, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2, 2, 0], dtype=np.int8)
+    # Lookup tables so unpacking is just three np.take calls
+
+    @staticmethod
+    def unpack(data: bytes, rows: int, coloumns: int) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]:
+        """
+            Takes what pack gave and the board size, returns the board of counts and the ownership grid.
+        """
+        try:
+            assert len(data) == (rows * coloumns + 1) // 2
+        except AssertionError as assertion_error:
+            raise ValueError(f"A packed {rows}x{coloumns} board is {(rows * coloumns + 1) // 2} bytes, not {len(data)}") from assertion_error
+        codes: tp.NDArray[np.uint8] = np.take(BoardStateData._NIBBLES, np.frombuffer(data, dtype=np.uint8), axis=0).ravel()[:rows * coloumns]
+        board: tp.NDArray[np.int8] = np.take(BoardStateData._CODE_COUNTS, codes).reshape(rows, coloumns)
+        owners: tp.NDArray[np.int8] = np.take(BoardStateData._CODE_OWNERS, codes).reshape(rows, coloumns)
+        return (board, owners)
+
+    @staticmethod
+    def unpack_many(packed_boards: tp.NDArray[np.uint8], rows: int, coloumns: int) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]:
+        """
+            Same as unpack, but for a (boards, packed bytes) array of many packed boards at once,
+            returns (boards, rows, coloumns) arrays of counts and owners.
+        """
+        packed_boards = np.asarray(packed_boards, dtype=np.uint8)
+        try:
+            assert (packed_boards.ndim == 2) and (packed_boards.shape[1] == (rows * coloumns + 1) // 2)
+        except AssertionError as assertion_error:
+            raise ValueError(f"Packed {rows}x{coloumns} boards need to be a (boards, {(rows * coloumns + 1) // 2}) array") from assertion_error
+        codes: tp.NDArray[np.uint8] = np.take(BoardStateData._NIBBLES, packed_boards, axis=0).reshape(len(packed_boards), -1)[:, :rows * coloumns]
+        board: tp.NDArray[np.int8] = np.take(BoardStateData._CODE_COUNTS, codes).reshape(-1, rows, coloumns)
+        owners: tp.NDArray[np.int8] = np.take(BoardStateData._CODE_OWNERS, codes).reshape(-1, rows, coloumns)
+        return (board, owners)
+
+    @staticmethod
+    def pack_legacy(board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8]) -> bytes:
+        """
+            Same as pack, but in the old 10 byte format, so only for 5x5 boards with counts up to 4.
+        """
+        try:
+            assert np.shape(board) == (5, 5)
+        except AssertionError as assertion_error:
+            raise ValueError("The 10 byte format only fits 5x5 boards") from assertion_error
+        digits: tp.NDArray[np.int64] = BoardStateData._tile_codes(board, owners, 4, 4).ravel().astype(np.int64)
+        low: int = int(digits[:13] @ BoardStateData._LEGACY_POWERS)
+        high: int = int(digits[13:] @ BoardStateData._LEGACY_POWERS[:12])
+        return (high * 9**13 + low).to_bytes(byteorder='big', length=10)
+
+    @staticmethod
+    def unpack_legacy(board_10bytes: bytes) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]:
+        high, low = divmod(int.from_bytes(board_10bytes, byteorder='big'), 9**13)
+        digits: tp.NDArray[np.int64] = np.empty(25, dtype=np.int64)
+        digits[:13] = (low // BoardStateData._LEGACY_POWERS) % 9
+        digits[13:] = (high // BoardStateData._LEGACY_POWERS[:12]) % 9
+        return BoardStateData._from_tile_codes(digits.reshape(5, 5), 4)
+
+    @staticmethod
+    def _tile_codes(board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], black_offset: int, max_count: int) -> tp.NDArray[np.uint8]:
+        counts: tp.NDArray[np.uint8] = np.asarray(board).astype(np.uint8).ravel()
+        # Negative counts wrap around to 128 and up here, so one max catches both ends
+        try:
+            assert counts.max(initial=0) <= max_count
+        except AssertionError as assertion_error:
+            raise ValueError(f"Counts have to be between 0 and {max_count} to be packed") from assertion_error
+        owner_codes: tp.NDArray[np.uint8] = np.asarray(owners).astype(np.uint8).ravel()
+        # Only white and black fit in the format, owners of 3 and up (or negative ones) would turn into other counts
+        try:
+            assert owner_codes.max(initial=0) <= 2
+        except AssertionError as assertion_error:
+            raise ValueError("Owners have to be 0, 1 or 2 to be packed, there's no room for more players") from assertion_error
+        return counts + (owner_codes >> 1) * np.uint8(black_offset)
+
+    @staticmethod
+    def _from_tile_codes(codes: tp.NDArray, black_offset: int) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]:
+        black: tp.NDArray[np.bool_] = codes > black_offset
+        board: tp.NDArray[np.int8] = (codes - black * black_offset).astype(np.int8)
+        owners: tp.NDArray[np.int8] = (codes > 0).astype(np.int8) + black
+        return (board, owners)
+
+    # Text format, for writing positions by hand:
+    #   every line is a row of tiles split by spaces, '.' for an empty tile
+    #   and the count followed by the owner's letter for a piece (3w is a white 3, 1b a black 1, g and y for players 3 and 4)
+    #   "to move: b" before the rows says whose turn it is, white's if it's left out
+    #   Anything after a # is a comment, a blank line starts the next position
+
+    PLAYER_LETTERS: str = '.wbgy'
+
+    _TEXT_OWNERS: tp.NDArray[np.int8] = np.zeros(256, dtype=np.int8)
+    _TEXT_OWNERS[np.frombuffer(b'wbgyWBGY', dtype=np.uint8)] = [1, 2, 3, 4, 1, 2, 3, 4]
+    # The owner for every character, 0 for anything that isn't a player's letter
+
+    @staticmethod
+    def from_text(text: str) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8], tp.NDArray[np.uint8]]:
+        """
+            Reads every position in a text, returns (boards, owners, to_move):
+            boards and owners are (positions, rows, coloumns) and to_move has the player to move in each.
+            Lines only get sorted into rows, "to move:" and comments one by one,
+            the tiles of every row are read straight from the characters all together.
+            Raises ValueError for anything that isn't in the format or positions that aren't all the same size.
+        """
+        row_lines: List[str] = []
+        row_line_numbers: List[int] = []
+        block_rows: List[int] = []
+        to_move: List[int] = []
+        rows_in_block: int = 0
+        block_to_move: int = 1
+        for line_number, line in enumerate(text.splitlines() + [''], start=1):
+            content: str = line.partition('#')[0].strip()
+            if content == '':
+                if (line.strip() == '') and (rows_in_block > 0):
+                    block_rows.append(rows_in_block)
+                    to_move.append(block_to_move)
+                if line.strip() == '':
+                    rows_in_block, block_to_move = 0, 1
+                continue  # A blank line ends a position, a comment doesn't
+            if content[0] in 'tT':
+                letter: str = content.partition(':')[2].strip().lower()
+                try:
+                    assert content.lower().startswith('to move:') and (rows_in_block == 0)
+                    assert (len(letter) == 1) and (letter in BoardStateData.PLAYER_LETTERS[1:])
+                except AssertionError as assertion_error:
+                    raise ValueError(f"Line {line_number}: 'to move:' needs a player letter and has to come before the rows") from assertion_error
+                block_to_move = BoardStateData.PLAYER_LETTERS.index(letter)
+                continue
+            row_lines.append(content)
+            row_line_numbers.append(line_number)
+            rows_in_block += 1
+
+        # Every tile is '.' or one digit and a letter with spaces around it, so where each one ends can be found
+        # by looking at every character and its two neighbours at once
+        characters: tp.NDArray[np.uint8] = np.frombuffer(('\n'.join(row_lines) + '\n').encode('utf-8'), dtype=np.uint8)
+        spaces: tp.NDArray[np.bool_] = (characters == ord(' ')) | (characters == ord('\t')) | (characters == ord('\n'))
+        before_space: tp.NDArray[np.bool_] = np.concatenate(([True], spaces[:-1]))
+        after_space: tp.NDArray[np.bool_] = np.concatenate((spaces[1:], [True]))
+        owner_letters: tp.NDArray[np.int8] = BoardStateData._TEXT_OWNERS[characters]
+        digits: tp.NDArray[np.bool_] = (characters >= ord('1')) & (characters <= ord('0') + BoardStateData.MAX_COUNT)
+        empty_tiles: tp.NDArray[np.bool_] = (characters == ord('.')) & before_space & after_space
+        piece_tiles: tp.NDArray[np.bool_] = (owner_letters > 0) & np.concatenate(([False], digits[:-1])) & after_space
+        counts_of: tp.NDArray[np.bool_] = digits & before_space & np.concatenate((piece_tiles[1:], [False]))
+        line_of: tp.NDArray[np.intp] = np.cumsum(characters == ord('\n')) - (characters == ord('\n'))
+        bad: tp.NDArray[np.intp] = np.flatnonzero(~(spaces | empty_tiles | piece_tiles | counts_of))
+        if bad.size > 0:
+            line_index: int = int(line_of[bad[0]])
+            raise ValueError(f"Line {row_line_numbers[line_index]}: '{row_lines[line_index]}' has a tile that isn't '.' or like '3w'")
+
+        tile_ends: tp.NDArray[np.intp] = np.flatnonzero(empty_tiles | piece_tiles)
+        widths: tp.NDArray[np.int64] = np.bincount(line_of[tile_ends], minlength=len(row_lines))
+        block_starts: tp.NDArray[np.intp] = (np.cumsum(block_rows, dtype=np.intp) - block_rows).astype(np.intp)
+        uneven: tp.NDArray[np.intp] = np.flatnonzero(widths != np.repeat(widths[block_starts], block_rows))
+        if uneven.size > 0:
+            raise ValueError(f"Line {row_line_numbers[uneven[0]]} has {widths[uneven[0]]} tiles, the rows above it don't")
+        shapes: Set[Tuple[int, int]] = set(zip(block_rows, widths[block_starts].tolist()))
+        try:
+            assert len(shapes) <= 1
+        except AssertionError as assertion_error:
+            raise ValueError(f"The positions have to all be the same size, there are {sorted(shapes)}") from assertion_error
+        rows, coloumns = shapes.pop() if len(shapes) > 0 else (0, 0)
+
+        end_characters: tp.NDArray[np.uint8] = characters[tile_ends]
+        shape: Tuple[int, int, int] = (len(block_rows), rows, coloumns)
+        owners: tp.NDArray[np.int8] = BoardStateData._TEXT_OWNERS[end_characters]
+        board: tp.NDArray[np.int8] = np.where(owners > 0, characters[tile_ends - 1].astype(np.int8) - ord('0'), 0).astype(np.int8)
+        return (board.reshape(shape), owners.reshape(shape), np.array(to_move, dtype=np.uint8))
+
+    @staticmethod
+    def to_text(board: tp.NDArray[np.int8], owners: tp.NDArray[np.int8], to_move: int = 1) -> str:
+        """
+            Writes one position in the text format from_text reads.
+        """
+        letters: tp.NDArray = np.array(list(BoardStateData.PLAYER_LETTERS))
+        tiles: tp.NDArray = np.where(np.asarray(board) == 0, '.', np.char.add(np.asarray(board).astype(str), letters[np.asarray(owners)]))
+        lines: List[str] = [f"to move: {BoardStateData.PLAYER_LETTERS[to_move]}"] + [' '.join(row) for row in tiles.tolist()]
+        return '\n'.join(lines) + '\n'
 
     def encode_board(self, board: List[List[int]] | None, white_pieces: List[Tuple[int, int]] | None) -> bytes:
         """
@@ -302,296 +1252,1298 @@ class BoardStateData:
         else:
             data_white: List[Tuple[int, int]] = white_pieces
 
-        number_string: int = 0
-        significance: int = 1
-        for indx in range(25):
-            i: int = indx // 5
-            j: int = indx % 5
-            new_part: int = data_board[i][j]
-            if (new_part > 0) and ((i, j) not in data_white):
-                new_part += 4
-            # no pieces: 0
-            # white pieces: 1-4
-            # black pieces: 5-8
-            new_part *= significance
-            significance *= 10
-            number_string += new_part
-        data: bytes = self._base9_to_integer(number_string).to_bytes(byteorder='big', length=10)
-        return data
+        counts: tp.NDArray[np.int8] = np.array(data_board, dtype=np.int8)
+        owners: tp.NDArray[np.int8] = np.where(counts > 0, 2, 0).astype(np.int8)
+        for i, j in data_white:
+            owners[i, j] = 1
+        return self.pack_legacy(counts, owners)
 
     def decode_board(self, board_10bytes: bytes) -> Tuple[List[List[int]], List[Tuple[int, int]], List[Tuple[int, int]]]:
         """
             Takes a 10 byte long encoded board and returns:
                 The board, White's pieces, Black's pieces
         """
-        board: List[List[int]] = [[0]*5 for _ in range(5)]
-        white_pieces: List[Tuple[int, int]] = []
-        black_pieces: List[Tuple[int, int]] = []
-        encoded_num: int = int.from_bytes(board_10bytes, byteorder='big')
-        data: List[int] = [0]*25
-        for indx in range(25):
-            if encoded_num == 0:
-                continue
-            encoded_num, digit = divmod(encoded_num, 9)
-            data[indx] = digit
-        for indx, digit in enumerate(data):
-            i, j = divmod(indx, 5)
-            if digit > 4:
-                black_pieces.append((i, j))
-                board[i][j] = digit - 4
-            elif digit > 0:
-                white_pieces.append((i, j))
-                board[i][j] = digit
-        return (board, white_pieces, black_pieces)
+        counts, owners = self.unpack_legacy(board_10bytes)
+        white_pieces: List[Tuple[int, int]] = [(i, j) for i, j in np.argwhere(owners == 1).tolist()]
+        black_pieces: List[Tuple[int, int]] = [(i, j) for i, j in np.argwhere(owners == 2).tolist()]
+        return (counts.tolist(), white_pieces, black_pieces)
+
+
+class CascadeCache:
+    """
+        Remembers how chain reactions ended so the same one never has to be run wave by wave twice.
+        It maps the board before a move plus the move to the tiles the chain reaction changed
+        and what they ended up as, and forgets the least recently used ones once it's over size_mb.
+        Give it to a game with game.cascade_cache = CascadeCache(), it can be shared between any number of games.
+    """
+    ENTRY_OVERHEAD: int = 400
+    # Rough bytes for the dict slot, tuple and NumPy headers of an entry, on top of the data itself
+
+    def __init__(self, size_mb: float = 32.0) -> None:
+        self.max_bytes: int = int(size_mb * 1024 * 1024)
+        self.used_bytes: int = 0
+        self.entries: OrderedDict[bytes, Tuple] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        return
+
+    def make_key(self, game: GameLogic, position: Tuple[int, int]) -> bytes:
+        """
+            The board's shape and how many players there are, then the packed board before the move
+            (see BoardStateData.pack) followed by who's moving and the move itself.
+            Without the shape a 2x3 and a 3x2 board pack to the same bytes, and a cache can be shared between sizes.
+        """
+        move: int = position[0] * game.coloumns + position[1]
+        shape: bytes = game.rows.to_bytes(2, byteorder='big') + game.coloumns.to_bytes(2, byteorder='big') + bytes((game.players,))
+        return shape + game.packed_board() + bytes((game._current_owner(),)) + move.to_bytes(4, byteorder='big')
+
+    def get(self, key: bytes) -> Tuple | None:
+        outcome: Tuple | None = self.entries.get(key)
+        if outcome is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return outcome
+
+    def put(self, key: bytes, outcome: Tuple) -> None:
+        if key in self.entries:
+            return
+        size: int = self._entry_size(key, outcome)
+        if size > self.max_bytes:
+            return  # Would push everything else out for one entry
+        self.entries[key] = outcome
+        self.used_bytes += size
+        while self.used_bytes > self.max_bytes:
+            old_key, old_outcome = self.entries.popitem(last=False)
+            self.used_bytes -= self._entry_size(old_key, old_outcome)
+            self.evictions += 1
+        return
+
+    def _entry_size(self, key: bytes, outcome: Tuple) -> int:
+        tiles, counts, owners, four_pieces, _, explosions = outcome
+        exploded: int = sum(len(wave) for wave in explosions) + len(four_pieces)
+        return (self.ENTRY_OVERHEAD + len(key) + tiles.nbytes + counts.nbytes + owners.nbytes
+                + 8 * len(explosions) + 64 * exploded)
+        # Every exploded position is a tuple of two ints, which is about 64 bytes in Python
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.used_bytes = 0
+        return
+
+    def stats(self) -> Dict[str, float]:
+        lookups: int = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'memory_bytes': self.used_bytes,
+        }
+
+
+HASH_MULTIPLIER: int = 0x9E3779B97F4A7C15
+EMPTY_HASH_KEY: int = (1 << 64) - 1
+
+
+def hash_table_slots(keys: tp.NDArray[np.uint64]) -> Tuple[int, tp.NDArray[np.int64]]:
+    """
+        Lays different 64 bit keys out in an open addressing hash table at most half full, for the on-disk tables.
+        Returns how many slots the table has (a power of 2) and the slot every key goes in.
+        A key's first slot is the top bits of key * HASH_MULTIPLIER, lookups go on one slot at a time until
+        they find the key or an EMPTY_HASH_KEY slot.
+    """
+    slot_bits: int = max(1, int(2 * len(keys) - 1).bit_length())
+    slots: int = 1 << slot_bits
+    taken: tp.NDArray[np.bool_] = np.zeros(slots, dtype=np.bool_)
+    key_slots: tp.NDArray[np.int64] = np.zeros(len(keys), dtype=np.int64)
+
+    # Linear probing, done for every key at once: whoever gets to an empty slot first takes it
+    # and the rest move on one slot and try again
+    home: tp.NDArray[np.uint64] = (np.asarray(keys, dtype=np.uint64) * np.uint64(HASH_MULTIPLIER)) >> np.uint64(64 - slot_bits)
+    waiting: tp.NDArray[np.intp] = np.arange(len(keys))
+    slot: tp.NDArray[np.int64] = home.astype(np.int64)
+    while waiting.size > 0:
+        free: tp.NDArray[np.bool_] = ~taken[slot]
+        _, first = np.unique(slot[free], return_index=True)
+        placed: tp.NDArray[np.intp] = np.flatnonzero(free)[first]
+        taken[slot[placed]] = True
+        key_slots[waiting[placed]] = slot[placed]
+        still_waiting: tp.NDArray[np.bool_] = np.ones(waiting.size, dtype=np.bool_)
+        still_waiting[placed] = False
+        waiting = waiting[still_waiting]
+        slot = (slot[still_waiting] + 1) & (slots - 1)
+    return (slots, key_slots)
+
+
+class Tablebase:
+    """
+        A solved table of every position of a small board, made by tablebase.py, read straight from disk with mmap.
+        Values are from the side to move's view: n > 0 wins in n plies, n < 0 loses in -n plies
+        and 0 is a draw (the game can go around in circles forever).
+        Positions are keyed by the packed board (see BoardStateData.pack) read as one big endian number,
+        with whose turn it is and the first move flags above it, and kept in an open addressing hash table
+        so a probe is one or two reads.
+    """
+
+    MAX_TILES: int = 14
+    # 4 bits a tile has to fit under the flags in 64 bits
+    EMPTY_KEY: int = EMPTY_HASH_KEY
+    FLAG_SHIFT: int = 56
+    HEADER_DTYPE: np.dtype = np.dtype([('magic', 'S4'), ('version', '<u4'), ('rows', '<u4'), ('coloumns', '<u4'),
+                                       ('slots', '<u8'), ('positions', '<u8')])
+    MAGIC: bytes = b'CLTB'
+    FORMAT_VERSION: int = 1
+    _HASH_MULTIPLIER: int = HASH_MULTIPLIER
+
+    def __init__(self, path: str) -> None:
+        header: tp.NDArray = np.fromfile(path, dtype=self.HEADER_DTYPE, count=1)
+        try:
+            assert (len(header) == 1) and (header['magic'][0] == self.MAGIC) and (header['version'][0] == self.FORMAT_VERSION)
+        except AssertionError as assertion_error:
+            raise ValueError(f"{path} isn't a version {self.FORMAT_VERSION} tablebase") from assertion_error
+        self.rows: int = int(header['rows'][0])
+        self.coloumns: int = int(header['coloumns'][0])
+        self.slots: int = int(header['slots'][0])
+        self.positions: int = int(header['positions'][0])
+        self._slot_bits: int = self.slots.bit_length() - 1
+        self.keys: tp.NDArray[np.uint64] = np.memmap(path, dtype='<u8', mode='r', offset=self.HEADER_DTYPE.itemsize, shape=(self.slots,))
+        self.values: tp.NDArray[np.int16] = np.memmap(path, dtype='<i2', mode='r',
+                                                      offset=self.HEADER_DTYPE.itemsize + 8 * self.slots, shape=(self.slots,))
+        self.probes: int = 0
+        self.hits: int = 0
+        return
+
+    def covers(self, game: GameLogic) -> bool:
+        return (game.get_board_size() == (self.rows, self.coloumns)) and (game.players == 2)
+
+    def probe(self, game: GameLogic) -> int | None:
+        """
+            The value of the game's current position, or None if it isn't in the table
+            (a finished game, or a position that can't come up from an empty board).
+        """
+        self.probes += 1
+        key: int = self.position_key(game)
+        slot: int = self._slot_of(key)
+        while True:
+            slot_key: int = int(self.keys[slot])
+            if slot_key == key:
+                self.hits += 1
+                return int(self.values[slot])
+            if slot_key == self.EMPTY_KEY:
+                return None
+            slot = (slot + 1) & (self.slots - 1)
+
+    def best_move(self, game: GameLogic) -> Tuple[int, int] | None:
+        """
+            The move the table says is best for the side to move:
+            the fastest win, then a draw, then the slowest loss.
+            None if the game isn't covered or a position is missing from the table.
+        """
+        if (not self.covers(game)) or (game.check_gameover() != 0) or game.next_autotick:
+            return None
+        first_move: bool = game.first_move_white if game.white_turn else game.first_move_black
+        moves: List[Tuple[int, int]] = [(r, c) for r, c in np.argwhere((game.board == 0) if first_move
+                                                                        else (game.owners == game._current_owner())).tolist()]
+        best_move: Tuple[int, int] | None = None
+        best_rank: Tuple[int, int] = (-1, 0)
+        for move in moves:
+            undo_record: Tuple = game.make_move(move)
+            won: bool = game.check_gameover() != 0
+            child_value: int | None = 0 if won else self.probe(game)
+            game.unmake_move(undo_record)
+            if child_value is None:
+                return None
+            # Win soonest, then draw, then lose as late as possible
+            if won:
+                return move
+            elif child_value < 0:
+                rank: Tuple[int, int] = (2, child_value)
+            elif child_value == 0:
+                rank: Tuple[int, int] = (1, 0)
+            else:
+                rank: Tuple[int, int] = (0, child_value)
+            if rank > best_rank:
+                best_rank = rank
+                best_move = move
+        return best_move
+
+    def _slot_of(self, key: int) -> int:
+        return ((key * self._HASH_MULTIPLIER) & self.EMPTY_KEY) >> (64 - self._slot_bits)
+
+    @staticmethod
+    def position_key(game: GameLogic) -> int:
+        flags: int = (not game.white_turn) | (game.first_move_white << 1) | (game.first_move_black << 2)
+        return int.from_bytes(game.packed_board(), byteorder='big') | (flags << Tablebase.FLAG_SHIFT)
+
+    @staticmethod
+    def batch_keys(batch: BatchGameLogic) -> tp.NDArray[np.uint64]:
+        """
+            position_key for every game of a BatchGameLogic at once.
+        """
+        tiles: int = batch.rows * batch.coloumns
+        codes: tp.NDArray[np.uint64] = (batch.boards.reshape(batch.games, tiles).astype(np.uint64)
+                                        + (batch.owners.reshape(batch.games, tiles) >> 1).astype(np.uint64) * np.uint64(BoardStateData.BLACK_OFFSET))
+        shifts: tp.NDArray[np.uint64] = Tablebase._tile_shifts(tiles)
+        keys: tp.NDArray[np.uint64] = np.bitwise_or.reduce(codes << shifts, axis=1)
+        flags: tp.NDArray[np.uint64] = ((~batch.white_turn).astype(np.uint64) | (batch.first_move_white.astype(np.uint64) << np.uint64(1))
+                                        | (batch.first_move_black.astype(np.uint64) << np.uint64(2)))
+        return keys | (flags << np.uint64(Tablebase.FLAG_SHIFT))
+
+    @staticmethod
+    def batch_from_keys(keys: tp.NDArray[np.uint64], rows: int, coloumns: int) -> BatchGameLogic:
+        """
+            A BatchGameLogic with one game set up in every keyed position.
+        """
+        tiles: int = rows * coloumns
+        batch: BatchGameLogic = BatchGameLogic(len(keys), rows, coloumns)
+        codes: tp.NDArray[np.uint64] = (keys[:, None] >> Tablebase._tile_shifts(tiles)) & np.uint64(15)
+        batch.boards[:] = np.take(BoardStateData._CODE_COUNTS, codes).reshape(len(keys), rows, coloumns)
+        batch.owners[:] = np.take(BoardStateData._CODE_OWNERS, codes).reshape(len(keys), rows, coloumns)
+        flags: tp.NDArray[np.uint64] = keys >> np.uint64(Tablebase.FLAG_SHIFT)
+        batch.white_turn[:] = (flags & np.uint64(1)) == 0
+        batch.first_move_white[:] = (flags & np.uint64(2)) != 0
+        batch.first_move_black[:] = (flags & np.uint64(4)) != 0
+        return batch
+
+    @staticmethod
+    def _tile_shifts(tiles: int) -> tp.NDArray[np.uint64]:
+        # The first tile is in the highest bits, like the packed bytes read big endian
+        # An odd number of tiles leaves the lowest 4 bits for the padding
+        try:
+            assert tiles <= Tablebase.MAX_TILES
+        except AssertionError as assertion_error:
+            raise ValueError(f"Tablebases only fit boards of up to {Tablebase.MAX_TILES} tiles") from assertion_error
+        padded: int = tiles + tiles % 2
+        return (np.arange(padded - 1, padded - 1 - tiles, -1, dtype=np.uint64) * np.uint64(4))
+
+    @staticmethod
+    def write(path: str, rows: int, coloumns: int, keys: tp.NDArray[np.uint64], values: tp.NDArray[np.int16]) -> None:
+        """
+            Saves solved positions as a tablebase file, with the hash table at most half full.
+        """
+        slots, key_slots = hash_table_slots(keys)
+        table_keys: tp.NDArray[np.uint64] = np.full(slots, Tablebase.EMPTY_KEY, dtype=np.uint64)
+        table_values: tp.NDArray[np.int16] = np.zeros(slots, dtype=np.int16)
+        table_keys[key_slots] = keys
+        table_values[key_slots] = values
+
+        header: tp.NDArray = np.array([(Tablebase.MAGIC, Tablebase.FORMAT_VERSION, rows, coloumns, slots, len(keys))],
+                                      dtype=Tablebase.HEADER_DTYPE)
+        with open(path, 'wb') as table_file:
+            table_file.write(header.tobytes())
+            table_file.write(table_keys.astype('<u8').tobytes())
+            table_file.write(table_values.astype('<i2').tobytes())
+        return
+
+
+class OpeningBook:
+    """
+        The moves that did best from the positions early games keep coming back to, made by opening_book.py
+        from the game record files of lots of self-play games.
+        Positions are keyed by their Zobrist hash (GameLogic.position_hash) in an open addressing hash table like
+        Tablebase's, read straight from disk with mmap, so looking a move up is one or two reads however big the book is.
+        The file also keeps every (position, move, games, wins) it has counted and how much of each game record file
+        it has read, so a new book can be made from just the games added since.
+    """
+
+    HEADER_DTYPE: np.dtype = np.dtype([('magic', 'S4'), ('version', '<u4'), ('rows', '<u4'), ('coloumns', '<u4'),
+                                       ('max_plies', '<u4'), ('min_games', '<u4'), ('slots', '<u8'), ('positions', '<u8'),
+                                       ('statistics', '<u8'), ('games', '<u8'), ('sources_bytes', '<u8')])
+    STATISTICS_DTYPE: np.dtype = np.dtype([('key', '<u8'), ('move', '<u4'), ('games', '<u4'), ('wins', '<u4')])
+    # wins are for the player who played the move
+    MAGIC: bytes = b'CLOB'
+    FORMAT_VERSION: int = 1
+
+    def __init__(self, path: str) -> None:
+        header: tp.NDArray = np.fromfile(path, dtype=self.HEADER_DTYPE, count=1)
+        try:
+            assert (len(header) == 1) and (header['magic'][0] == self.MAGIC) and (header['version'][0] == self.FORMAT_VERSION)
+        except AssertionError as assertion_error:
+            raise ValueError(f"{path} isn't a version {self.FORMAT_VERSION} opening book") from assertion_error
+        self.rows: int = int(header['rows'][0])
+        self.coloumns: int = int(header['coloumns'][0])
+        self.max_plies: int = int(header['max_plies'][0])
+        # Only the first this many plies of every game were counted
+        self.min_games: int = int(header['min_games'][0])
+        # A move has to have been played at least this many times to go in the book
+        self.slots: int = int(header['slots'][0])
+        self.positions: int = int(header['positions'][0])
+        self.games: int = int(header['games'][0])
+        self._slot_bits: int = self.slots.bit_length() - 1
+        offset: int = self.HEADER_DTYPE.itemsize
+        self.keys: tp.NDArray[np.uint64] = np.memmap(path, dtype='<u8', mode='r', offset=offset, shape=(self.slots,))
+        offset += 8 * self.slots
+        self.moves: tp.NDArray[np.uint32] = np.memmap(path, dtype='<u4', mode='r', offset=offset, shape=(self.slots,))
+        offset += 4 * self.slots
+        statistics_count: int = int(header['statistics'][0])
+        self.statistics: tp.NDArray = (np.memmap(path, dtype=self.STATISTICS_DTYPE, mode='r', offset=offset, shape=(statistics_count,))
+                                       if statistics_count > 0 else np.zeros(0, dtype=self.STATISTICS_DTYPE))
+        offset += self.STATISTICS_DTYPE.itemsize * statistics_count
+        with open(path, 'rb') as book_file:
+            book_file.seek(offset)
+            self.sources: Dict[str, int] = json.loads(book_file.read(int(header['sources_bytes'][0])) or b'{}')
+        # How many bytes of every game record file have been counted
+        self.probes: int = 0
+        self.hits: int = 0
+        return
+
+    def covers(self, game: GameLogic) -> bool:
+        return (game.get_board_size() == (self.rows, self.coloumns)) and (game.players == 2)
+
+    def probe(self, game: GameLogic) -> int | None:
+        """
+            The book move for the game's current position as a flat index (x * coloumns + y), None if there isn't one.
+        """
+        self.probes += 1
+        key: int = game.position_hash()
+        slot: int = ((key * HASH_MULTIPLIER) & EMPTY_HASH_KEY) >> (64 - self._slot_bits)
+        while True:
+            slot_key: int = int(self.keys[slot])
+            if slot_key == key:
+                self.hits += 1
+                return int(self.moves[slot])
+            if slot_key == EMPTY_HASH_KEY:
+                return None
+            slot = (slot + 1) & (self.slots - 1)
+
+    def best_move(self, game: GameLogic) -> Tuple[int, int] | None:
+        """
+            The book move as (x, y), or None if the game isn't covered or the position isn't in the book.
+        """
+        if (not self.covers(game)) or game.next_autotick:
+            return None
+        move: int | None = self.probe(game)
+        if move is None:
+            return None
+        position: Tuple[int, int] = divmod(move, self.coloumns)
+        if not game.is_valid_move(position):
+            return None  # Two positions with the same hash, it's about 1 in 2^64 but can't hurt to check
+        return position
+
+    @staticmethod
+    def merge_statistics(*statistics: tp.NDArray) -> tp.NDArray:
+        """
+            Adds up the games and wins of the same (key, move) across any number of statistics arrays,
+            returns them as one array sorted by key and then move.
+        """
+        every: tp.NDArray = np.concatenate([np.asarray(part, dtype=OpeningBook.STATISTICS_DTYPE) for part in statistics])
+        if every.size == 0:
+            return every
+        every = every[np.lexsort((every['move'], every['key']))]
+        starts: tp.NDArray[np.intp] = np.flatnonzero(np.concatenate(([True], (every['key'][1:] != every['key'][:-1])
+                                                                     | (every['move'][1:] != every['move'][:-1]))))
+        merged: tp.NDArray = every[starts]
+        merged['games'] = np.add.reduceat(every['games'].astype(np.int64), starts)
+        merged['wins'] = np.add.reduceat(every['wins'].astype(np.int64), starts)
+        return merged
+
+    @staticmethod
+    def book_moves(statistics: tp.NDArray, min_games: int) -> Tuple[tp.NDArray[np.uint64], tp.NDArray[np.uint32]]:
+        """
+            Picks the book move of every position from merged statistics: the one with the best win rate
+            out of the moves played at least min_games times, counting one extra win and loss so a move that won
+            its only few games doesn't look perfect. Ties go to the move played more.
+        """
+        played: tp.NDArray = statistics[statistics['games'] >= max(min_games, 1)]
+        win_rates: tp.NDArray[np.float64] = (played['wins'] + 1.0) / (played['games'] + 2.0)
+        order: tp.NDArray[np.intp] = np.lexsort((played['games'], win_rates, played['key']))
+        best: tp.NDArray = played[order]
+        # The last move of every key is its best one
+        last: tp.NDArray[np.bool_] = np.concatenate((best['key'][1:] != best['key'][:-1], [True])) if best.size > 0 else np.zeros(0, dtype=np.bool_)
+        return (best['key'][last].astype(np.uint64), best['move'][last].astype(np.uint32))
+
+    @staticmethod
+    def write(path: str, rows: int, coloumns: int, max_plies: int, min_games: int, statistics: tp.NDArray,
+              games: int, sources: Dict[str, int]) -> None:
+        """
+            Saves merged statistics as an opening book file, with the book moves picked by book_moves.
+        """
+        keys, moves = OpeningBook.book_moves(statistics, min_games)
+        slots, key_slots = hash_table_slots(keys)
+        table_keys: tp.NDArray[np.uint64] = np.full(slots, EMPTY_HASH_KEY, dtype=np.uint64)
+        table_moves: tp.NDArray[np.uint32] = np.zeros(slots, dtype=np.uint32)
+        table_keys[key_slots] = keys
+        table_moves[key_slots] = moves
+        sources_bytes: bytes = json.dumps(sources).encode('utf-8')
+        header: tp.NDArray = np.array([(OpeningBook.MAGIC, OpeningBook.FORMAT_VERSION, rows, coloumns, max_plies, min_games,
+                                        slots, len(keys), len(statistics), games, len(sources_bytes))], dtype=OpeningBook.HEADER_DTYPE)
+        # Written next to it and moved over at the end, so a book that's being read is never half written
+        with open(path + '.partial', 'wb') as book_file:
+            book_file.write(header.tobytes())
+            book_file.write(table_keys.astype('<u8').tobytes())
+            book_file.write(table_moves.astype('<u4').tobytes())
+            book_file.write(np.asarray(statistics, dtype=OpeningBook.STATISTICS_DTYPE).tobytes())
+            book_file.write(sources_bytes)
+        os.replace(path + '.partial', path)
+        return
 
 
 class AIPlayer:
-    def __init__(self) -> None:
-        self.board: List[List[int]] = []
-        self.pieces: List[Tuple[int, int]] = []
+    def __init__(self, tablebase: Tablebase | None = None, opening_book: OpeningBook | None = None) -> None:
         self.rows: int = 5
         self.coloumns: int = 5
-        self.points_board: List[List[int]] = []
+        self.points_board: tp.NDArray[np.int64] = np.zeros((0, 0), dtype=np.int64)
+        self.tiles: tp.NDArray[np.int8] = np.zeros((0, 0), dtype=np.int8)
+        # The board as a NumPy grid
+        self.mine: tp.NDArray[np.bool_] = np.zeros((0, 0), dtype=np.bool_)
+        # True for every tile that's one of our pieces
+        self._edge_marks: tp.NDArray[np.int64] = np.zeros((0, 0), dtype=np.int64)
+        # The edge marker for the whole board, it only changes with the board's size
+        self.game: GameLogic | None = None
+        self.owner: int = 0
+        self._seen_changes: int = 0
+        self._change_reader: int = 0
+        # Only used when following a live game, see attach_game
+        self.tablebase: Tablebase | None = tablebase
+        # On boards the tablebase covers, live games play its perfect moves instead
+        self.opening_book: OpeningBook | None = opening_book
+        # And positions the opening book has play its move, before any scoring
 
     def _update_board(self, new_board: List[List[int]], ai_pieces: List[Tuple[int, int]]):
-        self.board = deepcopy(new_board)
-        self.pieces = deepcopy(ai_pieces)
-        self.rows = len(new_board)
-        self.coloumns = len(new_board[0])
-        self.points_board = [[0 if (i, j) in ai_pieces else -30 for j in range(self.coloumns)] for i in range(self.rows)]
+        mine: tp.NDArray[np.bool_] = np.zeros((len(new_board), len(new_board[0])), dtype=np.bool_)
+        if len(ai_pieces) > 0:
+            mine[tuple(np.array(ai_pieces).T)] = True
+        self._set_view(np.array(new_board, dtype=np.int8), mine)
+
+    def _set_view(self, tiles: tp.NDArray[np.int8], mine: tp.NDArray[np.bool_]) -> None:
+        self.rows, self.coloumns = np.shape(tiles)
+        self.tiles = tiles
+        self.mine = mine
+        self.points_board = np.full((self.rows, self.coloumns), -30, dtype=np.int64)
         # I believe the lower bound for points on a tile is -23
         # Thus tiles unable to get picked will be -30
 
-    def _on_edge_marker(self, point: Tuple[int, int]) -> int:
-        marks: int = 0
-        # points on the edge give less than 4 children so they're not very suitable
-        if (point[0] == 0) or (point[0] == (self.rows - 1)):
-            marks += 1
-        if (point[1] == 0) or (point[1] == (self.coloumns - 1)):
-            marks += 1
-        return marks
+    def score_position(self, tiles: tp.NDArray[np.int8], mine: tp.NDArray[np.bool_]) -> tp.NDArray[np.int64]:
+        """
+            Scores every one of our tiles for a board given as NumPy grids, without keeping a copy of them.
+            Tiles that aren't ours get -30.
+        """
+        self._set_view(tiles, mine)
+        self._assign_scores()
+        return self.points_board
+
+    def attach_game(self, game: GameLogic, owner: int) -> None:
+        """
+            Starts following a live game as one of its players (1 for white, 2 for black).
+            After this, play_live_turn only rescores the tiles around what changed since the last turn
+            instead of copying and scoring the whole board every time.
+        """
+        if self.game is not None:
+            self.game.remove_change_reader(self._change_reader)
+        self.game = game
+        self.owner = owner
+        self._set_view(game.board.copy(), game.owners == owner)
+        self._change_reader = game.add_change_reader()
+        self._seen_changes = game.change_log_end()
+        self._assign_scores()
 
-    def _has_three_neighbouring_bonus(self, point: Tuple[int, int], tile: int) -> int:
+    def _catch_up(self) -> None:
+        # Copies over only the tiles the game changed since we last looked and rescores around them
+        assert self.game is not None
+        new_changes: List[tp.NDArray[np.intp]] = self.game.changes_since(self._seen_changes)
+        self._seen_changes = self.game.change_log_end()
+        if len(new_changes) == 0:
+            return
+        changed: tp.NDArray[np.intp] = np.concatenate(new_changes)
+        self.game.trim_change_log(self._change_reader, self._seen_changes)
+        x, y = np.divmod(changed, self.coloumns)
+        self.tiles[x, y] = self.game.board[x, y]
+        self.mine[x, y] = self.game.owners[x, y] == self.owner
+        # A tile's score only looks at the tiles right around it, so one tile of margin is enough
+        self._assign_scores(window=(max(int(x.min()) - 1, 0), min(int(x.max()) + 2, self.rows),
+                                    max(int(y.min()) - 1, 0), min(int(y.max()) + 2, self.coloumns)))
+
+    # All of the markers below work on a whole window of the board at once instead of one tile at a time.
+    # A window is (top, bottom, left, right) like a slice, None means the whole board.
+    # The window gets copied once with one tile of margin around it (see _padded_window)
+    # and looking at a neighbour is a slice of that copy shifted by one tile.
+
+    def _full_window(self, window: Tuple[int, int, int, int] | None) -> Tuple[int, int, int, int]:
+        return (0, self.rows, 0, self.coloumns) if window is None else window
+
+    def _padded_window(self, window: Tuple[int, int, int, int]) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.bool_]]:
+        # The tiles and which are ours for the window and the tiles around it,
+        # the ones that are off the board filled in as a 1 of ours, which can't meet any of the conditions
+        # (it isn't a 3, it isn't an enemy and it's a 1)
+        top, bottom, left, right = window
+        tiles: tp.NDArray[np.int8] = np.ones((bottom - top + 2, right - left + 2), dtype=np.int8)
+        mine: tp.NDArray[np.bool_] = np.ones((bottom - top + 2, right - left + 2), dtype=np.bool_)
+        inner_top: int = max(top - 1, 0)
+        inner_left: int = max(left - 1, 0)
+        inner_bottom: int = min(bottom + 1, self.rows)
+        inner_right: int = min(right + 1, self.coloumns)
+        inside: Tuple[slice, slice] = (slice(inner_top - top + 1, inner_bottom - top + 1), slice(inner_left - left + 1, inner_right - left + 1))
+        tiles[inside] = self.tiles[inner_top:inner_bottom, inner_left:inner_right]
+        mine[inside] = self.mine[inner_top:inner_bottom, inner_left:inner_right]
+        return (tiles, mine)
+
+    def _neighbours(self, padded: tp.NDArray) -> List[tp.NDArray]:
+        # up, down, left, right
+        return [padded[:-2, 1:-1], padded[2:, 1:-1], padded[1:-1, :-2], padded[1:-1, 2:]]
+
+    def _diagonals(self, padded: tp.NDArray) -> List[tp.NDArray]:
+        # top left, top right, bottom left, bottom right
+        return [padded[:-2, :-2], padded[:-2, 2:], padded[2:, :-2], padded[2:, 2:]]
+
+    def _on_edge_markers(self, window: Tuple[int, int, int, int]) -> tp.NDArray:
+        # points on the edge give less than 4 children so they're not very suitable
+        if self._edge_marks.shape != (self.rows, self.coloumns):
+            row_indices: tp.NDArray = np.arange(self.rows)
+            coloumn_indices: tp.NDArray = np.arange(self.coloumns)
+            row_edge: tp.NDArray = ((row_indices == 0) | (row_indices == self.rows - 1)).astype(np.int64)
+            coloumn_edge: tp.NDArray = ((coloumn_indices == 0) | (coloumn_indices == self.coloumns - 1)).astype(np.int64)
+            self._edge_marks = row_edge[:, None] + coloumn_edge[None, :]
+        top, bottom, left, right = window
+        return self._edge_marks[top:bottom, left:right]
+
+    # Multiplying by a condition instead of np.where keeps the small windows of a live game cheap
+
+    def _has_three_neighbouring_bonuses(self, is_three: tp.NDArray, threes: tp.NDArray, enemies: tp.NDArray) -> tp.NDArray:
         # the bonus only applies if you're a 3 and can explode onto an enemy
-        if tile != 3:
-            return 0
-        x, y = point
-        marks: int = 0
-        if x > 0:
-            if (self.board[x-1][y] == 3) and not ((x-1, y) in self.pieces):
-                marks += 1
-        if (x + 1) < self.coloumns:
-            if (self.board[x+1][y] == 3) and not ((x+1, y) in self.pieces):
-                marks += 1
-        if y > 0:
-            if (self.board[x][y-1] == 3) and not ((x, y-1) in self.pieces):
-                marks += 1
-        if (y + 1) < self.rows:
-            if (self.board[x][y+1] == 3) and not ((x, y+1) in self.pieces):
-                marks += 1
-        return marks
-
-    def _has_three_neighbouring_penalty(self, point: Tuple[int, int], tile: int) -> int:
+        up, down, left, right = self._neighbours((threes & enemies).view(np.int8))
+        return (up + down + left + right) * is_three
+
+    def _has_three_neighbouring_penalties(self, is_three: tp.NDArray, threes: tp.NDArray) -> tp.NDArray:
         # the penalty only applies if you aren't a 3 so you can't explode into the 3s
-        if tile == 3:
-            return 0
-        # this bonus applies only once
-        x, y = point
-        if x > 0:
-            if self.board[x-1][y] == 3:
-                return 1
-        if (x + 1) < self.coloumns:
-            if self.board[x+1][y] == 3:
-                return 1
-        if y > 0:
-            if self.board[x][y-1] == 3:
-                return 1
-        if (y + 1) < self.rows:
-            if self.board[x][y+1] == 3:
-                return 1
-        return 0
+        # this one applies only once
+        up, down, left, right = self._neighbours(threes)
+        return (up | down | left | right) & ~is_three
 
-    def _qualifies_for_corner(self, point: Tuple[int, int]) -> bool:
-        # neighbours should be only our colour or a 1
-        x, y = point
-        if x > 0:
-            if (self.board[x-1][y] not in self.pieces) and (self.board[x-1][y] != 1):
-                return True
-        if (x + 1) < self.coloumns:
-            if (self.board[x+1][y] not in self.pieces) and (self.board[x+1][y] != 1):
-                return True
-        if y > 0:
-            if (self.board[x][y-1] not in self.pieces) and (self.board[x][y-1] != 1):
-                return True
-        if (y + 1) < self.rows:
-            if (self.board[x][y+1] not in self.pieces) and (self.board[x][y+1] != 1):
-                return True
-        return False
+    def _qualifies_for_corners(self, tiles: tp.NDArray) -> tp.NDArray:
+        # a neighbour that isn't a 1 is enough
+        up, down, left, right = self._neighbours(tiles != 1)
+        return up | down | left | right
 
-    def _can_make_corner_full(self, point: Tuple[int, int], tile: int) -> int:
-        # +2 if this is the corner to a 3, +1 if it's a corner to a 2, +0 if it's to a 1
+    def _enemy_corner_marks(self, tiles: tp.NDArray, enemies: tp.NDArray) -> tp.NDArray:
+        # +2 for a corner that's a 3, +1 for a 2, +0 for a 1 (or empty)
         # the corners we want are the enemies
+        enemy_marks: tp.NDArray = (np.maximum(tiles, 1) - 1) * enemies
+        top_left, top_right, bottom_left, bottom_right = self._diagonals(enemy_marks)
+        return top_left + top_right + bottom_left + bottom_right
+
+    def _can_make_corner_fulls(self, is_three: tp.NDArray, corner_marks: tp.NDArray, tiles: tp.NDArray) -> tp.NDArray:
         # to make corner needs to not be 3
-        if tile == 3:
-            return 0
-        if not self._qualifies_for_corner(point):
-            return 0
         # it doesn't get a reward if it's a bad move
-        marks: int = 0
-        x, y = point
-        target: Tuple[int, int] = (0, 0)
-        if (x > 0) and (y > 0):
-            # has top left corner
-            target = (x-1, y-1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x-1][y-1] - 1)  # if it's empty it just adds 0
-        if (x > 0) and ((y + 1) < self.coloumns):
-            # has top right corner
-            target = (x-1, y+1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x-1][y+1] - 1)  # if it's empty it just adds 0
-        if ((x + 1) < self.rows) and (y > 0):
-            # has bottom left corner
-            target = (x+1, y-1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x+1][y-1] - 1)  # if it's empty it just adds 0
-        if ((x + 1) < self.rows) and ((y + 1) < self.coloumns):
-            # has bottom right corner
-            target = (x+1, y+1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x+1][y+1] - 1)  # if it's empty it just adds 0
-        return marks
-
-    def _can_make_corner_burst(self, point: Tuple[int, int], tile: int) -> int:
-        # -2 if this is the corner to a 3, -1 if it's a corner to a 2, -0 if it's to a 1
-        # the corners we want are the enemies
+        return corner_marks * (self._qualifies_for_corners(tiles) & ~is_three)
+
+    def _can_make_corner_bursts(self, is_three: tp.NDArray, corner_marks: tp.NDArray) -> tp.NDArray:
         # to burst needs to be 3
-        if tile != 3:
-            return 0
         # I won't give the corner qualification to this because it'd still be a bad move.
-        marks: int = 0
-        x, y = point
-        target: Tuple[int, int] = (0, 0)
-        if (x > 0) and (y > 0):
-            # has top left corner
-            target = (x-1, y-1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x-1][y-1] - 1)  # if it's empty it just adds 0
-        if (x > 0) and ((y + 1) < self.coloumns):
-            # has top right corner
-            target = (x-1, y+1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x-1][y+1] - 1)  # if it's empty it just adds 0
-        if ((x + 1) < self.rows) and (y > 0):
-            # has bottom left corner
-            target = (x+1, y-1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x+1][y-1] - 1)  # if it's empty it just adds 0
-        if ((x + 1) < self.rows) and ((y + 1) < self.coloumns):
-            # has bottom right corner
-            target = (x+1, y+1)
-            if target not in self.pieces:
-                marks += max(0, self.board[x+1][y+1] - 1)  # if it's empty it just adds 0
-        return marks
-
-    def _assign_scores(self) -> None:
-        for total_index in range(self.rows * self.coloumns):
-            x: int = total_index // self.coloumns
-            y: int = total_index % self.coloumns
-            position: Tuple[int, int] = (x, y)
-            if not (position in self.pieces):
-                continue
-            tile: int = self.board[x][y]
-            current_score: int = deepcopy(self.points_board[x][y])
-            # The way these marker functions work is that they either produce how many times the condition is met
-            # 0 if the condition isn't met for a point and a natural number from 1 to however many times it was met
-            # For example a point in the corner gets 2 on the edge marker
-            # While a point on just an edge gets 1
-            # A point in a corner gets -2 score. A point on only edges gets -1. A point in the middle gets 0
-            # Some markers (like the penalty for placing next to a 3) only apply once so they just return 0 or 1
-            # This also makes the code better looking than a bunch of conditions
-            current_score -= 1 * self._on_edge_marker(position)  # Can apply twice
-            current_score -= 3 * self._has_three_neighbouring_penalty(position, tile)  # Applices once
-            current_score += 7 * self._has_three_neighbouring_bonus(position, tile)  # Applies once
-            current_score += 1 * self._can_make_corner_full(position, tile)  # Applies differently based on tile
-            current_score -= 1 * self._can_make_corner_burst(position, tile)  # Applies differently based on tile
-            self.points_board[x][y] = deepcopy(current_score)
+        return corner_marks * is_three
+
+    def _assign_scores(self, window: Tuple[int, int, int, int] | None = None) -> None:
+        # The way these marker functions work is that they give how many times the condition is met for every tile
+        # 0 if the condition isn't met for a point and a natural number from 1 to however many times it was met
+        # For example a point in the corner gets 2 on the edge marker
+        # While a point on just an edge gets 1
+        # A point in a corner gets -2 score. A point on only edges gets -1. A point in the middle gets 0
+        # Some markers (like the penalty for placing next to a 3) only apply once so they just give 0 or 1
+        # With metrics enabled every marker gets timed on its own
+        # The grids only ever cover the window and its margin, so rescoring a few tiles of a big board stays cheap
+        full_window: Tuple[int, int, int, int] = self._full_window(window)
+        top, bottom, left, right = full_window
+        timing: bool = metrics.enabled
+        start: float = perf_counter() if timing else 0.0
+        tiles, mine = self._padded_window(full_window)
+        threes: tp.NDArray = tiles == 3
+        is_three: tp.NDArray = threes[1:-1, 1:-1]
+        enemies: tp.NDArray = ~mine
+        corner_marks: tp.NDArray = self._enemy_corner_marks(tiles, enemies)
+        if timing:
+            metrics.observe('ai_scored_tiles', (bottom - top) * (right - left))
+            start = metrics.lap('ai_corner_marks_ms', start)
+        scores: tp.NDArray = -1 * self._on_edge_markers(full_window)  # Can apply twice
+        if timing:
+            start = metrics.lap('ai_edges_ms', start)
+        scores -= 3 * self._has_three_neighbouring_penalties(is_three, threes)  # Applies once
+        if timing:
+            start = metrics.lap('ai_three_penalties_ms', start)
+        scores += 7 * self._has_three_neighbouring_bonuses(is_three, threes, enemies)  # Applies for every enemy 3 around
+        if timing:
+            start = metrics.lap('ai_three_bonuses_ms', start)
+        scores += 1 * self._can_make_corner_fulls(is_three, corner_marks, tiles)  # Applies differently based on tile
+        if timing:
+            start = metrics.lap('ai_corner_fulls_ms', start)
+        scores -= 1 * self._can_make_corner_bursts(is_three, corner_marks)  # Applies differently based on tile
+        if timing:
+            start = metrics.lap('ai_corner_bursts_ms', start)
+        self.points_board[top:bottom, left:right] = np.where(mine[1:-1, 1:-1], scores, -30)
 
     def _decide_move(self) -> Tuple[int, int]:
         """
          (x, y) | x : row [up and down]
                 | y : col [left and right]
         """
-        if len(self.pieces) == 0:
+        if not self.mine.any():
             best_place: Tuple[int, int] = (self.rows//2, self.coloumns//2)
-            if self.board[best_place[0]][best_place[1]] == 0:
-                return best_place
-            if (best_place[0] + 1) < self.coloumns:
-                if (best_place[1] + 1) < self.rows:
-                    return (best_place[0] + 1, best_place[1] + 1)
+            openings: List[Tuple[int, int]] = [best_place]
+            if (best_place[0] + 1) < self.rows:
+                if (best_place[1] + 1) < self.coloumns:
+                    openings.append((best_place[0] + 1, best_place[1] + 1))
                 elif best_place[1] > 0:
-                    return (best_place[0] + 1, best_place[1] - 1)
-            if (best_place[1] + 1) < self.rows:
-                return (best_place[0] - 1, best_place[1] + 1)
+                    openings.append((best_place[0] + 1, best_place[1] - 1))
+            if (best_place[1] + 1) < self.coloumns:
+                openings.append((best_place[0] - 1, best_place[1] + 1))
             elif best_place[1] > 0:
-                return (best_place[0] - 1, best_place[1] - 1)
+                openings.append((best_place[0] - 1, best_place[1] - 1))
             # This piece of code was sponsered by the assertion at the end of the GameLogic init function :)
+            for opening in openings:
+                if self.tiles[opening[0], opening[1]] == 0:
+                    return opening
+            # With more than two players all of them can be taken, then it's the empty tile closest to the middle
+            return self._closest_to_middle(self.tiles == 0)
         # This basically says that if the AI is starting,
         # pick the middle piece, biased towards the bottom right on even-tile boards.
         # Additional code to check for at least one of the corners aroud the starting position if the middle is taken
         # (In case of a small board like a 2x2)
 
-        max_score: int = -32
-        best_tiles: List[Tuple[int, int]] = []
-        tile_values: List[int] = []
-        for total_index in range(self.rows * self.coloumns):
-            x: int = total_index // self.coloumns
-            y: int = total_index % self.coloumns
-            tile_position: Tuple[int, int] = (x, y)
-            if not (tile_position in self.pieces):
-                continue
-            tile_value: int = self.board[x][y]
-            tile_score: int = self.points_board[x][y]
-            if tile_score == max_score:
-                best_tiles.append(tile_position)
-                tile_values.append(tile_value)
-            elif tile_score > max_score:
-                max_score = tile_score
-                best_tiles.clear()
-                tile_values.clear()
-                best_tiles.append(tile_position)
-                tile_values.append(tile_value)
-        if len(best_tiles) == 1:
-            return best_tiles[0]
+        best_tiles: tp.NDArray[np.bool_] = self.mine & (self.points_board == self.points_board[self.mine].max())
+        if np.count_nonzero(best_tiles) == 1:
+            return self._first_tile(best_tiles)
         # If only 1 best piece, it gets the move.
-        selection_tiles: List[Tuple[int, int]] = []
+        selection_tiles: tp.NDArray[np.bool_] = best_tiles
         for best_current_possible_value in [2, 1, 3]:
-            for index, tile_value in enumerate(tile_values):
-                if tile_value == best_current_possible_value:
-                    selection_tiles.append(best_tiles[index])
-            if len(selection_tiles) != 0:
+            selection_tiles = best_tiles & (self.tiles == best_current_possible_value)
+            if selection_tiles.any():
                 break
-        if len(selection_tiles) == 1:
-            return selection_tiles[0]
+        if np.count_nonzero(selection_tiles) == 1:
+            return self._first_tile(selection_tiles)
         # If having multiple best pieces of different ranks, the algorithm will do 2s as the best then 1s then 3s.
+        return self._closest_to_middle(selection_tiles)
+
+    def _closest_to_middle(self, selection_tiles: tp.NDArray[np.bool_]) -> Tuple[int, int]:
         i_mid: int = (self.rows//2)
         # if we have odd tiles, tile roof(count/2) with index floor(count/2) (what we get) is the mid.
         # if tiles are even then the one on the right of the midpoint is preferred since the midpoint is split between 2 tiles in even counts.
         # for verticals it'll be biased towards the tile below the midpoint.
         j_mid: int = (self.coloumns//2)
-        minimum_distance: int = 10
-        best_tile: Tuple[int, int] = (0, 0)  # This section will be biased towards the first least-distance pick in the order of counting.
-        for position in selection_tiles:
-            distance: int = abs(i_mid - position[0]) + abs(j_mid - position[1])
-            if distance < minimum_distance:
-                minimum_distance = distance
-                best_tile = position
-        return best_tile
+        distances: tp.NDArray = np.abs(np.arange(self.rows) - i_mid)[:, None] + np.abs(np.arange(self.coloumns) - j_mid)[None, :]
+        distances = np.where(selection_tiles, distances, self.rows + self.coloumns)
+        # _first_tile gives the first least-distance pick in the order of counting.
+        return self._first_tile(distances == distances.min())
+
+    def _first_tile(self, tiles: tp.NDArray[np.bool_]) -> Tuple[int, int]:
+        # The first marked tile going row by row
+        # Every tie in _decide_move ends up here, so the AI never needs a seed and the same board always gets the same move
+        x, y = divmod(int(np.argmax(tiles)), self.coloumns)
+        return (x, y)
 
     def play_turn(self, current_game_board: List[List[int]], ai_pieces: List[Tuple[int, int]]) -> Tuple[int, int]:
+        start: float = perf_counter() if metrics.enabled else 0.0
         self._update_board(new_board=current_game_board, ai_pieces=ai_pieces)
         self._assign_scores()
-        return self._decide_move()
+        move: Tuple[int, int] = self._decide_move()
+        if metrics.enabled:
+            metrics.lap('ai_turn_ms', start)
+        return move
+
+    def play_live_turn(self) -> Tuple[int, int]:
+        """
+            Same as play_turn but for the game given to attach_game.
+        """
+        start: float = perf_counter() if metrics.enabled else 0.0
+        move: Tuple[int, int] | None = None
+        if self.tablebase is not None:
+            assert self.game is not None
+            move = self.tablebase.best_move(self.game)
+        if (move is None) and (self.opening_book is not None):
+            assert self.game is not None
+            move = self.opening_book.best_move(self.game)
+            if metrics.enabled:
+                metrics.count('ai_book_moves' if move is not None else 'ai_book_misses')
+        if move is None:
+            # Only scored when it's needed, whatever changed in the meantime gets caught up on all together
+            self._catch_up()
+            move = self._decide_move()
+        if metrics.enabled:
+            metrics.lap('ai_turn_ms', start)
+        return move
+
+
+class TranspositionTable:
+    """
+        A fixed size table of search results keyed by GameLogic.position_hash, that any number of search agents can share.
+        Every bucket has two slots:
+            the first keeps the deepest search of everything that landed in the bucket
+            the second always takes the newest entry that didn't make it into the first
+        Everything lives in NumPy arrays so the memory use is fixed from the start.
+    """
+
+    EXACT: int = 0
+    LOWER_BOUND: int = 1
+    UPPER_BOUND: int = 2
+
+    ENTRY_BYTES: int = 8 + 2 + 4 + 1 + 4
+    # key, depth, score, bound and move
+
+    def __init__(self, size_mb: float = 16.0) -> None:
+        self.buckets: int = max(1, int(size_mb * 1024 * 1024) // (2 * self.ENTRY_BYTES))
+        self.keys: tp.NDArray[np.uint64] = np.zeros((self.buckets, 2), dtype=np.uint64)
+        self.depths: tp.NDArray[np.int16] = np.full((self.buckets, 2), -1, dtype=np.int16)
+        # A depth of -1 is an empty slot
+        self.scores: tp.NDArray[np.int32] = np.zeros((self.buckets, 2), dtype=np.int32)
+        self.bounds: tp.NDArray[np.int8] = np.zeros((self.buckets, 2), dtype=np.int8)
+        self.moves: tp.NDArray[np.int32] = np.full((self.buckets, 2), -1, dtype=np.int32)
+        # The best move as a flat tile index, -1 if there wasn't one
+        self.probes: int = 0
+        self.hits: int = 0
+        self.stores: int = 0
+        self.overwrites: int = 0
+
+    def probe(self, key: int) -> Tuple[int, int, int, int] | None:
+        """
+            Returns (depth, score, bound, move) saved for this position, or None if there's nothing saved.
+        """
+        self.probes += 1
+        bucket: int = key % self.buckets
+        for slot in (0, 1):
+            if self.depths[bucket, slot] >= 0 and int(self.keys[bucket, slot]) == key:
+                self.hits += 1
+                return (int(self.depths[bucket, slot]), int(self.scores[bucket, slot]),
+                        int(self.bounds[bucket, slot]), int(self.moves[bucket, slot]))
+        return None
+
+    def store(self, key: int, depth: int, score: int, bound: int, move: int) -> None:
+        self.stores += 1
+        bucket: int = key % self.buckets
+        slot: int = 1
+        if (int(self.keys[bucket, 0]) == key) or (depth >= self.depths[bucket, 0]):
+            slot = 0
+            if (int(self.keys[bucket, 0]) != key) and (self.depths[bucket, 0] >= 0):
+                # The deepest entry gets pushed down to the always-replace slot instead of being lost
+                self._write(bucket, 1, int(self.keys[bucket, 0]), int(self.depths[bucket, 0]), int(self.scores[bucket, 0]),
+                            int(self.bounds[bucket, 0]), int(self.moves[bucket, 0]))
+        elif (self.depths[bucket, 1] >= 0) and (int(self.keys[bucket, 1]) != key):
+            self.overwrites += 1
+        self._write(bucket, slot, key, depth, score, bound, move)
+        return
+
+    def _write(self, bucket: int, slot: int, key: int, depth: int, score: int, bound: int, move: int) -> None:
+        self.keys[bucket, slot] = key
+        self.depths[bucket, slot] = depth
+        self.scores[bucket, slot] = score
+        self.bounds[bucket, slot] = bound
+        self.moves[bucket, slot] = move
+        return
+
+    def clear(self) -> None:
+        self.depths.fill(-1)
+        self.probes = self.hits = self.stores = self.overwrites = 0
+        return
+
+    def stats(self) -> Dict[str, int | float]:
+        return {
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': (self.hits / self.probes) if self.probes else 0.0,
+            'stores': self.stores,
+            'overwrites': self.overwrites,
+            'filled': float(np.count_nonzero(self.depths >= 0)) / self.depths.size,
+            'memory_bytes': self.keys.nbytes + self.depths.nbytes + self.scores.nbytes + self.bounds.nbytes + self.moves.nbytes,
+        }
+
+
+class _SearchTimeout(Exception):
+    # Thrown from deep in the search once the time for a move has run out
+    pass
+
+
+class SearchAIPlayer:
+    """
+        Looks a few moves ahead with an alpha-beta search instead of only scoring the current board.
+        AIPlayer's tile scores are used to order the moves and as part of the evaluation of a position.
+        The search plays on the attached game itself with make_move/unmake_move so the board never gets copied.
+        It deepens one ply at a time until time_budget (in seconds) runs out or max_depth is reached,
+        and plays the best move of the deepest search that finished.
+        Results are kept in a TranspositionTable, pass the same table to several agents to share it.
+        With a cascade_cache the attached game gets it too, so chain reactions the search runs into again are looked up.
+    """
+
+    WIN_SCORE: int = 1_000_000
+
+    def __init__(self, time_budget: float = 1.0, max_depth: int = 32, table: TranspositionTable | None = None,
+                 cascade_cache: CascadeCache | None = None) -> None:
+        self.time_budget: float = time_budget
+        self.max_depth: int = max_depth
+        self.table: TranspositionTable = TranspositionTable() if table is None else table
+        self.cascade_cache: CascadeCache | None = cascade_cache
+        self.scorer: AIPlayer = AIPlayer()
+        self.game: GameLogic | None = None
+        self.owner: int = 0
+        self.nodes: int = 0
+        self.reached_depth: int = 0
+        # How many positions the last move looked at and how deep it finished
+        self._deadline: float = 0.0
+
+    def attach_game(self, game: GameLogic, owner: int) -> None:
+        try:
+            assert game.players == 2
+        except AssertionError as assertion_error:
+            raise ValueError("SearchAIPlayer can only play two player games") from assertion_error
+        self.game = game
+        self.owner = owner
+        if (self.cascade_cache is not None) and (game.cascade_cache is None):
+            game.cascade_cache = self.cascade_cache
+
+    def play_live_turn(self) -> Tuple[int, int]:
+        assert self.game is not None
+        first_move: bool = self.game.first_move_white if self.owner == 1 else self.game.first_move_black
+        if first_move:
+            # There's nothing to search on the first move, that's left to the normal AI
+            self.scorer.score_position(self.game.board, self.game.owners == self.owner)
+            return self.scorer._decide_move()
+
+        self.nodes = 0
+        self.reached_depth = 0
+        self._deadline = perf_counter() + self.time_budget
+        moves: List[Tuple[int, int]] = self._ordered_moves(self.owner)
+        if len(moves) == 1:
+            return moves[0]
+        best_move: Tuple[int, int] = moves[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best_move, best_score = self._search_root(moves, depth)
+            except _SearchTimeout:
+                break
+            self.reached_depth = depth
+            if abs(best_score) >= self.WIN_SCORE - self.max_depth:
+                break  # A forced win or loss was found, looking deeper won't change it
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            # The best move of the last depth gets searched first, that's what makes the pruning work well
+        return best_move
+
+    def _search_root(self, moves: List[Tuple[int, int]], depth: int) -> Tuple[Tuple[int, int], int]:
+        assert self.game is not None
+        alpha: int = -self.WIN_SCORE - 1
+        best_move: Tuple[int, int] = moves[0]
+        for move in moves:
+            undo_record = self.game.make_move(move)
+            try:
+                score: int = -self._negamax(depth - 1, -self.WIN_SCORE - 1, -alpha, 1, 3 - self.owner)
+            finally:
+                self.game.unmake_move(undo_record)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return (best_move, alpha)
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int, player: int) -> int:
+        # Scores are always from the point of view of player, who is the one to move here
+        assert self.game is not None
+        self.nodes += 1
+        if (self.nodes & 31) == 0 and perf_counter() > self._deadline:
+            raise _SearchTimeout
+        winner: int = self.game.check_gameover()
+        if winner != 0:
+            # Quicker wins and slower losses are better
+            return (self.WIN_SCORE - ply) if winner == player else -(self.WIN_SCORE - ply)
+
+        key: int = self.game.position_hash()
+        entry: Tuple[int, int, int, int] | None = self.table.probe(key)
+        table_move: int = -1
+        if entry is not None:
+            entry_depth, entry_score, bound, table_move = entry
+            entry_score = self._score_from_table(entry_score, ply)
+            if entry_depth >= depth:
+                if bound == TranspositionTable.EXACT:
+                    return entry_score
+                if (bound == TranspositionTable.LOWER_BOUND) and (entry_score >= beta):
+                    return entry_score
+                if (bound == TranspositionTable.UPPER_BOUND) and (entry_score <= alpha):
+                    return entry_score
+
+        if depth == 0:
+            leaf_score: int = self._evaluate(player)
+            self.table.store(key, 0, self._score_to_table(leaf_score, ply), TranspositionTable.EXACT, -1)
+            return leaf_score
+
+        moves: List[Tuple[int, int]] = self._ordered_moves(player)
+        if table_move >= 0:
+            # The best move from an earlier search of this position goes first
+            table_position: Tuple[int, int] = divmod(table_move, self.game.coloumns)
+            if table_position in moves:
+                moves.remove(table_position)
+                moves.insert(0, table_position)
+
+        starting_alpha: int = alpha
+        best_score: int = -self.WIN_SCORE - 1
+        best_move: Tuple[int, int] = moves[0]
+        for move in moves:
+            undo_record = self.game.make_move(move)
+            try:
+                score: int = -self._negamax(depth - 1, -beta, -alpha, ply + 1, 3 - player)
+            finally:
+                self.game.unmake_move(undo_record)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        bound: int = TranspositionTable.EXACT
+        if best_score <= starting_alpha:
+            bound = TranspositionTable.UPPER_BOUND
+        elif best_score >= beta:
+            bound = TranspositionTable.LOWER_BOUND
+        self.table.store(key, depth, self._score_to_table(best_score, ply), bound, best_move[0] * self.game.coloumns + best_move[1])
+        return best_score
+
+    def _score_to_table(self, score: int, ply: int) -> int:
+        # Win and loss scores count plies from the root, but the table needs them counted from the position itself
+        if score >= self.WIN_SCORE - 1000:
+            return score + ply
+        if score <= -(self.WIN_SCORE - 1000):
+            return score - ply
+        return score
+
+    def _score_from_table(self, score: int, ply: int) -> int:
+        if score >= self.WIN_SCORE - 1000:
+            return score - ply
+        if score <= -(self.WIN_SCORE - 1000):
+            return score + ply
+        return score
+
+    def _ordered_moves(self, player: int) -> List[Tuple[int, int]]:
+        # All of player's pieces, best AIPlayer score first
+        assert self.game is not None
+        mine: tp.NDArray[np.bool_] = self.game.owners == player
+        points: tp.NDArray[np.int64] = self.scorer.score_position(self.game.board, mine)
+        tiles: tp.NDArray[np.intp] = np.flatnonzero(mine)
+        tiles = tiles[np.argsort(-points.ravel()[tiles], kind='stable')]
+        return [divmod(int(tile), self.game.coloumns) for tile in tiles]
+
+    def _evaluate(self, player: int) -> int:
+        # 10 per tile and 1 per dot more than the other player,
+        # plus how much better our best move is than theirs by AIPlayer's scores
+        assert self.game is not None
+        board: tp.NDArray[np.int8] = self.game.board
+        mine: tp.NDArray[np.bool_] = self.game.owners == player
+        theirs: tp.NDArray[np.bool_] = self.game.owners == (3 - player)
+        material: int = 10 * (int(np.count_nonzero(mine)) - int(np.count_nonzero(theirs)))
+        material += int(board[mine].sum()) - int(board[theirs].sum())
+        my_best: int = int(self.scorer.score_position(board, mine)[mine].max())
+        their_best: int = int(self.scorer.score_position(board, theirs)[theirs].max())
+        return material + my_best - their_best
+
+
+class _MCTSNode:
+    # One position in MCTSPlayer's tree, with the stats of every move out of it kept in arrays
+    def __init__(self, key: int, player: int, winner: int) -> None:
+        self.key: int = key  # GameLogic.position_hash
+        self.player: int = player  # Whose move it is here
+        self.winner: int = winner  # check_gameover here, nobody moves in a finished game
+        self.moves: List[Tuple[int, int]] = []
+        self.priors: tp.NDArray[np.float64] = np.zeros(0)
+        self.visits: tp.NDArray[np.float64] = np.zeros(0)
+        self.wins: tp.NDArray[np.float64] = np.zeros(0)
+        # How many playouts went through every move and how many of them player won
+        self.children: List[_MCTSNode | None] = []
+        self.total_visits: float = 0.0
+        self.expanded: bool = False
+
+
+def _mcts_root_search(task: Tuple) -> Tuple[List[Tuple[int, int]], tp.NDArray[np.float64], tp.NDArray[np.float64], int]:
+    # Runs in a worker process for MCTSPlayer: a separate search from the same position, sent back as root move stats
+    board, owners, white_turn, first_move_white, first_move_black, owner, settings, seed = task
+    game: GameLogic = GameLogic(rows=board.shape[0], coloumns=board.shape[1])
+    game.load_position(board, owners, white_turn, first_move_white, first_move_black)
+    player: MCTSPlayer = MCTSPlayer(seed=seed, **settings)
+    player.attach_game(game, owner)
+    root: _MCTSNode = player._search()
+    return (root.moves, root.visits, root.wins, player.playouts)
+
+
+class MCTSPlayer:
+    """
+        Monte Carlo tree search: plays lots of quick random games (playouts) from the current position
+        and grows a tree towards the moves that win the most of them, picking moves to try with UCT.
+        AIPlayer's tile scores are turned into a prior for every new position,
+        which steers the first visits towards moves the heuristic likes.
+        Rollouts are random games cut off after max_rollout_plies and scored by the share of the pieces.
+        leaves_per_batch leaves are picked before their rollouts_per_leaf rollouts each are all played together
+        on one BatchGameLogic, which is a lot faster than one game at a time.
+        It stops after time_budget seconds or once it has done playouts playouts (if that's given), whichever is first.
+        The part of the tree under the move that was actually played is kept for the next turn.
+        With workers over 1 that many more searches run in other processes from the same position
+        and their visits are added up before picking a move (root parallelisation).
+    """
+
+    def __init__(self, time_budget: float = 1.0, playouts: int | None = None, rollouts_per_leaf: int = 8,
+                 leaves_per_batch: int = 8, exploration: float = 0.7, prior_weight: float = 8.0, max_rollout_plies: int = 16,
+                 workers: int = 1, seed: int | None = None) -> None:
+        self.time_budget: float = time_budget
+        self.playout_budget: int | None = playouts
+        self.rollouts_per_leaf: int = rollouts_per_leaf
+        self.leaves_per_batch: int = leaves_per_batch
+        self.exploration: float = exploration
+        self.prior_weight: float = prior_weight
+        self.max_rollout_plies: int = max_rollout_plies
+        self.workers: int = workers
+        self.rng: np.random.Generator = np.random.default_rng(seed)
+        self.scorer: AIPlayer = AIPlayer()
+        self.game: GameLogic | None = None
+        self.owner: int = 0
+        self.root: _MCTSNode | None = None
+        self.playouts: int = 0
+        self.playouts_per_second: float = 0.0
+        self.reused_playouts: int = 0
+        # How many playouts the last move did (every worker together), how fast, and how many came with the reused tree
+        self._pool = None
+
+    def attach_game(self, game: GameLogic, owner: int) -> None:
+        try:
+            assert game.players == 2
+        except AssertionError as assertion_error:
+            raise ValueError("MCTSPlayer can only play two player games") from assertion_error
+        self.game = game
+        self.owner = owner
+        self.root = None
+
+    def close(self) -> None:
+        # Only needed with workers over 1, to stop the worker processes
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        return
+
+    def play_live_turn(self) -> Tuple[int, int]:
+        assert self.game is not None
+        first_move: bool = self.game.first_move_white if self.owner == 1 else self.game.first_move_black
+        if first_move:
+            # Same as SearchAIPlayer, the first piece is left to the normal AI
+            self.scorer.score_position(self.game.board, self.game.owners == self.owner)
+            return self.scorer._decide_move()
+
+        start_time: float = perf_counter()
+        pending = None
+        if self.workers > 1:
+            if self._pool is None:
+                from multiprocessing import Pool  # Only pulled in if it's used
+                self._pool = Pool(processes=self.workers - 1)
+            settings: Dict = {'time_budget': self.time_budget, 'playouts': self.playout_budget,
+                              'rollouts_per_leaf': self.rollouts_per_leaf, 'leaves_per_batch': self.leaves_per_batch,
+                              'exploration': self.exploration,
+                              'prior_weight': self.prior_weight, 'max_rollout_plies': self.max_rollout_plies}
+            tasks: List[Tuple] = [(self.game.board.copy(), self.game.owners.copy(), self.game.white_turn,
+                                   self.game.first_move_white, self.game.first_move_black, self.owner,
+                                   settings, int(self.rng.integers(2**63))) for _ in range(self.workers - 1)]
+            pending = self._pool.map_async(_mcts_root_search, tasks)
+
+        root: _MCTSNode = self._search()
+        visits: tp.NDArray[np.float64] = root.visits.copy()
+        if pending is not None:
+            for moves, worker_visits, _, worker_playouts in pending.get():
+                for move, move_visits in zip(moves, worker_visits):
+                    visits[root.moves.index(move)] += move_visits
+                self.playouts += worker_playouts
+        self.playouts_per_second = self.playouts / max(perf_counter() - start_time, 1e-9)
+
+        best: int = int(np.argmax(visits))
+        self.root = root.children[best]
+        # Kept so the next turn can start from whatever the other player answers with
+        return root.moves[best]
+
+    def _search(self) -> _MCTSNode:
+        assert self.game is not None
+        root: _MCTSNode = self._find_root()
+        self.reused_playouts = int(root.total_visits)
+        self.playouts = 0
+        deadline: float = perf_counter() + self.time_budget
+        if not root.expanded:
+            self._expand(root)
+        while (len(root.moves) > 1) and (perf_counter() < deadline):
+            if (self.playout_budget is not None) and (self.playouts >= self.playout_budget):
+                break
+            self._playout(root)
+        return root
+
+    def _find_root(self) -> _MCTSNode:
+        # The node for the current position is two moves under last turn's root (our move and their answer),
+        # if the other player's move got looked at at all
+        assert self.game is not None
+        key: int = self.game.position_hash()
+        if self.root is not None:
+            for child in self.root.children:
+                if (child is not None) and (child.key == key):
+                    return child
+        return _MCTSNode(key, self.game._current_owner(), self.game.check_gameover())
+
+    def _playout(self, root: _MCTSNode) -> None:
+        # Goes down the tree leaves_per_batch times, then plays the rollouts of all the leaves in one batch
+        # Every trip counts as lost for the moves it took until the results are in (a virtual loss),
+        # so the trips after it spread out over other leaves instead of all picking the same one
+        assert self.game is not None
+        rollouts: int = self.rollouts_per_leaf
+        paths: List[List[Tuple[_MCTSNode, int]]] = []
+        white_wins: List[float] = []
+        leaf_positions: List[Tuple] = []
+        waiting: List[int] = []
+        # Which paths still need rollouts, in the same order as leaf_positions
+        for _ in range(self.leaves_per_batch):
+            path: List[Tuple[_MCTSNode, int]] = []
+            undo_records: List[Tuple] = []
+            node: _MCTSNode = root
+            try:
+                while (node.winner == 0) and node.expanded:
+                    move_index: int = self._select(node)
+                    undo_records.append(self.game.make_move(node.moves[move_index]))
+                    path.append((node, move_index))
+                    node.visits[move_index] += rollouts
+                    node.total_visits += rollouts
+                    child: _MCTSNode | None = node.children[move_index]
+                    if child is None:
+                        child = _MCTSNode(self.game.position_hash(), self.game._current_owner(), self.game.check_gameover())
+                        node.children[move_index] = child
+                    node = child
+                if node.winner != 0:
+                    white_wins.append(float(rollouts) if node.winner == 1 else 0.0)
+                else:
+                    self._expand(node)
+                    white_wins.append(0.0)
+                    waiting.append(len(paths))
+                    leaf_positions.append((self.game.board.copy(), self.game.owners.copy(), self.game.white_turn,
+                                           self.game.first_move_white, self.game.first_move_black))
+            finally:
+                for undo_record in reversed(undo_records):
+                    self.game.unmake_move(undo_record)
+            paths.append(path)
+            if len(path) == 0:
+                break  # The root itself is finished, nothing to search
+
+        if leaf_positions:
+            for path_index, leaf_wins in zip(waiting, self._rollouts(leaf_positions, rollouts)):
+                white_wins[path_index] = float(leaf_wins)
+        for path, path_white_wins in zip(paths, white_wins):
+            for parent, move_index in path:
+                parent.wins[move_index] += path_white_wins if parent.player == 1 else rollouts - path_white_wins
+            self.playouts += rollouts
+        return
+
+    def _select(self, node: _MCTSNode) -> int:
+        # UCT, with the prior as a bonus that fades out as a move gets visited
+        # Moves that haven't been tried yet go first, in order of their prior
+        unvisited: tp.NDArray[np.bool_] = node.visits == 0
+        if unvisited.any():
+            return int(np.argmax(np.where(unvisited, node.priors, -1.0)))
+        win_rate: tp.NDArray[np.float64] = node.wins / node.visits
+        exploration: tp.NDArray[np.float64] = self.exploration * np.sqrt(np.log(node.total_visits) / node.visits)
+        bias: tp.NDArray[np.float64] = self.prior_weight * node.priors * self.rollouts_per_leaf / (node.visits + self.rollouts_per_leaf)
+        return int(np.argmax(win_rate + exploration + bias))
+
+    def _expand(self, node: _MCTSNode) -> None:
+        # Lists the moves of the game's current position (which is node's) and gives them priors
+        assert self.game is not None
+        first_move: bool = self.game.first_move_white if node.player == 1 else self.game.first_move_black
+        if first_move:
+            tiles: tp.NDArray[np.intp] = np.flatnonzero(self.game.board == 0)
+            priors: tp.NDArray[np.float64] = np.ones(len(tiles))
+        else:
+            mine: tp.NDArray[np.bool_] = self.game.owners == node.player
+            points: tp.NDArray[np.int64] = self.scorer.score_position(self.game.board, mine)
+            tiles: tp.NDArray[np.intp] = np.flatnonzero(mine)
+            scores: tp.NDArray[np.float64] = points.ravel()[tiles].astype(np.float64)
+            priors: tp.NDArray[np.float64] = np.exp((scores - scores.max()) / 4.0)
+            # A softmax, AIPlayer's scores go up in steps of a few points per feature
+        node.moves = [divmod(int(tile), self.game.coloumns) for tile in tiles]
+        node.priors = priors / priors.sum()
+        node.visits = np.zeros(len(tiles))
+        node.wins = np.zeros(len(tiles))
+        node.children = [None] * len(tiles)
+        node.expanded = True
+        return
+
+    def _rollouts(self, positions: List[Tuple], count: int) -> tp.NDArray[np.float64]:
+        # Plays count random games from every position all at once, returns how many white won from each
+        # Games still going after max_rollout_plies count as the share of the pieces white has
+        assert self.game is not None
+        batch: BatchGameLogic = BatchGameLogic(len(positions) * count, self.game.rows, self.game.coloumns)
+        for index, (board, owners, white_turn, first_move_white, first_move_black) in enumerate(positions):
+            games: slice = slice(index * count, (index + 1) * count)
+            batch.boards[games] = board
+            batch.owners[games] = owners
+            batch.white_turn[games] = white_turn
+            batch.first_move_white[games] = first_move_white
+            batch.first_move_black[games] = first_move_black
+        for _ in range(self.max_rollout_plies):
+            if (batch.check_gameover() != 0).all():
+                break
+            batch.apply_moves(batch.random_moves(self.rng))
+        winners: tp.NDArray[np.int8] = batch.check_gameover()
+        whites: tp.NDArray[np.int64] = (batch.owners == 1).sum(axis=(1, 2))
+        blacks: tp.NDArray[np.int64] = (batch.owners == 2).sum(axis=(1, 2))
+        results: tp.NDArray[np.float64] = np.where(winners == 0, whites / np.maximum(whites + blacks, 1), winners == 1)
+        return results.reshape(len(positions), count).sum(axis=1)
+
+
+class RandomPlayer:
+    """
+        Plays a random valid move every turn.
+        Uses the same play_turn as AIPlayer so they can be swapped for each other.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        self.rng: Random = Random(seed)
+        self.game: GameLogic | None = None
+        self.owner: int = 0
+
+    def play_turn(self, current_game_board: List[List[int]], ai_pieces: List[Tuple[int, int]]) -> Tuple[int, int]:
+        if len(ai_pieces) == 0:
+            empty_tiles: List[Tuple[int, int]] = [(i, j) for i, row in enumerate(current_game_board) for j, item in enumerate(row) if item == 0]
+            return self.rng.choice(empty_tiles)
+        return self.rng.choice(ai_pieces)
+
+    def attach_game(self, game: GameLogic, owner: int) -> None:
+        self.game = game
+        self.owner = owner
+
+    def play_live_turn(self) -> Tuple[int, int]:
+        assert self.game is not None
+        pieces: List[Tuple[int, int]] = self.game._get_pieces_of(self.owner)
+        return self.play_turn(current_game_board=self.game.get_board(), ai_pieces=pieces)
+
+
+def row_name(index: int) -> str:
+    """
+        The letters for a row, counting from 0: A to Z, then AA, AB and so on like spreadsheet coloumns.
+    """
+    name: str = ''
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+def row_number(name: str) -> int:
+    # The other way around, but counting from 1 like the coloumn numbers people type in
+    number: int = 0
+    for letter in name.upper():
+        number = number * 26 + (ord(letter) - ord('A') + 1)
+    return number
+
+
+def parse_coordinates(input_string: str, rows: int, coloumns: int) -> Tuple[int, int]:
+    """
+        Reads a tile typed as letters for the row and a number for the coloumn, in either order,
+        like "A1", "c 4", "2 B" or "AA12". Case, spaces and tabs don't matter.
+        Returns (row, coloumn) counting from 1, or (-1, -1) if it isn't a tile on the board.
+    """
+    found: re.Match | None = re.fullmatch(r'([A-Z]+)([0-9]+)|([0-9]+)([A-Z]+)', ''.join(input_string.upper().split()))
+    if found is None:
+        return (-1, -1)
+    letters: str = found.group(1) or found.group(4)
+    digits: str = found.group(2) or found.group(3)
+    row: int = row_number(letters)
+    coloumn: int = int(digits)
+    if (0 < row <= rows) and (0 < coloumn <= coloumns):
+        return (row, coloumn)
+    return (-1, -1)
 
 
 class ConsoleDisplay:
@@ -599,17 +2551,25 @@ class ConsoleDisplay:
     # I'm sorry if colored print lines give you complaints from your type checker
     # It's fine as strings so long as you give it colors that the termcolor module recognises
 
-    def __init__(self, rows: int, coloumns: int, spaces: str = '  ', color_white: str = 'blue', color_black: str = 'red', color_empty: str = 'dark_grey') -> None:
+    STATUS_LINES: int = 4
+    # Lines kept free under the board for the turn, the input and a bad input message
+
+    HEAT_SHADES: List[str] = ['  ', '░░', '▒▒', '▓▓', '██']
+    # One heat map square for every fifth of the most pieces a block of tiles could hold
+
+    def __init__(self, rows: int, coloumns: int, spaces: str = '  ', color_white: str = 'blue', color_black: str = 'red', color_empty: str = 'dark_grey', tick_delay: float = 0.5, heat_map: bool = False) -> None:
         self.spaces: str = spaces
+        self.tick_delay: float = tick_delay
+        # How long each explosion wave stays on screen
         self.rows: int = rows
         self.coloumns: int = coloumns
-        assert ((0 < coloumns) and (coloumns < 10))  # Ensure that the X axis doesn't go into double digits
-        assert ((0 < rows) and (rows < 27))  # Ensure that the Y axis fits in the English alphabet
+        assert ((0 < coloumns) and (0 < rows))
         assert ((rows + coloumns) > 2)  # Ensure there's at least a 1 by 2
+        # Boards bigger than the screen are shown through a viewport, see _view
         self.color_white: str = color_white
         self.color_black: str = color_black
         self.color_empty: str = color_empty
-        self._ALPHABET_NAMING: List[str] = [chr(alpha) for alpha in range(ord('A'), ord('A')+rows)]
+        self._ALPHABET_NAMING: List[str] = [row_name(row) for row in range(rows)]
         # TODO:
         # -- MOST IMPORTANTLY: Start working on an actual window UI instead of terminal UI
         # - Make these styles options
@@ -621,99 +2581,245 @@ class ConsoleDisplay:
         # self.BLACK_PIECES: List[str] = [' ⚀ ', ' ⚁ ', ' ⚂ ', ' ⚃ ']
         self.BLACK_PIECES: List[str] = ['一 ', '二 ', '三 ', '四 ']
         if os.name == "nt":  # Is Windows
-            self.clear_command: str = 'cls'
             self.win_text_attributes: List[str] = []
             try:
                 os.system('color')
+                # This also turns on the escape codes the screen is drawn with
             except OSError:
                 print('[#] The command prompt failed to set colors.')
                 print('[#] Running without colors.')
                 sleep(1)
         else:
             self.win_text_attributes: List[str] = ['bold']
-            self.clear_command: str = 'clear'
         self.clear_method: Callable = self.no_clear_screen
+        self.differential: bool = False
+        # If only the tiles that changed get redrawn, only works when the screen is cleared
+
+        self._cell_strings: List[str] = [colored(' O ', self.color_empty)] * 5
+        for pieces, color in ((self.WHITE_PIECES, self.color_white), (self.BLACK_PIECES, self.color_black)):
+            self._cell_strings += [colored(pieces[count - 1], color) for count in range(5)]
+        # What every tile looks like, indexed by owner * 5 + count (counts over 4 look like a 4)
+        # An owned 0 can't happen in a game, it's drawn like the old draw did with pieces[-1]
+        self._heat_strings: List[str] = [colored(shade, color) for color in (self.color_empty, self.color_white, self.color_black)
+                                         for shade in self.HEAT_SHADES]
+        # Same for the heat map, indexed by (whoever has more pieces in the block) * 5 + shade
+
+        self.heat_map: bool = heat_map
+        self.view_top: int = 0
+        self.view_left: int = 0
+        # The first row and coloumn in the viewport, moved with the w a s d commands in terminal_input
+        self._drawn: tp.NDArray[np.int8] | None = None
+        # What's on screen right now, as indices into _cell_strings (or _heat_strings for the heat map)
+        self._drawn_view: Tuple | None = None
+        # The _view it was drawn with, anything else needs the whole screen drawn again
+        self._game: GameLogic | None = None
+        # The last game drawn, so moving the viewport can draw it again
+        self._turn_text: str = ''
         return
 
+    def _terminal_size(self) -> Tuple[int, int]:
+        # (coloumns, lines), 0s if the output isn't a terminal
+        size: os.terminal_size = shutil.get_terminal_size((0, 0))
+        return (size.columns, size.lines)
+
+    def _row_label_width(self) -> int:
+        return len(self._ALPHABET_NAMING[-1])
+
+    def _row_prefix(self, row: int) -> str:
+        return self.spaces + self._ALPHABET_NAMING[row].rjust(self._row_label_width()) + self.spaces + "|" + self.spaces
+
+    def _view(self) -> Tuple[bool, int, int, int, int, int, int]:
+        """
+            What part of the board goes on screen:
+                (heat map or not, top row, left coloumn, rows shown, coloumns shown, rows per block, coloumns per block)
+            On the board every tile is its own block, the heat map squeezes the whole board onto the screen.
+        """
+        screen_coloumns, screen_lines = self._terminal_size()
+        free_lines: int = screen_lines - self.STATUS_LINES - 3  # The 2 header lines and the line about the view
+        free_coloumns: int = screen_coloumns - len(self._row_prefix(0))
+        if self.heat_map:
+            shown_rows: int = max(1, free_lines) if screen_lines else 40
+            shown_coloumns: int = max(1, free_coloumns // 2) if screen_coloumns else 40
+            block_rows: int = -(-self.rows // shown_rows)
+            block_coloumns: int = -(-self.coloumns // shown_coloumns)
+            return (True, 0, 0, -(-self.rows // block_rows), -(-self.coloumns // block_coloumns), block_rows, block_coloumns)
+        shown_rows: int = min(self.rows, max(1, free_lines // 2)) if screen_lines else self.rows
+        shown_coloumns: int = min(self.coloumns, max(1, (free_coloumns + len(self.spaces)) // (3 + len(self.spaces)))) if screen_coloumns else self.coloumns
+        self.view_top = min(max(self.view_top, 0), self.rows - shown_rows)
+        self.view_left = min(max(self.view_left, 0), self.coloumns - shown_coloumns)
+        return (False, self.view_top, self.view_left, shown_rows, shown_coloumns, 1, 1)
+
+    def _header(self, left: int, shown_coloumns: int) -> str:
+        numberings: List[str] = []
+        for num in range(left, left + shown_coloumns):
+            n: str = str(num + 1)
+            l: int = len(n)
+            if l == 1:
+                n = ' ' + n + ' '
+            elif l == 2:
+                n = n[0] + ' ' + n[1]
+            elif l > 3:
+                n = n[-3:]  # Only the end fits, the line about the view says where it starts
+            numberings.append(n)
+        first_line: str = self.spaces + "X".rjust(self._row_label_width()) + self.spaces + "|" + self.spaces + self.spaces.join(numberings)
+        return first_line + '\n' + '-'*len(first_line) + '\n'
+
+    def _heat_header(self, view: Tuple[bool, int, int, int, int, int, int]) -> str:
+        # The number of the first coloumn in every fifth block
+        _, _, _, _, shown_coloumns, _, block_coloumns = view
+        numbers: List[str] = [' '] * (2 * shown_coloumns)
+        for block in range(0, shown_coloumns, 5):
+            label: str = str(block * block_coloumns + 1)
+            if 2 * block + len(label) <= len(numbers):
+                numbers[2 * block:2 * block + len(label)] = list(label)
+        first_line: str = self.spaces + "X".rjust(self._row_label_width()) + self.spaces + "|" + self.spaces + ''.join(numbers)
+        return first_line + '\n' + '-'*len(first_line) + '\n'
+
+    def _view_text(self, view: Tuple[bool, int, int, int, int, int, int]) -> str:
+        heat_map, top, left, shown_rows, shown_coloumns, block_rows, block_coloumns = view
+        if heat_map:
+            return (f"Heat map of the {self.rows}x{self.coloumns} board, every square is {block_rows}x{block_coloumns} tiles "
+                    f"and darker has more pieces. 'map' goes back to the tiles\n")
+        if (shown_rows, shown_coloumns) == (self.rows, self.coloumns):
+            return '\n'
+        return (f"Rows {self._ALPHABET_NAMING[top]}-{self._ALPHABET_NAMING[top + shown_rows - 1]}, coloumns {left + 1}-{left + shown_coloumns}"
+                f" of {self.rows}x{self.coloumns}. Move with w a s d, 'go B12' or 'map' for a heat map\n")
+
+    def _cell_codes(self, gameboard: tp.NDArray, owners: tp.NDArray) -> tp.NDArray[np.int8]:
+        return (np.asarray(owners, dtype=np.int8) * 5 + np.minimum(gameboard, 4)).astype(np.int8)
+
+    def _heat_codes(self, gameboard: tp.NDArray, owners: tp.NDArray, view: Tuple[bool, int, int, int, int, int, int]) -> tp.NDArray[np.int8]:
+        # Adds up every block's pieces for each player at once, shade is how full the block is
+        _, _, _, shown_rows, shown_coloumns, block_rows, block_coloumns = view
+        padded: Tuple[Tuple[int, int], Tuple[int, int]] = ((0, shown_rows * block_rows - self.rows), (0, shown_coloumns * block_coloumns - self.coloumns))
+        counts: tp.NDArray[np.int64] = np.pad(np.asarray(gameboard, dtype=np.int64), padded)
+        owned: tp.NDArray[np.int8] = np.pad(np.asarray(owners, dtype=np.int8), padded)
+        white: tp.NDArray[np.int64] = np.where(owned == 1, counts, 0).reshape(shown_rows, block_rows, shown_coloumns, block_coloumns).sum(axis=(1, 3))
+        black: tp.NDArray[np.int64] = np.where(owned == 2, counts, 0).reshape(shown_rows, block_rows, shown_coloumns, block_coloumns).sum(axis=(1, 3))
+        shade: tp.NDArray[np.int64] = np.minimum(-(-(white + black) * 4 // (3 * block_rows * block_coloumns)), 4)
+        leader: tp.NDArray[np.int64] = np.where(white > black, 1, np.where(black > white, 2, 0))
+        return (leader * 5 + shade).astype(np.int8)
+
+    def _full_frame(self, codes: tp.NDArray[np.int8], view: Tuple[bool, int, int, int, int, int, int] | None = None) -> str:
+        # The whole board (or what fits of it) as one string, so it goes out in a single write
+        if view is None:
+            view = (False, 0, 0, self.rows, self.coloumns, 1, 1)
+        heat_map, top, left, _, shown_coloumns, block_rows, _ = view
+        if heat_map:
+            cells: List[str] = self._heat_strings
+            lines: List[str] = [self._heat_header(view)]
+            for row_i, row in enumerate(codes.tolist()):
+                lines.append(self._row_prefix(row_i * block_rows) + ''.join([cells[code] for code in row]) + '\n')
+        else:
+            cells: List[str] = self._cell_strings
+            lines: List[str] = [self._header(left, shown_coloumns)]
+            for row_i, row in enumerate(codes.tolist()):
+                lines.append(self._row_prefix(top + row_i) + self.spaces.join([cells[code] for code in row]) + '\n\n')
+        lines.append(self._view_text(view))
+        return ''.join(lines)
+
+    def _frame_lines(self, view: Tuple[bool, int, int, int, int, int, int]) -> int:
+        # How many lines _full_frame takes up
+        return 3 + (view[3] if view[0] else 2 * view[3])
+
+    def _changed_cells(self, codes: tp.NDArray[np.int8], view: Tuple[bool, int, int, int, int, int, int]) -> str:
+        # Moves the cursor to every tile that's different from what's on screen and draws just that tile,
+        # then goes back under the board and clears whatever was written there last time
+        assert self._drawn is not None
+        heat_map: bool = view[0]
+        changed: List[List[int]] = np.argwhere(codes != self._drawn).tolist()
+        cells: List[str] = self._heat_strings if heat_map else self._cell_strings
+        first_coloumn: int = len(self._row_prefix(0)) + 1
+        line_step: int = 1 if heat_map else 2
+        cell_width: int = 2 if heat_map else 3 + len(self.spaces)
+        moves: List[str] = [f"\033[{3 + line_step * row_i};{first_coloumn + coloumn_i * cell_width}H" + cells[codes[row_i, coloumn_i]]
+                            for row_i, coloumn_i in changed]
+        return ''.join(moves) + f"\033[{self._frame_lines(view) + 1};1H\033[J"
+
+    def _fits_terminal(self, view: Tuple[bool, int, int, int, int, int, int]) -> bool:
+        # Drawing in place only works if the board and the lines under it fit on the screen without scrolling
+        screen_lines: int = self._terminal_size()[1]
+        return (screen_lines == 0) or (screen_lines >= self._frame_lines(view) + self.STATUS_LINES)
+
     def draw(self, gameboard: List[List[int]], white_pieces: List[Tuple[int, int]], black_pieces: List[Tuple[int, int]], board_size: Tuple[int, int]) -> bool:
-        try:
-            if (self.rows, self.coloumns) != board_size:
-                print(" BOARD DOESN'T MATCH WITH PROVIDED SIZES FOR THIS CLASS ")
-                raise IndexError
-            numberings: List[str] = []
-            for num in range(0, board_size[1]):
-                n: str = str(num + 1)
-                l: int = len(n)
-                if l == 1:
-                    n = ' ' + n + ' '
-                elif l == 2:
-                    n = n[0] + ' ' + n[1]
-                numberings.append(n)
-            first_line: str = self.spaces + "X" + self.spaces + "|" + self.spaces + self.spaces.join(numberings)
-            print(first_line)
-            print('-'*len(first_line))
-            for row_i, row in enumerate(gameboard):
-                print(self.spaces + self._ALPHABET_NAMING[row_i] + self.spaces + "|" + self.spaces, end='')
-                for coloumn_i, item in enumerate(row):
-                    draw_element: str = ' O '
-                    piece_value: int = item - 1  # 1 2 3 4  -->  0 1 2 3
-                    if piece_value > 3:
-                        piece_value = 3
-                    your_i: Tuple[int, int] = (row_i, coloumn_i)
-                    if your_i in white_pieces:
-                        draw_element = colored(self.WHITE_PIECES[piece_value], self.color_white)
-                    elif your_i in black_pieces:
-                        draw_element = colored(self.BLACK_PIECES[piece_value], self.color_black)
-                    else:
-                        draw_element = colored(draw_element, self.color_empty)
-                    print(draw_element, end='')
-                    if coloumn_i == (board_size[1] - 1):
-                        print('\n\n', end='')
-                        continue
-                    print(self.spaces, end='')
-            sys.stdout.flush()
-            return True
-        except IndexError:
+        if (self.rows, self.coloumns) != board_size:
+            print(" BOARD DOESN'T MATCH WITH PROVIDED SIZES FOR THIS CLASS ")
             return False
+        owners: tp.NDArray[np.int8] = np.zeros(board_size, dtype=np.int8)
+        if len(black_pieces) > 0:
+            owners[tuple(np.array(black_pieces).T)] = 2
+        if len(white_pieces) > 0:
+            owners[tuple(np.array(white_pieces).T)] = 1
+        sys.stdout.write(self._full_frame(self._cell_codes(np.array(gameboard), owners)))
+        sys.stdout.flush()
+        self._drawn = None
+        return True
 
     def clear_screen(self) -> None:
-        try:
-            os.system(self.clear_command)
-            return
-        except os.error:
-            print("[#] CANT CLEAR SCREEN, LAUNCH WITH --no-clear-screen")
-            exit(0)
+        sys.stdout.write("\033[2J\033[H")
+        return
 
     def no_clear_screen(self) -> None:
         print("\n\n")
 
     def figure_clearing_method(self, should_clear: bool = True) -> None:
         self.clear_method = (self.clear_screen if should_clear else self.no_clear_screen)
+        self.differential = should_clear
         return
 
     def draw_tick(self, GameLogicObject: GameLogic) -> None:
-        board: List[List[int]] = GameLogicObject.get_board()
-        board_size: Tuple[int, int] = GameLogicObject.get_board_size()
-        whites: List[Tuple[int, int]] = GameLogicObject.get_whites()
-        blacks: List[Tuple[int, int]] = GameLogicObject.get_blacks()
-        self.clear_method()
-        self.draw(board, whites, blacks, board_size)
+        if GameLogicObject.get_board_size() != (self.rows, self.coloumns):
+            print(" BOARD DOESN'T MATCH WITH PROVIDED SIZES FOR THIS CLASS ")
+            return
+        self._game = GameLogicObject
+        view: Tuple[bool, int, int, int, int, int, int] = self._view()
+        heat_map, top, left, shown_rows, shown_coloumns, _, _ = view
+        if heat_map:
+            codes: tp.NDArray[np.int8] = self._heat_codes(GameLogicObject.board, GameLogicObject.owners, view)
+        else:
+            # Only the tiles in the viewport get looked at, however big the board is
+            codes: tp.NDArray[np.int8] = self._cell_codes(GameLogicObject.board[top:top + shown_rows, left:left + shown_coloumns],
+                                                          GameLogicObject.owners[top:top + shown_rows, left:left + shown_coloumns])
+        if self.differential and (self._drawn is not None) and (view == self._drawn_view) and self._fits_terminal(view):
+            frame: str = self._changed_cells(codes, view)
+        else:
+            self.clear_method()
+            frame: str = self._full_frame(codes, view)
+        sys.stdout.write(frame)
+        sys.stdout.flush()
+        self._drawn = codes if self.differential else None
+        self._drawn_view = view
+        return
+
+    def move_view(self, rows: int, coloumns: int) -> None:
+        # Scrolls the viewport, it gets kept on the board when it's next drawn
+        self.view_top += rows
+        self.view_left += coloumns
+        return
+
+    def center_view(self, row: int, coloumn: int) -> None:
+        # Puts a tile (counting from 0) in the middle of the viewport and goes back to showing tiles
+        self.heat_map = False
+        _, _, _, shown_rows, shown_coloumns, _, _ = self._view()
+        self.view_top = row - shown_rows // 2
+        self.view_left = coloumn - shown_coloumns // 2
         return
 
     def show_rules(self) -> None:
-        print(r'=--+--> Moves should be formatted similar to   "A1"   "c 4"   "2 B"')
+        self._drawn = None  # The rules can scroll the board off the screen, the next tick draws it all again
+        print(r'=--+--> Moves should be formatted similar to   "A1"   "c 4"   "2 B"   "AA12"')
         print(r"   |  ")
-        print(r"   |--> One alphabet and one number")
+        print(r"   |--> Letters for the row and a number for the coloumn")
         print(r"   |  ")
-        print(r"   |--> The numbers start from 1")
+        print(r"   |--> The numbers start from 1, rows after Z go AA, AB...")
         print(r"   |  ")
         print(r"   |---> The order, beging uppercase, and spaces between or around")
         print(r"   |   \-> does not matter.")
         print(r"   |  ")
-        print(r"   |--> Press Control+C to quit")
-        print(r"   |  ")
-        print(r"   |  ")
+        print(r"   |--> If the board doesn't fit, move around it with w a s d,")
+        print(r"   |   \-> 'go B12' to jump to a tile and 'map' for a heat map of the whole thing")
         print(r"   |  ")
+        print(r"   |--> Press Control+C to quit")
         print(r"   |  ")
         print(r"  _^_ ")
         print(r"   \\------> Understood?")
@@ -726,12 +2832,28 @@ class ConsoleDisplay:
         else:
             print(colored(" [PLAYER 2] WINS ! ", self.color_black, attrs=self.win_text_attributes))
 
+    def wait_tick(self) -> None:
+        # GameLogic doesn't wait on its own anymore, the pauses between explosion waves are done here
+        sleep(self.tick_delay)
+        return
+
+    def show_ai_thinking(self) -> None:
+        print("AI is thinking.", end='', flush=True)
+        sleep(0.333)
+        print('.', end='', flush=True)
+        sleep(0.333)
+        print('.', end='', flush=True)
+        sleep(0.333)
+        return
+
     def display_turn(self, is_white_turn: bool, is_autotick: bool) -> None:
+        self._turn_text = ''
         if not is_autotick:
             if is_white_turn:
-                print(colored("Player 1's turn", self.color_white))
+                self._turn_text = colored("Player 1's turn", self.color_white)
             else:
-                print(colored("Player 2's turn", self.color_black))
+                self._turn_text = colored("Player 2's turn", self.color_black)
+            print(self._turn_text)
         return
 
     def _handle_improper_input(self) -> Tuple[int, int]:
@@ -739,53 +2861,39 @@ class ConsoleDisplay:
 
     def process_input(self, input_string: str) -> Tuple[int, int]:
         """
-            Gets a string with only 2 valid characters
-            as the index of the piece in question
-            with an alphabetical index for the rows
-            and a numerical index for the coloumns
+            Gets a string with the index of the piece in question
+            with an alphabetical index for the rows (A to Z then AA, AB...)
+            and a numerical index for the coloumns, in either order
             (spaces and tabs dont matter)
+            Both start from 1, (-1, -1) if it's not on the board
         """
-        input_: str = input_string.upper()
-        input_ = ''.join(input_.strip().split(' '))
-        if len(input_) != 2:
+        row, coloumn = parse_coordinates(input_string, self.rows, self.coloumns)
+        if row == -1:
             return self._handle_improper_input()
-        first_char: str = input_[0]
-        second_char: str = input_[1]
-        first_i: int = -1
-        second_i: int = -1
-        first_was_alpha: bool = True
-
-        try:
-            first_i = self._ALPHABET_NAMING.index(first_char) + 1
-        except ValueError:
-            first_was_alpha = False
-            try:
-                first_i = self._ALPHABET_NAMING.index(second_char) + 1
-            except ValueError:
-                return self._handle_improper_input()
-
-        if first_was_alpha:
-            try:
-                second_guy: int = int(second_char)
-                # first one was rows, this is coloumns
-                if second_guy > 0 and second_guy <= self.coloumns:
-                    second_i = second_guy
-                else:
-                    raise ValueError
-            except ValueError:  # From the cast of string to int
-                return self._handle_improper_input()
+        return (row, coloumn)
+
+    def _process_view_command(self, input_string: str) -> bool:
+        # Moves the viewport if the input was one of the view commands instead of a move, and draws the board again
+        command: str = input_string.strip().lower()
+        _, _, _, shown_rows, shown_coloumns, _, _ = self._view()
+        if command in ('w', 'a', 's', 'd'):
+            self.heat_map = False
+            steps: Dict[str, Tuple[int, int]] = {'w': (-1, 0), 'a': (0, -1), 's': (1, 0), 'd': (0, 1)}
+            self.move_view(steps[command][0] * max(1, shown_rows // 2), steps[command][1] * max(1, shown_coloumns // 2))
+        elif command == 'map':
+            self.heat_map = not self.heat_map
+        elif command.startswith('go '):
+            row, coloumn = parse_coordinates(command[3:], self.rows, self.coloumns)
+            if row == -1:
+                return False
+            self.center_view(row - 1, coloumn - 1)
         else:
-            try:
-                second_guy: int = int(first_char)
-                # second one was rows, this is coloumns
-                if second_guy > 0 and second_guy <= self.coloumns:
-                    second_i = second_guy
-                else:
-                    raise ValueError
-            except ValueError:  # From the cast of string to int
-                return self._handle_improper_input()
-
-        return (first_i, second_i)
+            return False
+        if self._game is not None:
+            self.draw_tick(self._game)
+            if self._turn_text:
+                print(self._turn_text)
+        return True
 
     def _get_commandline_input(self, text: str = "Your Move: "):
         return input(text)
@@ -800,9 +2908,13 @@ class ConsoleDisplay:
         if state > 0:
             text = bad_text
         input_: str = self._get_commandline_input(text=text)
+        while self._process_view_command(input_):
+            input_ = self._get_commandline_input(text=def_text)
         output: Tuple[int, int] = self.process_input(input_)
         while output[0] == -1 or output[1] == -1:
             input_: str = self._get_commandline_input(text=bad_text)
+            while self._process_view_command(input_):
+                input_ = self._get_commandline_input(text=def_text)
             output = self.process_input(input_)
         output = (output[0] - 1, output[1] - 1)
         return output
@@ -818,24 +2930,85 @@ def main(launch_args: List[str]) -> int:
     player_white_color = 'blue'
     player_black_color = 'yellow'
 
-    MainGame: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
-    MainDisplay: ConsoleDisplay = ConsoleDisplay(rows=rows, coloumns=coloumns, spaces=' '*4, color_white=player_white_color, color_black=player_black_color)
-
     should_clear: bool = True
+    heat_map: bool = False
+    tick_delay: float = 0.5
     do_black_ai: bool = False
     do_white_ai: bool = False
     do_random_ai: bool = False
-    for string in launch_args:
-        string = string.strip().lower()
+    do_search_ai: bool = False
+    do_mcts_ai: bool = False
+    search_time: float = 1.0
+    record_path: str = ''
+    metrics_path: str = ''
+    game_seed: int = int(np.random.SeedSequence().entropy) % 2**64
+    # Saved with the game record and printed at the end, --seed plays the same random choices again
+    for launch_arg in launch_args:
+        string: str = launch_arg.strip().lower()
         if string == '--no-clear-screen':
             should_clear = False
+        elif string.startswith('--size='):
+            # Like --size=26x9 for 26 rows and 9 coloumns, boards that don't fit get a viewport
+            try:
+                rows, coloumns = [int(side) for side in string.partition('=')[2].split('x')]
+            except ValueError:
+                print("[#] --size needs rows and coloumns, like --size=26x9")
+                return 1
+        elif string == '--heat-map':
+            # Starts out showing the whole board squeezed down instead of the tiles, 'map' switches between them
+            heat_map = True
+        elif string.startswith('--tick-delay='):
+            # Seconds between explosion waves, long chain reactions on big boards want less
+            try:
+                tick_delay = float(string.partition('=')[2])
+            except ValueError:
+                print("[#] --tick-delay needs a number of seconds, like --tick-delay=0.1")
+                return 1
         elif string == '--player2-ai':
             do_black_ai = True
         elif string == '--player1-ai':
             do_white_ai = True
         elif string == '--ai':
             do_random_ai = True
+        elif string == '--search-ai':
+            # The AI players look ahead with SearchAIPlayer instead
+            do_search_ai = True
+        elif string == '--mcts-ai':
+            # Or with MCTSPlayer on every core, --search-time is its time per move too
+            do_mcts_ai = True
+        elif string.startswith('--search-time='):
+            try:
+                search_time = float(string.partition('=')[2])
+            except ValueError:
+                print("[#] --search-time needs a number of seconds, like --search-time=0.5")
+                return 1
+        elif string.startswith('--seed='):
+            try:
+                game_seed = int(string.partition('=')[2])
+                assert 0 <= game_seed < 2**64
+            except (ValueError, AssertionError):
+                print("[#] --seed needs a whole number from 0 to 2^64 - 1, like --seed=12345")
+                return 1
+        elif string.startswith('--record='):
+            # The game gets added to this game record file at the end, see game_records.py
+            record_path = launch_arg.strip().partition('=')[2]
+        elif string == '--metrics':
+            # Shows where the engine and the AI spent their time at the end of the game
+            metrics.enable()
+        elif string.startswith('--metrics='):
+            # Same, and saves it all as JSON too
+            metrics.enable()
+            metrics_path = launch_arg.strip().partition('=')[2]
 
+    try:
+        MainGame: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+    except ValueError as error:
+        print(f"[#] {error}")
+        return 1
+    MainDisplay: ConsoleDisplay = ConsoleDisplay(rows=rows, coloumns=coloumns, spaces=' '*4 if coloumns < 10 else ' ',
+                                                 color_white=player_white_color, color_black=player_black_color,
+                                                 tick_delay=tick_delay, heat_map=heat_map)
+    # Bigger boards get less space between tiles so more of them fit
     MainDisplay.figure_clearing_method(should_clear=should_clear)
 
     MainDisplay.draw_tick(GameLogicObject=MainGame)
@@ -844,12 +3017,25 @@ def main(launch_args: List[str]) -> int:
     i_method_: Callable = MainDisplay.terminal_input
     if do_random_ai:
         # I can also add 'or (do_black_ai and do_white_ai)' but I think it'll be fun to see how AIs play each other
-        do_black_ai = (getrandbits(1) == 1)
+        do_black_ai = (derive_seed(game_seed, SEED_STREAM_SIDES) & 1 == 1)
         do_white_ai = not do_black_ai
-    white_ai: AIPlayer = AIPlayer()
-    black_ai: AIPlayer = AIPlayer()
+    make_ai: Callable = lambda stream: AIPlayer()
+    if do_search_ai:
+        make_ai = lambda stream: SearchAIPlayer(time_budget=search_time)
+    elif do_mcts_ai:
+        make_ai = lambda stream: MCTSPlayer(time_budget=search_time, workers=os.cpu_count() or 1,
+                                            seed=derive_seed(game_seed, stream))
+    white_ai: AIPlayer | SearchAIPlayer | MCTSPlayer | None = make_ai(SEED_STREAM_WHITE) if do_white_ai else None
+    black_ai: AIPlayer | SearchAIPlayer | MCTSPlayer | None = make_ai(SEED_STREAM_BLACK) if do_black_ai else None
+    # Only the sides an AI plays get one, an AI that never moves would never read the change log and it'd never get trimmed
+    if white_ai is not None:
+        white_ai.attach_game(MainGame, 1)
+    if black_ai is not None:
+        black_ai.attach_game(MainGame, 2)
     ai_move: Tuple[int, int] = (0, 0)
     # These won't do anything unless an AI is active from the launch params
+    moves_played: List[Tuple[int, int]] = []
+    move_played: Tuple[int, int] | None = None
 
     game_run: bool = True
     winner_white: bool = True
@@ -860,33 +3046,24 @@ def main(launch_args: List[str]) -> int:
 
         MainDisplay.display_turn(is_white_turn=MainGame.get_white_turn(), is_autotick=MainGame.next_autotick)
 
-        # TODO:
-        # -- Move the "AI is thinking" to a proper function in ConsoleDisplay
-
         if MainGame.next_autotick:
-            MainGame.do_valid_move(i_method_)
-        elif MainGame.get_white_turn() and do_white_ai:
-            print("AI is thinking.", end='', flush=True)
-            sleep(0.333)
-            print('.', end='', flush=True)
-            sleep(0.333)
-            print('.', end='', flush=True)
-            sleep(0.333)
-            ai_move = white_ai.play_turn(current_game_board=MainGame.get_board(), ai_pieces=MainGame.get_whites())
+            MainGame.autotick()
+            MainDisplay.wait_tick()
+        elif MainGame.get_white_turn() and (white_ai is not None):
+            MainDisplay.show_ai_thinking()
+            ai_move = white_ai.play_live_turn()
             dummy_input: Callable = lambda _: ai_move
-            MainGame.do_valid_move(dummy_input)
-        elif (not MainGame.get_white_turn()) and do_black_ai:
-            print("AI is thinking.", end='', flush=True)
-            sleep(0.333)
-            print('.', end='', flush=True)
-            sleep(0.333)
-            print('.', end='', flush=True)
-            sleep(0.333)
-            ai_move = black_ai.play_turn(current_game_board=MainGame.get_board(), ai_pieces=MainGame.get_blacks())
+            move_played = MainGame.do_valid_move(dummy_input)
+        elif (not MainGame.get_white_turn()) and (black_ai is not None):
+            MainDisplay.show_ai_thinking()
+            ai_move = black_ai.play_live_turn()
             dummy_input: Callable = lambda _: ai_move
-            MainGame.do_valid_move(dummy_input)
+            move_played = MainGame.do_valid_move(dummy_input)
         else:
-            MainGame.do_valid_move(i_method_)
+            move_played = MainGame.do_valid_move(i_method_)
+        if move_played is not None:
+            moves_played.append(move_played)
+            move_played = None
 
         winner: int = MainGame.check_gameover()
         match winner:
@@ -902,12 +3079,31 @@ def main(launch_args: List[str]) -> int:
     # Continue for a few more ticks after the game is over for the potentially satisfying spread animation!
     MainDisplay.draw_tick(GameLogicObject=MainGame)
     while ((ending_ticks > 0) and (MainGame.next_autotick)):
-        MainGame.do_valid_move(i_method_)
+        MainGame.autotick()
+        MainDisplay.wait_tick()
         MainDisplay.draw_tick(GameLogicObject=MainGame)
         ending_ticks = ending_ticks - 1
 
+    if record_path:
+        from game_records import GameRecord, GameRecordWriter  # Not at the top since it imports this file
+        with GameRecordWriter(record_path) as record_writer:
+            record_writer.write(GameRecord(game_seed, rows, coloumns, moves_played))
+
+    for ai_player in (white_ai, black_ai):
+        if isinstance(ai_player, MCTSPlayer):
+            ai_player.close()
+
     MainDisplay.give_win(winner_white)
 
+    if metrics.enabled:
+        print()
+        for line in metrics.summary():
+            print(f"[#] {line}")
+        if metrics_path:
+            metrics.dump_json(metrics_path)
+
+    if do_white_ai or do_black_ai:
+        print(f"[#] Game seed {game_seed}, --seed={game_seed} gives the AIs the same random choices again")
     print('\n\n')
 
     return 0
@@ -0,0 +1,164 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Dict, Callable
+from multiprocessing import Pool
+from numpy import typing as tp
+from time import perf_counter
+
+import numpy as np
+import sys
+import os
+
+from main import GameLogic, OpeningBook
+from game_records import FILE_HEADER, GameRecord, read_game_records
+
+
+# Makes an OpeningBook for AIPlayer out of the game record files of self-play games.
+# For the first --plies plies of every finished game it counts how often each move was played from each position
+# and how often whoever played it went on to win, then keeps the best move of every position in the book.
+# Running it again on the same book only reads the games that got added to the record files since,
+# and adds them to the counts already in the book.
+#
+# Usage:
+#   python tournament.py --games=5000 --openings=4 --records=games.clgr
+#   python opening_book.py --size=5x5 --output=5x5.book games.clgr
+#   python tournament.py --book=5x5.book
+
+
+def game_statistics(task: Tuple[GameRecord, int]) -> tp.NDArray:
+    """
+        Replays a game and returns the statistics of its first max_plies moves.
+        The whole game is played to find out who won, games that didn't finish count for nothing.
+    """
+    record, max_plies = task
+    game: GameLogic = GameLogic(rows=record.rows, coloumns=record.coloumns)
+    keys: List[int] = []
+    moves: List[int] = []
+    movers: List[int] = []
+    result: int = 0
+    for ply, move in enumerate(record.moves):
+        if ply < max_plies:
+            keys.append(game.position_hash())
+            moves.append(move[0] * record.coloumns + move[1])
+            movers.append(game._current_owner())
+        result, _ = game.apply_move(move)
+    if result == 0:
+        return np.zeros(0, dtype=OpeningBook.STATISTICS_DTYPE)
+    statistics: tp.NDArray = np.zeros(len(keys), dtype=OpeningBook.STATISTICS_DTYPE)
+    statistics['key'] = np.array(keys, dtype=np.uint64)
+    statistics['move'] = moves
+    statistics['games'] = 1
+    statistics['wins'] = np.array(movers) == result
+    return statistics
+
+
+def update_book(output_path: str, archive_paths: List[str], rows: int, coloumns: int, max_plies: int, min_games: int,
+                workers: int = 1, chunk_games: int = 1024, log: Callable[[str], None] = lambda text: None) -> Dict[str, int]:
+    """
+        Adds the games in the record files that the book at output_path hasn't counted yet to it, making it if it isn't there.
+        Only games of the book's board size are counted.
+        Returns how many games were added and how big the book is now.
+        Raises ValueError if the book was made for another size or number of plies, or a record file got shorter.
+    """
+    statistics: List[tp.NDArray] = []
+    sources: Dict[str, int] = {}
+    games: int = 0
+    if os.path.exists(output_path):
+        book: OpeningBook = OpeningBook(output_path)
+        try:
+            assert (book.rows, book.coloumns, book.max_plies) == (rows, coloumns, max_plies)
+        except AssertionError as assertion_error:
+            raise ValueError(f"{output_path} is a {book.rows}x{book.coloumns} book of {book.max_plies} plies, "
+                             f"make a new one for {rows}x{coloumns} and {max_plies} plies") from assertion_error
+        statistics.append(np.array(book.statistics))
+        sources = dict(book.sources)
+        games = book.games
+        del book  # Lets go of the memory map before the file gets replaced
+
+    added_games: int = 0
+    # Only finished games, the ones that didn't finish are read past but don't count
+    with Pool(processes=workers) as pool:
+        for archive_path in archive_paths:
+            source: str = os.path.abspath(archive_path)
+            offset: int = sources.get(source, FILE_HEADER.size)
+            if os.path.getsize(archive_path) < offset:
+                raise ValueError(f"{archive_path} is shorter than when the book last read it, it can't be the same file")
+            chunk: List[Tuple[GameRecord, int]] = []
+            for record in read_game_records(archive_path, offset):
+                offset += record.byte_size()
+                if (record.rows, record.coloumns) == (rows, coloumns):
+                    chunk.append((record, max_plies))
+                if len(chunk) == chunk_games:
+                    chunk_statistics: List[tp.NDArray] = pool.map(game_statistics, chunk)
+                    statistics += chunk_statistics
+                    added_games += sum(1 for part in chunk_statistics if part.size > 0)
+                    chunk = []
+            chunk_statistics: List[tp.NDArray] = pool.map(game_statistics, chunk)
+            statistics += chunk_statistics
+            added_games += sum(1 for part in chunk_statistics if part.size > 0)
+            sources[source] = offset
+            log(f"[#] {archive_path}: read up to byte {offset}")
+
+    merged: tp.NDArray = OpeningBook.merge_statistics(np.zeros(0, dtype=OpeningBook.STATISTICS_DTYPE), *statistics)
+    OpeningBook.write(output_path, rows, coloumns, max_plies, min_games, merged, games + added_games, sources)
+    positions: int = len(OpeningBook.book_moves(merged, min_games)[0])
+    return {'added_games': added_games, 'games': games + added_games, 'positions': positions, 'statistics': len(merged)}
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    rows, coloumns = text.split('x')
+    return (int(rows), int(coloumns))
+
+
+def main(launch_args: List[str]) -> int:
+    rows: int = 5
+    coloumns: int = 5
+    output_path: str = ''
+    max_plies: int = 12
+    min_games: int = 4
+    workers: int = os.cpu_count() or 1
+    archive_paths: List[str] = []
+
+    for string in launch_args[1:]:
+        string = string.strip()
+        if not string.startswith('--'):
+            archive_paths.append(string)
+            continue
+        key, _, value = string.partition('=')
+        key = key.lower()  # Only the option, the value could be a file path
+        try:
+            match key:
+                case '--size':
+                    rows, coloumns = _parse_size(value.lower())
+                case '--output':
+                    output_path = value
+                case '--plies':
+                    max_plies = int(value)
+                case '--min-games':
+                    min_games = int(value)
+                case '--workers':
+                    workers = int(value)
+                case _:
+                    print(f"[#] Unknown option {string}", file=sys.stderr)
+                    return 1
+        except ValueError:
+            print(f"[#] Bad value for {key}: '{value}'", file=sys.stderr)
+            return 1
+    if (output_path == '') or (archive_paths == []):
+        print("[#] Usage: python opening_book.py --output=BOOK [--size=5x5] [--plies=12] [--min-games=4] GAMES.clgr...", file=sys.stderr)
+        return 1
+
+    start_time: float = perf_counter()
+    try:
+        summary: Dict[str, int] = update_book(output_path, archive_paths, rows, coloumns, max_plies, min_games, workers,
+                                              log=lambda text: print(text, file=sys.stderr))
+    except (OSError, ValueError) as error:
+        print(f"[#] {error}", file=sys.stderr)
+        return 1
+    print(f"[#] Added {summary['added_games']} games in {perf_counter() - start_time:.2f}s, the book has {summary['positions']} positions "
+          f"from {summary['games']} games ({summary['statistics']} position and move pairs counted)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))
@@ -0,0 +1,225 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Dict
+from numpy import typing as tp
+
+import numpy as np
+import sys
+import os
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows doesn't have it, appends there only have O_APPEND keeping them apart
+
+from main import GameLogic, BoardStateData
+
+
+# An append-only file of positions from played games, for looking at self-play data in bulk.
+# It's a 16 byte header (magic, format version, rows, coloumns) followed by fixed-size records,
+# so the whole thing can be memory-mapped into a NumPy structured array without making any Python objects.
+# Every file holds one board size.
+#
+# Usage:
+#   store = PositionStore('positions.bin', 5, 5)
+#   store.add(game, move)  # before every move of a game
+#   store.end_game(winner)
+#   records, rows, coloumns = read_positions('positions.bin')
+#   boards, owners, to_move, first_moves = load_positions('puzzles.txt')  # or a position file
+
+
+MAGIC: int = 0x53504C43  # 'CLPS' when read as bytes
+FORMAT_VERSION: int = 1
+
+HEADER_DTYPE: np.dtype = np.dtype([('magic', '<u4'), ('version', '<u4'), ('rows', '<u4'), ('coloumns', '<u4')])
+
+
+def record_dtype(rows: int, coloumns: int) -> np.dtype:
+    """
+        The layout of one record for a board of this size:
+            board:       the tiles before the move, in BoardStateData.pack's format
+            to_move:     1 for white, 2 for black
+            first_moves: bit 0 is set if white still has their first move, bit 1 the same for black
+            move:        the move that was played, as a flat index (x * coloumns + y)
+            result:      check_gameover at the end of the game, 0 if it was cut off
+    """
+    return np.dtype([
+        ('board', np.uint8, ((rows * coloumns + 1) // 2,)),
+        ('to_move', np.uint8),
+        ('first_moves', np.uint8),
+        ('move', '<u4'),
+        ('result', np.int8),
+    ])
+
+
+class PositionStore:
+    """
+        Appends the positions of finished games to a position file, making it if it isn't there.
+        Positions are kept in memory until end_game, which writes the whole game as one locked append,
+        so any number of processes can write to the same file and every game stays in one piece.
+    """
+
+    def __init__(self, path: str, rows: int, coloumns: int) -> None:
+        self.path: str = path
+        self.rows: int = rows
+        self.coloumns: int = coloumns
+        self.dtype: np.dtype = record_dtype(rows, coloumns)
+        self.pending: List[Tuple] = []
+        self.games_written: int = 0
+        self.positions_written: int = 0
+
+        self._file: int = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        # The header is written under the lock so two processes making the file at once can't both write one
+        self._lock()
+        try:
+            if os.fstat(self._file).st_size == 0:
+                header: tp.NDArray = np.array([(MAGIC, FORMAT_VERSION, rows, coloumns)], dtype=HEADER_DTYPE)
+                os.write(self._file, header.tobytes())
+                file_size: Tuple[int, int] = (rows, coloumns)
+            else:
+                _, file_rows, file_coloumns = _read_header(path)
+                file_size: Tuple[int, int] = (file_rows, file_coloumns)
+        finally:
+            self._unlock()
+        try:
+            assert file_size == (rows, coloumns)
+        except AssertionError as assertion_error:
+            os.close(self._file)
+            raise ValueError(f"{path} holds {file_size[0]}x{file_size[1]} boards, not {rows}x{coloumns}") from assertion_error
+        return
+
+    def add(self, game: GameLogic, move: Tuple[int, int]) -> None:
+        """
+            Remembers the game's current position and the move about to be played in it.
+        """
+        first_moves: int = int(game.first_move_white) | (int(game.first_move_black) << 1)
+        self.pending.append((np.frombuffer(game.packed_board(), dtype=np.uint8), game._current_owner(),
+                             first_moves, move[0] * self.coloumns + move[1], 0))
+        return
+
+    def end_game(self, result: int) -> int:
+        """
+            Writes every position added since the last game with the game's result, returns how many there were.
+        """
+        records: tp.NDArray = np.array(self.pending, dtype=self.dtype)
+        records['result'] = result
+        self.pending = []
+        if len(records) == 0:
+            return 0
+        data: bytes = records.tobytes()
+        self._lock()
+        try:
+            written: int = 0
+            while written < len(data):
+                written += os.write(self._file, data[written:])
+        finally:
+            self._unlock()
+        self.games_written += 1
+        self.positions_written += len(records)
+        return len(records)
+
+    def close(self) -> None:
+        os.close(self._file)
+        return
+
+    def _lock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return
+
+    def _unlock(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        return
+
+
+def _read_header(path: str) -> Tuple[int, int, int]:
+    header: tp.NDArray = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+    try:
+        assert (len(header) == 1) and (header['magic'][0] == MAGIC)
+    except AssertionError as assertion_error:
+        raise ValueError(f"{path} isn't a position file") from assertion_error
+    if header['version'][0] != FORMAT_VERSION:
+        raise ValueError(f"{path} is format version {header['version'][0]}, this only reads version {FORMAT_VERSION}")
+    return (int(header['version'][0]), int(header['rows'][0]), int(header['coloumns'][0]))
+
+
+def read_positions(path: str) -> Tuple[tp.NDArray, int, int]:
+    """
+        Memory-maps every whole record in a position file, returns (records, rows, coloumns).
+        The records are read-only and only get loaded from disk as they're used,
+        so files far bigger than memory can be scanned or sampled.
+        A record that's still being written at the end of the file is left out.
+    """
+    _, rows, coloumns = _read_header(path)
+    dtype: np.dtype = record_dtype(rows, coloumns)
+    count: int = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // dtype.itemsize
+    if count == 0:
+        return (np.zeros(0, dtype=dtype), rows, coloumns)  # memmap can't map nothing
+    records: tp.NDArray = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_DTYPE.itemsize, shape=(count,))
+    return (records, rows, coloumns)
+
+
+def sample_positions(records: tp.NDArray, count: int, rng: np.random.Generator) -> tp.NDArray:
+    """
+        Picks count different records at random and reads only those into memory.
+    """
+    picked: tp.NDArray[np.int64] = np.sort(rng.choice(len(records), size=min(count, len(records)), replace=False))
+    # Sorted so the reads go through the file front to back
+    return np.asarray(records[picked])
+
+
+def unpack_records(records: tp.NDArray, rows: int, coloumns: int) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8]]:
+    """
+        The boards of a batch of records as (records, rows, coloumns) arrays of counts and owners.
+    """
+    return BoardStateData.unpack_many(records['board'], rows, coloumns)
+
+
+def load_positions(path: str) -> Tuple[tp.NDArray[np.int8], tp.NDArray[np.int8], tp.NDArray[np.uint8], tp.NDArray[np.uint8]]:
+    """
+        Loads every position in a position file or a text file of positions (see BoardStateData.from_text)
+        as (boards, owners, to_move, first_moves), with to_move and first_moves the same as in a record.
+        In a text file anyone without pieces still has their first move.
+        Ready for BatchGameLogic.load_positions, or GameLogic.load_position one at a time.
+    """
+    with open(path, 'rb') as position_file:
+        start: bytes = position_file.read(HEADER_DTYPE.itemsize)
+    if (len(start) == HEADER_DTYPE.itemsize) and (np.frombuffer(start, dtype=HEADER_DTYPE)['magic'][0] == MAGIC):
+        records, rows, coloumns = read_positions(path)
+        boards, owners = unpack_records(records, rows, coloumns)
+        return (boards, owners, np.asarray(records['to_move']), np.asarray(records['first_moves']))
+
+    with open(path, encoding='utf-8') as text_file:
+        boards, owners, to_move = BoardStateData.from_text(text_file.read())
+    first_moves: tp.NDArray[np.uint8] = np.zeros(len(boards), dtype=np.uint8)
+    flat_owners: tp.NDArray[np.int8] = owners.reshape(len(boards), -1)
+    for player in range(1, int(owners.max(initial=2)) + 1):
+        first_moves |= (~(flat_owners == player).any(axis=1)).astype(np.uint8) << np.uint8(player - 1)
+    return (boards, owners, to_move, first_moves)
+
+
+def main(launch_args: List[str]) -> int:
+    # Prints a short summary of a position file
+    if len(launch_args) != 2:
+        print("[#] Usage: python positions.py FILE", file=sys.stderr)
+        return 1
+    try:
+        records, rows, coloumns = read_positions(launch_args[1])
+    except (OSError, ValueError) as error:
+        print(f"[#] {error}", file=sys.stderr)
+        return 1
+
+    results: Dict[int, int] = {0: 0, 1: 0, 2: 0}
+    chunk: int = 1 << 20
+    for start in range(0, len(records), chunk):
+        counts: tp.NDArray[np.int64] = np.bincount(records['result'][start:start + chunk], minlength=3)
+        for result in results:
+            results[result] += int(counts[result])
+    print(f"[#] {len(records)} positions on {rows}x{coloumns} boards, {records.dtype.itemsize} bytes each")
+    print(f"[#] From games white won: {results[1]}, black won: {results[2]}, unfinished: {results[0]}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))
@@ -0,0 +1,410 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Dict, Set
+from concurrent.futures import ThreadPoolExecutor
+from numpy import typing as tp
+
+import numpy as np
+import asyncio
+import sys
+
+from main import GameLogic, AIPlayer, BoardStateData, parse_coordinates, row_name
+
+
+# Hosts any number of games at once from one asyncio event loop, over plain TCP with one command per line.
+# Moves are typed the same way as in the console game ("A1", "c 4", "AA12"), anything can connect with netcat:
+#   nc localhost 8765
+#
+# Commands (not case sensitive):
+#   NEW [RxC] [AI]    starts a game (5x5 if no size) and waits for someone to JOIN it, or plays the AI with AI
+#   JOIN id           joins a waiting game as player 2
+#   WATCH id          watches a game
+#   LIST              the games there are right now
+#   A1 or MOVE A1     plays a move in the game you're in
+#   LEAVE             leaves the game you're in, if you were playing the other player wins
+#   QUIT              disconnects
+#
+# What the server sends:
+#   GAME id RxC player    you're in game id as player 1 or 2 (0 when watching)
+#   BOARD RxC turn hex    the whole board: whose turn it is and the tiles in BoardStateData.pack's format as hex
+#   MOVED player tile waves   a move was played and set off that many explosion waves
+#   DELTA tile:count:owner ...   every tile the last move changed and what it is now
+#   TURN player / WIN player / LEFT player / WAITING / OK / ERROR text / GAMES id:RxC:state ...
+# If the AI runs into an error on its turn everyone in the game gets an ERROR and the human player wins.
+#
+# Usage:
+#   python server.py --port=8765
+
+
+MAX_LINE: int = 256
+# Longer lines than this get the connection closed
+
+MAX_BUFFERED: int = 1 << 20
+# A client that has this many bytes waiting to be sent to it isn't reading, so it gets dropped instead of filling memory
+
+
+def tile_name(flat_index: int, coloumns: int) -> str:
+    # The same way the tile would be typed, like "AA12"
+    row, coloumn = divmod(flat_index, coloumns)
+    return f"{row_name(row)}{coloumn + 1}"
+
+
+class ServerGame:
+    """
+        One hosted game: the engine, who's playing it and who's watching it.
+    """
+
+    def __init__(self, game_id: int, rows: int, coloumns: int, against_ai: bool) -> None:
+        self.game_id: int = game_id
+        self.logic: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+        self.players: Dict[int, asyncio.StreamWriter | None] = {1: None, 2: None}
+        self.spectators: Set[asyncio.StreamWriter] = set()
+        self.ai: AIPlayer | None = None
+        if against_ai:
+            self.ai = AIPlayer()
+            self.ai.attach_game(self.logic, 2)
+        self.winner: int = 0
+        self.ai_thinking: bool = False
+        self._change_reader: int = self.logic.add_change_reader()
+        self._sent_changes: int = self.logic.change_log_end()
+        # How much of the game's change_log has been sent out as deltas already
+        return
+
+    def size_text(self) -> str:
+        return f"{self.logic.rows}x{self.logic.coloumns}"
+
+    def state_text(self) -> str:
+        if self.winner != 0:
+            return 'over'
+        if (self.ai is None) and (self.players[2] is None):
+            return 'open'
+        return 'playing'
+
+    def player_to_move(self) -> int:
+        return 1 if self.logic.get_white_turn() else 2
+
+    def board_line(self) -> str:
+        return f"BOARD {self.size_text()} {self.player_to_move()} {self.logic.packed_board().hex()}"
+
+    def delta_line(self) -> str:
+        # Every tile that changed since the last delta, read from the game's change_log so the board never gets compared
+        new_changes: List[tp.NDArray[np.intp]] = self.logic.changes_since(self._sent_changes)
+        self._sent_changes = self.logic.change_log_end()
+        if len(new_changes) == 0:
+            return "DELTA"
+        tiles: tp.NDArray[np.intp] = np.unique(np.concatenate(new_changes))
+        self.logic.trim_change_log(self._change_reader, self._sent_changes)
+        counts: List[int] = self.logic.board.flat[tiles].tolist()
+        owners: List[int] = self.logic.owners.flat[tiles].tolist()
+        coloumns: int = self.logic.coloumns
+        return "DELTA " + ' '.join([f"{tile_name(tile, coloumns)}:{count}:{owner}" for tile, count, owner in zip(tiles.tolist(), counts, owners)])
+
+    def audience(self) -> List[asyncio.StreamWriter]:
+        return [writer for writer in self.players.values() if writer is not None] + list(self.spectators)
+
+
+class GameServer:
+    """
+        Runs every game on one event loop. Only AI turns leave the loop, they go to a thread pool
+        so a slow AI move doesn't hold up every other game.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, ai_workers: int = 2, max_size: int = 100) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.max_size: int = max_size
+        self.games: Dict[int, ServerGame] = {}
+        self.clients: Dict[asyncio.StreamWriter, Tuple[ServerGame, int] | None] = {}
+        # Every connection and the game it's in with its player number (0 for watching), None if it isn't in one
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=ai_workers)
+        self._next_id: int = 1
+        self._server: asyncio.Server | None = None
+        self._handlers: Set[asyncio.Task] = set()
+        self._ai_turns: Set[asyncio.Task] = set()
+        # Kept here so the loop doesn't garbage collect them halfway and their errors get looked at
+        return
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]  # In case it was 0 and the OS picked one
+        return
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in list(self.clients):
+            writer.close()
+        # Closing a connection ends its handler's readline, they get to clean up before the loop goes away
+        await asyncio.gather(*self._handlers, *self._ai_turns, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+        return
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients[writer] = None
+        handler: asyncio.Task | None = asyncio.current_task()
+        if handler is not None:
+            self._handlers.add(handler)
+        try:
+            while not writer.is_closing():
+                try:
+                    line: bytes = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    self._send(writer, "ERROR Line too long")
+                    break
+                if line == b'':
+                    break
+                if not await self._handle_line(writer, line.decode(errors='replace').strip()):
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._leave(writer)
+            del self.clients[writer]
+            writer.close()
+            self._handlers.discard(handler)  # type: ignore[arg-type]
+        return
+
+    async def _handle_line(self, writer: asyncio.StreamWriter, line: str) -> bool:
+        # Returns False once the client should be disconnected
+        command, _, argument = line.partition(' ')
+        argument = argument.strip()
+        match command.upper():
+            case '':
+                pass
+            case 'NEW':
+                self._new_game(writer, argument)
+            case 'JOIN':
+                self._join_game(writer, argument, as_player=True)
+            case 'WATCH':
+                self._join_game(writer, argument, as_player=False)
+            case 'LIST':
+                self._send(writer, "GAMES " + ' '.join([f"{game.game_id}:{game.size_text()}:{game.state_text()}" for game in self.games.values()]))
+            case 'LEAVE':
+                self._leave(writer)
+                self._send(writer, "OK")
+            case 'QUIT':
+                return False
+            case 'MOVE':
+                self._play_move(writer, argument)
+            case _:
+                self._play_move(writer, line)
+        return True
+
+    def _send(self, writer: asyncio.StreamWriter, line: str) -> None:
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+            writer.close()
+            return
+        writer.write(line.encode() + b'\n')
+        return
+
+    def _broadcast(self, game: ServerGame, lines: List[str]) -> None:
+        data: bytes = ''.join([line + '\n' for line in lines]).encode()
+        for writer in game.audience():
+            if writer.is_closing():
+                continue
+            if writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                writer.close()
+                continue
+            writer.write(data)
+        return
+
+    def _new_game(self, writer: asyncio.StreamWriter, argument: str) -> None:
+        if self.clients[writer] is not None:
+            self._send(writer, "ERROR LEAVE your game first")
+            return
+        rows, coloumns = 5, 5
+        against_ai: bool = False
+        for word in argument.lower().split():
+            if word == 'ai':
+                against_ai = True
+                continue
+            try:
+                rows, coloumns = [int(side) for side in word.split('x')]
+                assert (1 < rows <= self.max_size) and (1 < coloumns <= self.max_size)
+            except (ValueError, AssertionError):
+                self._send(writer, f"ERROR The size has to be like 5x5, from 2 to {self.max_size} on each side")
+                return
+        game: ServerGame = ServerGame(self._next_id, rows, coloumns, against_ai)
+        self._next_id += 1
+        self.games[game.game_id] = game
+        game.players[1] = writer
+        self.clients[writer] = (game, 1)
+        self._send(writer, f"GAME {game.game_id} {game.size_text()} 1")
+        self._send(writer, game.board_line())
+        if against_ai:
+            self._send(writer, "TURN 1")
+        else:
+            self._send(writer, "WAITING")
+        return
+
+    def _join_game(self, writer: asyncio.StreamWriter, argument: str, as_player: bool) -> None:
+        if self.clients[writer] is not None:
+            self._send(writer, "ERROR LEAVE your game first")
+            return
+        try:
+            game: ServerGame = self.games[int(argument)]
+        except (ValueError, KeyError):
+            self._send(writer, f"ERROR There's no game {argument}")
+            return
+        if not as_player:
+            game.spectators.add(writer)
+            self.clients[writer] = (game, 0)
+            self._send(writer, f"GAME {game.game_id} {game.size_text()} 0")
+            self._send(writer, game.board_line())
+            return
+        if game.state_text() != 'open':
+            self._send(writer, f"ERROR Game {game.game_id} isn't waiting for a player")
+            return
+        game.players[2] = writer
+        self.clients[writer] = (game, 2)
+        self._send(writer, f"GAME {game.game_id} {game.size_text()} 2")
+        self._send(writer, game.board_line())
+        self._broadcast(game, [f"TURN {game.player_to_move()}"])
+        return
+
+    def _leave(self, writer: asyncio.StreamWriter) -> None:
+        joined: Tuple[ServerGame, int] | None = self.clients.get(writer)
+        if joined is None:
+            return
+        game, player = joined
+        self.clients[writer] = None
+        if player == 0:
+            game.spectators.discard(writer)
+            return
+        game.players[player] = None
+        if game.winner == 0:
+            game.winner = 3 - player
+            self._broadcast(game, [f"LEFT {player}", f"WIN {game.winner}"])
+        if all(other is None for other in game.players.values()):
+            # Nobody's left to play it, the people watching get told it's over and it's forgotten
+            for spectator in game.spectators:
+                self.clients[spectator] = None
+            game.spectators.clear()
+            self.games.pop(game.game_id, None)
+        return
+
+    def _play_move(self, writer: asyncio.StreamWriter, text: str) -> None:
+        joined: Tuple[ServerGame, int] | None = self.clients[writer]
+        if (joined is None) or (joined[1] == 0):
+            self._send(writer, "ERROR You aren't playing a game")
+            return
+        game, player = joined
+        if game.state_text() == 'open':
+            self._send(writer, "ERROR Nobody has joined yet")
+            return
+        if (game.winner != 0) or game.ai_thinking or (game.player_to_move() != player):
+            self._send(writer, "ERROR It isn't your turn")
+            return
+        row, coloumn = parse_coordinates(text, game.logic.rows, game.logic.coloumns)
+        if row == -1:
+            self._send(writer, f"ERROR '{text}' isn't a tile on the board")
+            return
+        if not self._apply(game, (row - 1, coloumn - 1)):
+            self._send(writer, f"ERROR You can't play {text.upper()}")
+            return
+        if (game.winner == 0) and (game.ai is not None):
+            ai_turn: asyncio.Task = asyncio.get_running_loop().create_task(self._ai_turn(game))
+            self._ai_turns.add(ai_turn)
+            ai_turn.add_done_callback(lambda task: self._ai_turn_done(game, task))
+        return
+
+    def _ai_turn_done(self, game: ServerGame, task: asyncio.Task) -> None:
+        # If the AI couldn't move the game would be stuck on its turn, so it forfeits instead
+        self._ai_turns.discard(task)
+        if task.cancelled() or (task.exception() is None):
+            return
+        error: BaseException = task.exception()  # type: ignore[assignment]
+        print(f"[#] The AI failed in game {game.game_id}: {error!r}", file=sys.stderr)
+        if game.winner == 0:
+            game.winner = 1
+            self._broadcast(game, [f"ERROR The AI couldn't move: {error}", f"WIN {game.winner}"])
+        return
+
+    def _apply(self, game: ServerGame, position: Tuple[int, int]) -> bool:
+        # Plays the move straight through its chain reaction and tells everyone in the game what changed
+        player: int = game.player_to_move()
+        try:
+            winner, explosions = game.logic.apply_move(position)
+        except ValueError:
+            return False
+        lines: List[str] = [f"MOVED {player} {tile_name(position[0] * game.logic.coloumns + position[1], game.logic.coloumns)} {len(explosions)}",
+                            game.delta_line()]
+        if winner != 0:
+            game.winner = winner
+            lines.append(f"WIN {winner}")
+        else:
+            lines.append(f"TURN {game.player_to_move()}")
+        self._broadcast(game, lines)
+        return True
+
+    async def _ai_turn(self, game: ServerGame) -> None:
+        assert game.ai is not None
+        game.ai_thinking = True
+        try:
+            move: Tuple[int, int] = await asyncio.get_running_loop().run_in_executor(self.executor, game.ai.play_live_turn)
+        finally:
+            game.ai_thinking = False
+        if (game.winner == 0) and (game.game_id in self.games):
+            self._apply(game, move)
+        return
+
+
+def main(launch_args: List[str]) -> int:
+    host: str = '127.0.0.1'
+    port: int = 8765
+    ai_workers: int = 2
+    max_size: int = 100
+
+    for string in launch_args[1:]:
+        string = string.strip()
+        key, _, value = string.partition('=')
+        key = key.lower()
+        try:
+            match key:
+                case '--host':
+                    host = value
+                case '--port':
+                    port = int(value)
+                case '--ai-workers':
+                    ai_workers = int(value)
+                case '--max-size':
+                    max_size = int(value)
+                case _:
+                    print(f"[#] Unknown option {string}", file=sys.stderr)
+                    return 1
+        except ValueError:
+            print(f"[#] Bad value for {key}: '{value}'", file=sys.stderr)
+            return 1
+
+    server: GameServer = GameServer(host, port, ai_workers, max_size)
+
+    async def run() -> None:
+        await server.start()
+        print(f"[#] Listening on {server.host}:{server.port}", file=sys.stderr)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(f"[#] {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))
@@ -0,0 +1,281 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Dict
+from multiprocessing import Pool
+from numpy import typing as tp
+from time import perf_counter
+
+import numpy as np
+import json
+import sys
+import os
+
+from main import BatchGameLogic, Tablebase
+
+
+# Solves every position of a small board and saves the results as a Tablebase that AIPlayer can play from.
+# It goes in three steps and saves its progress to a checkpoint folder after every part of them,
+# so it can be stopped and started again and only redoes the part it was on:
+#   1. enumerate: find every position that can come up from an empty board, one ply deeper at a time
+#   2. link: play every move of every position to see which position it leads to
+#   3. solve: work backwards from the moves that win straight away (retrograde analysis)
+# The positions are expanded in chunks with BatchGameLogic, spread over every core.
+#
+# Usage:
+#   python tablebase.py --size=3x3 --output=3x3.tb
+
+
+NO_MOVE: np.uint64 = np.uint64(Tablebase.EMPTY_KEY)
+WINNING_MOVE: np.uint64 = np.uint64(Tablebase.EMPTY_KEY - 1)
+# What successor_keys gives for tiles that can't be played and for moves that end the game
+
+
+def successor_keys(keys: tp.NDArray[np.uint64], rows: int, coloumns: int) -> tp.NDArray[np.uint64]:
+    """
+        Plays every move in every keyed position, returns a (positions, tiles) array of the keys they lead to.
+    """
+    batch: BatchGameLogic = Tablebase.batch_from_keys(keys, rows, coloumns)
+    legal: tp.NDArray[np.bool_] = batch.legal_moves().reshape(len(keys), -1)
+    children: tp.NDArray[np.uint64] = np.full(legal.shape, NO_MOVE, dtype=np.uint64)
+    for move in range(rows * coloumns):
+        playing: tp.NDArray[np.intp] = np.flatnonzero(legal[:, move])
+        if playing.size == 0:
+            continue
+        child: BatchGameLogic = Tablebase.batch_from_keys(keys[playing], rows, coloumns)
+        child.apply_moves(np.broadcast_to(np.array(divmod(move, coloumns)), (playing.size, 2)))
+        children[playing, move] = np.where(child.check_gameover() != 0, WINNING_MOVE, Tablebase.batch_keys(child))
+    return children
+
+
+def _expand_chunk(task: Tuple[tp.NDArray[np.uint64], int, int]) -> tp.NDArray[np.uint64]:
+    # Every position one ply on from the chunk that the game isn't over in
+    children: tp.NDArray[np.uint64] = successor_keys(*task).ravel()
+    return np.unique(children[children < WINNING_MOVE])
+
+
+def _link_chunk(task: Tuple[tp.NDArray[np.uint64], int, int]) -> tp.NDArray[np.uint64]:
+    return successor_keys(*task)
+
+
+def _save_array(path: str, array: tp.NDArray) -> None:
+    # Written next to the old file first so stopping halfway never leaves a broken checkpoint
+    with open(path + '.tmp', 'wb') as array_file:
+        np.save(array_file, array)
+    os.replace(path + '.tmp', path)
+    return
+
+
+class TablebaseBuilder:
+    def __init__(self, rows: int, coloumns: int, checkpoint_dir: str, workers: int = 1, chunk_size: int = 100_000) -> None:
+        try:
+            assert rows * coloumns <= Tablebase.MAX_TILES
+        except AssertionError as assertion_error:
+            raise ValueError(f"Tablebases only fit boards of up to {Tablebase.MAX_TILES} tiles") from assertion_error
+        self.rows: int = rows
+        self.coloumns: int = coloumns
+        self.checkpoint_dir: str = checkpoint_dir
+        self.workers: int = workers
+        self.chunk_size: int = chunk_size
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.state: Dict = self._load_state()
+        return
+
+    def build(self, output_path: str) -> Dict[str, int]:
+        """
+            Runs whatever steps are left and writes the tablebase, returns some numbers about it.
+        """
+        with Pool(processes=self.workers) as pool:
+            if self.state['phase'] == 'enumerate':
+                self._enumerate(pool)
+            positions: tp.NDArray[np.uint64] = np.load(self._path('positions.npy'))
+            if self.state['phase'] == 'link':
+                self._link(pool, positions)
+        values: tp.NDArray[np.int16] = self._solve(positions)
+        Tablebase.write(output_path, self.rows, self.coloumns, positions, values)
+        return {
+            'positions': len(positions),
+            'wins': int((values > 0).sum()),
+            'losses': int((values < 0).sum()),
+            'draws': int((values == 0).sum()),
+            'longest': int(np.abs(values).max(initial=0)),
+        }
+
+    def _enumerate(self, pool: Pool) -> None:
+        # Breadth first from the empty board, seen is kept sorted so lookups are a binary search
+        if self.state['layer'] == 0:
+            seen: tp.NDArray[np.uint64] = Tablebase.batch_keys(BatchGameLogic(1, self.rows, self.coloumns))
+            frontier: tp.NDArray[np.uint64] = seen
+        else:
+            seen: tp.NDArray[np.uint64] = np.load(self._path('positions.npy'))
+            frontier: tp.NDArray[np.uint64] = np.load(self._path('frontier.npy'))
+
+        while frontier.size > 0:
+            start_time: float = perf_counter()
+            children: tp.NDArray[np.uint64] = np.unique(np.concatenate(
+                [np.zeros(0, dtype=np.uint64)] + list(pool.imap(_expand_chunk, self._chunks(frontier)))))
+            found: tp.NDArray[np.intp] = np.minimum(np.searchsorted(seen, children), len(seen) - 1)
+            frontier = children[seen[found] != children]
+            seen = np.union1d(seen, frontier)
+            self.state['layer'] += 1
+            _save_array(self._path('positions.npy'), seen)
+            _save_array(self._path('frontier.npy'), frontier)
+            self._save_state()
+            print(f"[#] Ply {self.state['layer']}: {len(frontier)} new positions, {len(seen)} in total "
+                  f"({perf_counter() - start_time:.1f}s)", file=sys.stderr)
+
+        self.state['phase'] = 'link'
+        self._save_state()
+        return
+
+    def _link(self, pool: Pool, positions: tp.NDArray[np.uint64]) -> None:
+        # Every chunk gets its own file, so a restart skips the chunks that are done
+        chunk_count: int = -(-len(positions) // self.chunk_size)
+        todo: List[int] = [chunk for chunk in range(chunk_count) if not os.path.exists(self._link_path(chunk))]
+        tasks = ((positions[chunk * self.chunk_size:(chunk + 1) * self.chunk_size], self.rows, self.coloumns) for chunk in todo)
+        for chunk, children in zip(todo, pool.imap(_link_chunk, tasks)):
+            legal: tp.NDArray[np.bool_] = children < WINNING_MOVE
+            targets: tp.NDArray[np.int64] = np.searchsorted(positions, children[legal])
+            _save_array(self._link_path(chunk), np.concatenate([
+                legal.sum(axis=1).astype(np.int64),  # how many moves every position has that don't end the game
+                (children == WINNING_MOVE).any(axis=1).astype(np.int64),
+                targets,
+            ]))
+            print(f"[#] Linked chunk {chunk + 1}/{chunk_count}", file=sys.stderr)
+
+        self.state['phase'] = 'solve'
+        self._save_state()
+        return
+
+    def _solve(self, positions: tp.NDArray[np.uint64]) -> tp.NDArray[np.int16]:
+        count: int = len(positions)
+        move_counts: List[tp.NDArray[np.int64]] = []
+        has_win: List[tp.NDArray[np.int64]] = []
+        all_targets: List[tp.NDArray[np.int64]] = []
+        chunk_count: int = -(-count // self.chunk_size)
+        for chunk in range(chunk_count):
+            size: int = min(self.chunk_size, count - chunk * self.chunk_size)
+            linked: tp.NDArray[np.int64] = np.load(self._link_path(chunk))
+            move_counts.append(linked[:size])
+            has_win.append(linked[size:2 * size])
+            all_targets.append(linked[2 * size:])
+        remaining: tp.NDArray[np.int64] = np.concatenate(move_counts)
+        targets: tp.NDArray[np.int64] = np.concatenate(all_targets)
+        parents: tp.NDArray[np.int64] = np.repeat(np.arange(count), remaining)
+
+        # The same moves backwards: which positions lead to every position
+        order: tp.NDArray[np.intp] = np.argsort(targets, kind='stable')
+        reverse_parents: tp.NDArray[np.int64] = parents[order]
+        reverse_start: tp.NDArray[np.int64] = np.searchsorted(targets[order], np.arange(count + 1))
+        del parents, order
+
+        values: tp.NDArray[np.int16] = np.zeros(count, dtype=np.int16)
+        solved: tp.NDArray[np.bool_] = np.zeros(count, dtype=np.bool_)
+        newly_won: tp.NDArray[np.intp] = np.flatnonzero(np.concatenate(has_win))
+        newly_lost: tp.NDArray[np.intp] = np.zeros(0, dtype=np.intp)
+        values[newly_won] = 1
+        solved[newly_won] = True
+        distance: int = 1
+        # A position is won in d if a move leads to a position lost in d - 1,
+        # and lost in d once the last of its moves turned out to lead to a win for the other side (in d - 1)
+        # Whatever never gets solved can go on forever, so it's a draw
+        while (newly_won.size > 0) or (newly_lost.size > 0):
+            distance += 1
+            winners: tp.NDArray[np.int64] = np.unique(self._gather(reverse_parents, reverse_start, newly_lost))
+            winners = winners[~solved[winners]]
+            values[winners] = distance
+            solved[winners] = True
+
+            parents_of_won, lost_moves = np.unique(self._gather(reverse_parents, reverse_start, newly_won), return_counts=True)
+            remaining[parents_of_won] -= lost_moves
+            losers: tp.NDArray[np.int64] = parents_of_won[(remaining[parents_of_won] == 0) & ~solved[parents_of_won]]
+            values[losers] = -distance
+            solved[losers] = True
+            newly_won, newly_lost = winners, losers
+        return values
+
+    @staticmethod
+    def _gather(reverse_parents: tp.NDArray[np.int64], reverse_start: tp.NDArray[np.int64], children: tp.NDArray) -> tp.NDArray[np.int64]:
+        # Every parent of every child given, the slices of the reverse lists stuck together without a loop
+        starts: tp.NDArray[np.int64] = reverse_start[children]
+        lengths: tp.NDArray[np.int64] = reverse_start[children + 1] - starts
+        offsets: tp.NDArray[np.int64] = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return reverse_parents[offsets + np.arange(lengths.sum())]
+
+    def _chunks(self, keys: tp.NDArray[np.uint64]):
+        for start in range(0, len(keys), self.chunk_size):
+            yield (keys[start:start + self.chunk_size], self.rows, self.coloumns)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.checkpoint_dir, name)
+
+    def _link_path(self, chunk: int) -> str:
+        return self._path(f'link_{chunk:06d}.npy')
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self._path('state.json')) as state_file:
+                state: Dict = json.load(state_file)
+        except FileNotFoundError:
+            return {'rows': self.rows, 'coloumns': self.coloumns, 'chunk_size': self.chunk_size, 'phase': 'enumerate', 'layer': 0}
+        if (state['rows'], state['coloumns']) != (self.rows, self.coloumns):
+            raise ValueError(f"{self.checkpoint_dir} is a checkpoint for {state['rows']}x{state['coloumns']}")
+        self.chunk_size = state['chunk_size']  # The linked chunks on disk have to line up
+        return state
+
+    def _save_state(self) -> None:
+        with open(self._path('state.json.tmp'), 'w') as state_file:
+            json.dump(self.state, state_file)
+        os.replace(self._path('state.json.tmp'), self._path('state.json'))
+        return
+
+
+def main(launch_args: List[str]) -> int:
+    rows: int = 3
+    coloumns: int = 3
+    output_path: str = ''
+    checkpoint_dir: str = ''
+    workers: int = os.cpu_count() or 1
+    chunk_size: int = 100_000
+
+    for string in launch_args[1:]:
+        key, _, value = string.strip().partition('=')
+        try:
+            match key.lower():
+                case '--size':
+                    rows, coloumns = (int(side) for side in value.lower().split('x'))
+                case '--output':
+                    output_path = value
+                case '--checkpoint':
+                    checkpoint_dir = value
+                case '--workers':
+                    workers = int(value)
+                case '--chunk':
+                    chunk_size = int(value)
+                case _:
+                    print(f"[#] Unknown option {string}", file=sys.stderr)
+                    return 1
+        except ValueError:
+            print(f"[#] Bad value for {key}: '{value}'", file=sys.stderr)
+            return 1
+
+    if not output_path:
+        output_path = f'{rows}x{coloumns}.tb'
+    if not checkpoint_dir:
+        checkpoint_dir = output_path + '.checkpoint'
+    try:
+        builder: TablebaseBuilder = TablebaseBuilder(rows, coloumns, checkpoint_dir, workers, chunk_size)
+    except ValueError as error:
+        print(f"[#] {error}", file=sys.stderr)
+        return 1
+
+    start_time: float = perf_counter()
+    stats: Dict[str, int] = builder.build(output_path)
+    print(f"[#] Solved {stats['positions']} positions of {rows}x{coloumns} in {perf_counter() - start_time:.1f}s: "
+          f"{stats['wins']} wins, {stats['losses']} losses, {stats['draws']} draws for the side to move, "
+          f"longest forced result {stats['longest']} plies", file=sys.stderr)
+    print(f"[#] Saved to {output_path}, the checkpoint in {checkpoint_dir} can be deleted", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))
@@ -0,0 +1,45 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from main import AIPlayer, GameLogic
+from benchmarks import PerTileAIPlayer
+
+
+def _random_board(rng: np.random.Generator, rows: int, coloumns: int) -> Tuple[List[List[int]], List[Tuple[int, int]]]:
+    board: np.ndarray = np.where(rng.random((rows, coloumns)) < 0.25, 0, rng.integers(1, 4, (rows, coloumns)))
+    mine: np.ndarray = (board > 0) & (rng.random((rows, coloumns)) < 0.5)
+    mine.flat[rng.integers(rows * coloumns)] = True  # At least one piece so there's a move to pick
+    board[mine & (board == 0)] = 1
+    return (board.tolist(), [(x, y) for x, y in np.argwhere(mine).tolist()])
+
+
+def test_scores_and_moves_match_the_per_tile_heuristic() -> None:
+    rng: np.random.Generator = np.random.default_rng(6)
+    for rows in range(2, 13):
+        for coloumns in range(2, 13):
+            for _ in range(8):
+                board, pieces = _random_board(rng, rows, coloumns)
+                reference: PerTileAIPlayer = PerTileAIPlayer(board, pieces)
+                reference.assign_scores()
+                player: AIPlayer = AIPlayer()
+                move: Tuple[int, int] = player.play_turn(current_game_board=board, ai_pieces=pieces)
+                assert player.points_board.tolist() == reference.points_board
+                assert move == reference.decide_move()
+
+
+def test_following_a_live_game_scores_like_a_fresh_board() -> None:
+    # The windows rescored after every move are small, so this checks the margins of a window against the whole board
+    rng: np.random.Generator = np.random.default_rng(3)
+    for rows, coloumns in [(5, 5), (9, 9), (12, 7)]:
+        game: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+        follower: AIPlayer = AIPlayer()
+        follower.attach_game(game, 1)
+        for _ in range(200):
+            mine: np.ndarray = np.flatnonzero([game.is_valid_move(divmod(tile, coloumns)) for tile in range(rows * coloumns)])
+            winner, _ = game.apply_move(divmod(int(rng.choice(mine)), coloumns))
+            if winner != 0:
+                break
+            follower._catch_up()
+            fresh: AIPlayer = AIPlayer()
+            assert np.array_equal(follower.points_board, fresh.score_position(game.board.copy(), game.owners == 1))
@@ -0,0 +1,64 @@
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from main import GameLogic, BatchGameLogic
+
+
+@pytest.mark.parametrize('size', [(2, 2), (3, 3), (5, 5), (4, 7), (8, 8)])
+def test_batch_matches_game_logic_every_ply(size: Tuple[int, int]) -> None:
+    rows, coloumns = size
+    games: int = 64
+    rng: np.random.Generator = np.random.default_rng([5, rows, coloumns])
+    batch: BatchGameLogic = BatchGameLogic(games, rows, coloumns)
+    singles: List[GameLogic] = [GameLogic(rows=rows, coloumns=coloumns) for _ in range(games)]
+    ended_mid_cascade: int = 0
+    for ply in range(600):
+        playing: np.ndarray = batch.check_gameover() == 0
+        if not playing.any():
+            break
+        moves: np.ndarray = batch.random_moves(rng)
+        if ply < 2:
+            # Both first moves get placed on an empty tile as a 3
+            assert (batch.boards[np.arange(games), moves[:, 0], moves[:, 1]] == 0).all()
+        waves: np.ndarray = batch.apply_moves(moves)
+        for index, game in enumerate(singles):
+            if not playing[index]:
+                assert waves[index] == 0
+                continue
+            winner, explosions = game.apply_move((int(moves[index, 0]), int(moves[index, 1])))
+            assert np.array_equal(game.board, batch.boards[index])
+            assert np.array_equal(game.owners, batch.owners[index])
+            assert game.white_turn == batch.white_turn[index]
+            assert (game.first_move_white, game.first_move_black) == (batch.first_move_white[index], batch.first_move_black[index])
+            assert winner == batch.check_gameover()[index]
+            assert len(explosions) == waves[index]
+            if (winner != 0) and game.next_autotick:
+                ended_mid_cascade += 1
+    assert (batch.check_gameover() != 0).any()
+    # Winning in the middle of a chain reaction leaves pieces at 4 or more and the turn with the winner
+    if size != (2, 2):
+        assert ended_mid_cascade > 0
+
+
+def test_batch_tracks_the_same_tiles_as_the_change_log() -> None:
+    rng: np.random.Generator = np.random.default_rng(11)
+    games: int = 200
+    boards: np.ndarray = np.where(rng.random((games, 6, 6)) < 0.2, 0, rng.integers(1, 4, (games, 6, 6))).astype(np.int8)
+    owners: np.ndarray = np.where(boards > 0, rng.choice([1, 1, 2], (games, 6, 6)), 0).astype(np.int8)
+    boards[:, 0, 0], owners[:, 0, 0] = 1, 2
+    boards[:, -1, -1], owners[:, -1, -1] = 3, 1
+    batch: BatchGameLogic = BatchGameLogic(games, 6, 6)
+    batch.track_cascades = True
+    batch.load_positions(boards, owners, np.ones(games, dtype=np.uint8), np.zeros(games, dtype=np.uint8))
+    moves: np.ndarray = batch.random_moves(rng)
+    waves: np.ndarray = batch.apply_moves(moves)
+    for index in range(games):
+        game: GameLogic = GameLogic(rows=6, coloumns=6)
+        game.load_position(boards[index], owners[index])
+        start: int = len(game.change_log)
+        _, explosions = game.apply_move((int(moves[index, 0]), int(moves[index, 1])))
+        assert len(explosions) == waves[index]
+        assert sum(len(wave) for wave in explosions) == batch.cascade_explosions[index]
+        assert len(np.unique(np.concatenate(game.change_log[start:]))) == batch.cascade_tiles[index]
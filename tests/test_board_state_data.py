@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from main import BoardStateData
+
+
+def test_packing_round_trips() -> None:
+    rng: np.random.Generator = np.random.default_rng(11)
+    board: np.ndarray = rng.integers(0, 4, (6, 7)).astype(np.int8)
+    owners: np.ndarray = np.where(board > 0, rng.integers(1, 3, (6, 7)), 0).astype(np.int8)
+    unpacked_board, unpacked_owners = BoardStateData.unpack(BoardStateData.pack(board, owners), 6, 7)
+    assert np.array_equal(unpacked_board, board) and np.array_equal(unpacked_owners, owners)
+
+
+@pytest.mark.parametrize('owner', [3, 4, -1])
+def test_owners_past_black_get_refused(owner: int) -> None:
+    board: np.ndarray = np.ones((5, 5), dtype=np.int8)
+    owners: np.ndarray = np.ones((5, 5), dtype=np.int8)
+    owners[2, 3] = owner
+    with pytest.raises(ValueError):
+        BoardStateData.pack(board, owners)
+    with pytest.raises(ValueError):
+        BoardStateData.pack_legacy(board, owners)
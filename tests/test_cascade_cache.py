@@ -0,0 +1,48 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from main import CascadeCache, GameLogic, MultiPlayerGameLogic
+
+
+def test_changing_the_explosions_given_back_leaves_the_cache_alone() -> None:
+    board: str = """
+        3w 3w .
+        3w 3w .
+        .  .  1b
+    """
+    cache: CascadeCache = CascadeCache(size_mb=1)
+    expected: List[List[Tuple[int, int]]] = [[(0, 0)], [(0, 1), (1, 0)], [(1, 1)]]
+    for _ in range(3):
+        # A miss the first time round and hits after that
+        game: GameLogic = GameLogic(rows=3, coloumns=3, board=board)
+        game.cascade_cache = cache
+        _, explosions = game.apply_move((0, 0))
+        assert explosions == expected
+        explosions[0].append((2, 2))
+        explosions.clear()
+    assert (cache.misses, cache.hits) == (1, 2)
+
+
+def test_boards_with_the_same_number_of_tiles_dont_share_chain_reactions() -> None:
+    cache: CascadeCache = CascadeCache(size_mb=1)
+    wide: GameLogic = GameLogic(rows=2, coloumns=3, board="3w 3w .\n.  .  1b")
+    tall: GameLogic = GameLogic(rows=3, coloumns=2, board="3w 3w\n.  .\n.  1b")
+    assert cache.make_key(wide, (0, 0)) != cache.make_key(tall, (0, 0))
+    wide.cascade_cache = cache
+    tall.cascade_cache = cache
+    wide.apply_move((0, 0))
+    tall.apply_move((0, 0))
+    assert cache.hits == 0
+    uncached: GameLogic = GameLogic(rows=3, coloumns=2, board="3w 3w\n.  .\n.  1b")
+    uncached.apply_move((0, 0))
+    assert np.array_equal(tall.board, uncached.board) and np.array_equal(tall.owners, uncached.owners)
+
+
+def test_a_four_player_board_doesnt_share_chain_reactions_with_a_two_player_one() -> None:
+    # A byte a tile for 4 players is as long as half a byte a tile for twice the tiles
+    two_players: GameLogic = GameLogic(rows=4, coloumns=4)
+    four_players: MultiPlayerGameLogic = MultiPlayerGameLogic(rows=4, coloumns=2, players=4)
+    assert len(two_players.packed_board()) == len(four_players.packed_board())
+    cache: CascadeCache = CascadeCache(size_mb=1)
+    assert cache.make_key(two_players, (0, 0))[:5] != cache.make_key(four_players, (0, 0))[:5]
@@ -0,0 +1,51 @@
+import numpy as np
+
+from main import GameLogic, AIPlayer
+
+
+def test_change_log_gets_trimmed_once_every_reader_is_past_it() -> None:
+    game: GameLogic = GameLogic(rows=4, coloumns=4)
+    fast: int = game.add_change_reader()
+    slow: int = game.add_change_reader()
+    for move in [(0, 0), (3, 3), (0, 0), (3, 3)]:
+        game.apply_move(move)
+    end: int = game.change_log_end()
+    game.trim_change_log(fast, end)
+    assert game.change_log_start == 0 and len(game.change_log) == end
+    game.trim_change_log(slow, end - 1)
+    assert game.change_log_start == end - 1 and game.changes_since(end - 1) == game.change_log
+    game.remove_change_reader(slow)
+    game.trim_change_log(fast, end)
+    assert game.change_log == [] and game.change_log_end() == end
+
+
+def test_unmake_move_after_a_trim() -> None:
+    game: GameLogic = GameLogic(rows=4, coloumns=4)
+    reader: int = game.add_change_reader()
+    for move in [(0, 0), (3, 3), (0, 0), (3, 3), (0, 1)]:
+        game.apply_move(move)
+    game.trim_change_log(reader, game.change_log_end())
+    board: np.ndarray = game.board.copy()
+    undo = game.make_move((3, 2))
+    game.unmake_move(undo)
+    assert np.array_equal(game.board, board) and (game.change_log == [])
+
+
+def test_following_a_long_game_keeps_the_log_short() -> None:
+    rng: np.random.Generator = np.random.default_rng(40)
+    game: GameLogic = GameLogic(rows=40, coloumns=40)
+    players: dict = {1: AIPlayer(), 2: AIPlayer()}
+    players[1].attach_game(game, 1)
+    players[2].attach_game(game, 2)
+    longest: int = 0
+    for _ in range(3000):
+        owner: int = 1 if game.white_turn else 2
+        players[owner]._catch_up()
+        mine: np.ndarray = np.flatnonzero(game.owners == owner) if not game._has_first_move() else np.flatnonzero(game.board == 0)
+        winner, _ = game.apply_move(divmod(int(rng.choice(mine)), 40))
+        longest = max(longest, len(game.change_log))
+        if winner != 0:
+            break
+    # Each player only reads every other turn, so the log holds about two moves' worth of changes
+    assert game.change_log_start > 1000
+    assert longest < 200
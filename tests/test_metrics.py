@@ -0,0 +1,72 @@
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from main import AIPlayer, CascadeCache, GameLogic, metrics
+
+
+@pytest.fixture
+def enabled_metrics() -> Iterator[None]:
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.disable()
+    metrics.reset()
+
+
+def _legal_moves(game: GameLogic) -> List[Tuple[int, int]]:
+    return [divmod(tile, game.coloumns) for tile in range(game.rows * game.coloumns) if game.is_valid_move(divmod(tile, game.coloumns))]
+
+
+def test_moves_count_cache_hits_but_not_searched_moves(enabled_metrics: None) -> None:
+    rng: np.random.Generator = np.random.default_rng(17)
+    cache: CascadeCache = CascadeCache(size_mb=4)
+    played: int = 0
+    for _ in range(20):
+        game: GameLogic = GameLogic(rows=4, coloumns=4)
+        game.cascade_cache = cache
+        for _ in range(200):
+            legal: List[Tuple[int, int]] = _legal_moves(game)
+            for move in legal[:3]:
+                game.unmake_move(game.make_move(move))
+            winner, _ = game.apply_move(legal[int(rng.integers(len(legal)))])
+            played += 1
+            if winner != 0:
+                break
+    assert cache.hits > 0
+    assert metrics.counters['moves'] == played
+
+
+def test_cascade_waves_dont_leak_into_the_next_chain_reaction(enabled_metrics: None) -> None:
+    # White wins in the middle of the chain reaction with pieces still at 4
+    board: str = """
+        3w 3w
+        3w 3w
+        1b 3w
+    """
+    game: GameLogic = GameLogic(rows=3, coloumns=2, board=board)
+    undo = game.make_move((0, 0))
+    assert (game.check_gameover() == 1) and game.next_autotick
+    game.unmake_move(undo)
+    assert game._cascade_waves == 0
+    # Nothing from the waves a search tries out gets recorded
+    for name in ('spread_ms', 'explosions_per_wave', 'tiles_changed_per_wave', 'four_pieces_per_wave', 'cascade_waves'):
+        assert name not in metrics.values
+
+    metrics.reset()
+    winner, explosions = game.apply_move((0, 0))
+    assert winner == 1
+    assert metrics.values['cascade_waves'][:2] == [1, len(explosions)]
+    assert game._cascade_waves == 0
+
+
+def test_every_ai_marker_gets_timed_on_small_boards(enabled_metrics: None) -> None:
+    game: GameLogic = GameLogic(rows=5, coloumns=5, board="3w 1b .  .  .\n.  2w .  .  .\n.  .  .  .  .\n.  .  .  3b .\n.  .  .  .  1w")
+    player: AIPlayer = AIPlayer()
+    player.attach_game(game, 1)
+    game.apply_move((0, 0))
+    game.apply_move((3, 3))
+    player.play_live_turn()
+    for name in ('ai_corner_marks_ms', 'ai_edges_ms', 'ai_three_penalties_ms', 'ai_three_bonuses_ms', 'ai_corner_fulls_ms', 'ai_corner_bursts_ms'):
+        assert metrics.values[name][0] == 2  # attach_game scores the whole board, play_live_turn just around the moves
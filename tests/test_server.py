@@ -0,0 +1,155 @@
+import asyncio
+from typing import Awaitable, Callable, List, Tuple
+
+import numpy as np
+import pytest
+
+from main import AIPlayer, BoardStateData, GameLogic, parse_coordinates
+from server import MAX_LINE, GameServer, ServerGame, tile_name
+
+
+class Client:
+    """
+        One loopback connection that keeps its own copy of the board from the BOARD and DELTA lines it gets.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.board: np.ndarray = np.zeros((0, 0), dtype=np.int8)
+        self.owners: np.ndarray = np.zeros((0, 0), dtype=np.int8)
+
+    async def send(self, line: str) -> None:
+        self.writer.write(line.encode() + b'\n')
+        await self.writer.drain()
+
+    async def read(self) -> str:
+        line: str = (await asyncio.wait_for(self.reader.readline(), 10)).decode().strip()
+        words: List[str] = line.split()
+        if (len(words) > 0) and (words[0] == 'BOARD'):
+            rows, coloumns = [int(side) for side in words[1].split('x')]
+            self.board, self.owners = BoardStateData.unpack(bytes.fromhex(words[3]), rows, coloumns)
+        elif (len(words) > 0) and (words[0] == 'DELTA'):
+            for change in words[1:]:
+                tile, count, owner = change.split(':')
+                row, coloumn = parse_coordinates(tile, *self.board.shape)
+                self.board[row - 1, coloumn - 1] = int(count)
+                self.owners[row - 1, coloumn - 1] = int(owner)
+        return line
+
+    async def read_move(self) -> List[str]:
+        # MOVED, DELTA and then TURN or WIN
+        return [await self.read(), await self.read(), await self.read()]
+
+
+async def _connect(server: GameServer) -> Client:
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    return Client(reader, writer)
+
+
+def _run(test: Callable[[GameServer], Awaitable[None]]) -> None:
+    async def run() -> None:
+        server: GameServer = GameServer(port=0)
+        await server.start()
+        try:
+            await test(server)
+        finally:
+            await server.close()
+    asyncio.run(run())
+
+
+def _random_move(game: ServerGame, rng: np.random.Generator) -> str:
+    logic: GameLogic = game.logic
+    legal: np.ndarray = np.flatnonzero([logic.is_valid_move(divmod(tile, logic.coloumns)) for tile in range(logic.rows * logic.coloumns)])
+    return tile_name(int(rng.choice(legal)), logic.coloumns)
+
+
+def test_two_players_and_a_spectator_replay_the_same_board() -> None:
+    async def test(server: GameServer) -> None:
+        rng: np.random.Generator = np.random.default_rng(20)
+        white: Client = await _connect(server)
+        await white.send("NEW 4x5")
+        assert [await white.read() for _ in range(3)][::2] == ["GAME 1 4x5 1", "WAITING"]
+        black: Client = await _connect(server)
+        await black.send("JOIN 1")
+        assert await black.read() == "GAME 1 4x5 2"
+        await black.read()
+        assert await black.read() == await white.read() == "TURN 1"
+        watcher: Client = await _connect(server)
+        await watcher.send("WATCH 1")
+        assert await watcher.read() == "GAME 1 4x5 0"
+        await watcher.read()
+
+        game: ServerGame = server.games[1]
+        players: dict = {1: white, 2: black}
+        await black.send("A1")
+        assert await black.read() == "ERROR It isn't your turn"
+        for _ in range(300):
+            player: int = game.player_to_move()
+            await players[player].send(_random_move(game, rng))
+            seen: List[List[str]] = [await client.read_move() for client in (white, black, watcher)]
+            assert seen[0] == seen[1] == seen[2]
+            assert seen[0][0].startswith(f"MOVED {player} ")
+            for client in (white, black, watcher):
+                assert np.array_equal(client.board, game.logic.board) and np.array_equal(client.owners, game.logic.owners)
+            if seen[0][2].startswith("WIN"):
+                break
+            assert seen[0][2] == f"TURN {game.player_to_move()}"
+        assert game.winner != 0
+    _run(test)
+
+
+def test_playing_the_ai() -> None:
+    async def test(server: GameServer) -> None:
+        rng: np.random.Generator = np.random.default_rng(21)
+        human: Client = await _connect(server)
+        await human.send("NEW 5x5 AI")
+        assert [await human.read() for _ in range(3)][::2] == ["GAME 1 5x5 1", "TURN 1"]
+        game: ServerGame = server.games[1]
+        ai_moves: int = 0
+        for _ in range(200):
+            await human.send(_random_move(game, rng))
+            lines: List[str] = await human.read_move()
+            assert lines[0].startswith("MOVED 1 ")
+            if lines[2].startswith("WIN"):
+                break
+            assert lines[2] == "TURN 2"
+            lines = await human.read_move()
+            assert lines[0].startswith("MOVED 2 ")
+            ai_moves += 1
+            assert np.array_equal(human.board, game.logic.board) and np.array_equal(human.owners, game.logic.owners)
+            if lines[2].startswith("WIN"):
+                break
+            assert lines[2] == "TURN 1"
+        assert (ai_moves > 0) and (game.winner != 0)
+    _run(test)
+
+
+def test_an_ai_that_fails_forfeits_the_game(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(self: AIPlayer) -> Tuple[int, int]:
+        raise RuntimeError("no move")
+    monkeypatch.setattr(AIPlayer, 'play_live_turn', fail)
+
+    async def test(server: GameServer) -> None:
+        human: Client = await _connect(server)
+        await human.send("NEW AI")
+        [await human.read() for _ in range(3)]
+        await human.send("C3")
+        assert (await human.read_move())[2] == "TURN 2"
+        assert await human.read() == "ERROR The AI couldn't move: no move"
+        assert await human.read() == "WIN 1"
+        assert len(server._ai_turns) == 0
+        await human.send("A1")
+        assert await human.read() == "ERROR It isn't your turn"
+    _run(test)
+
+
+def test_a_line_too_long_disconnects() -> None:
+    async def test(server: GameServer) -> None:
+        client: Client = await _connect(server)
+        await client.send("LIST")
+        assert await client.read() == "GAMES"
+        await client.send("A" * (MAX_LINE + 10))
+        assert await client.read() == "ERROR Line too long"
+        assert await asyncio.wait_for(client.reader.read(), 10) == b''
+    _run(test)
@@ -0,0 +1,194 @@
+from typing import List, Tuple
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from main import GameLogic
+
+
+class TickByTickGameLogic:
+    """
+        The rules as they were before explosion waves got resolved with NumPy:
+        lists of pieces and one exploding piece at a time, copied from the old GameLogic.
+        Only kept here to check GameLogic against.
+    """
+
+    def __init__(self, rows: int, coloumns: int) -> None:
+        self.rows: int = rows
+        self.coloumns: int = coloumns
+        self.board: List[List[int]] = [[0]*coloumns for _ in range(rows)]
+        self.first_move_white: bool = True
+        self.first_move_black: bool = True
+        self.white_turn: bool = True
+        self.next_autotick: bool = False
+        self.four_pieces: List[Tuple[int, int]] = []
+        self.white_pieces: List[Tuple[int, int]] = []
+        self.black_pieces: List[Tuple[int, int]] = []
+
+    def tick(self) -> None:
+        # What the old do_valid_move did on an autotick, without the sleep
+        self._spread()
+        if self.four_pieces == []:
+            self.next_autotick = False
+            self.white_turn = not self.white_turn
+
+    def _do_move(self, position: Tuple[int, int]) -> None:
+        if self.first_move_white:
+            self.board[position[0]][position[1]] = 3
+            self.white_pieces.append(position)
+            self.first_move_white = False
+        elif self.first_move_black:
+            self.board[position[0]][position[1]] = 3
+            self.black_pieces.append(position)
+            self.first_move_black = False
+        else:
+            if self._add_to(position) >= 4:
+                return
+        self.white_turn = not self.white_turn
+
+    def _add_to(self, position: Tuple[int, int]) -> int:
+        self.board[position[0]][position[1]] += 1
+        value: int = self.board[position[0]][position[1]]
+        if value >= 4:
+            self.next_autotick = True
+            self.four_pieces.append(position)
+        return value
+
+    def _spread(self) -> None:
+        current_four_pieces: List[Tuple[int, int]] = deepcopy(self.four_pieces)
+        for piece in current_four_pieces:
+            r, c = piece
+            self.board[r][c] = 0
+            self.four_pieces.remove(piece)
+            mover_pieces: List[Tuple[int, int]] = self.white_pieces if self.white_turn else self.black_pieces
+            if piece in mover_pieces:
+                mover_pieces.remove(piece)
+            for r_2, c_2 in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if (0 <= r_2 < self.rows) and (0 <= c_2 < self.coloumns):
+                    self._handle_spread_adding((r_2, c_2))
+
+    def _handle_spread_adding(self, position: Tuple[int, int]) -> None:
+        self._add_to(position=position)
+        gaining, losing = (self.white_pieces, self.black_pieces) if self.white_turn else (self.black_pieces, self.white_pieces)
+        if position in losing:
+            losing.remove(position)
+        if position not in gaining:
+            gaining.append(position)
+
+    def check_gameover(self) -> int:
+        if (self.white_pieces == [] and (not self.first_move_white)):
+            return 2
+        elif (self.black_pieces == [] and (not self.first_move_black)):
+            return 1
+        return 0
+
+    def owners(self) -> np.ndarray:
+        owners: np.ndarray = np.zeros((self.rows, self.coloumns), dtype=np.int8)
+        for owner, pieces in ((1, self.white_pieces), (2, self.black_pieces)):
+            for x, y in pieces:
+                owners[x, y] = owner
+        return owners
+
+    def next_tick_is_well_defined(self) -> bool:
+        """
+            The old loop only agrees with itself when the order it went through four_pieces in didn't matter:
+            no piece listed twice, no two exploding pieces next to each other (the first one's piece
+            would land on the second before it got zeroed) and no tile pushed to 4 or more twice in the tick
+            (it would get listed twice and explode twice next tick).
+        """
+        if len(set(self.four_pieces)) != len(self.four_pieces):
+            return False
+        incoming: np.ndarray = np.zeros((self.rows, self.coloumns), dtype=np.int64)
+        for r, c in self.four_pieces:
+            for r_2, c_2 in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if (0 <= r_2 < self.rows) and (0 <= c_2 < self.coloumns):
+                    if (r_2, c_2) in self.four_pieces:
+                        return False
+                    incoming[r_2, c_2] += 1
+        return bool((np.array(self.board) + incoming).max() <= 4)
+
+
+def _assert_same(old: TickByTickGameLogic, new: GameLogic) -> None:
+    assert np.array_equal(np.array(old.board), new.board)
+    assert np.array_equal(old.owners(), new.owners)
+    assert old.white_turn == new.white_turn
+    assert old.next_autotick == new.next_autotick
+    assert old.check_gameover() == new.check_gameover()
+
+
+@pytest.mark.parametrize('size', [(2, 2), (3, 3), (4, 6), (5, 5), (7, 7), (10, 10)])
+def test_waves_match_the_tick_by_tick_spread(size: Tuple[int, int]) -> None:
+    rows, coloumns = size
+    rng: np.random.Generator = np.random.default_rng([2, rows, coloumns])
+    compared_ticks: int = 0
+    for _ in range(50):
+        old: TickByTickGameLogic = TickByTickGameLogic(rows, coloumns)
+        new: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+        well_defined: bool = True
+        for _ in range(400):
+            legal: np.ndarray = np.flatnonzero([new.is_valid_move(divmod(tile, coloumns)) for tile in range(rows * coloumns)])
+            move: Tuple[int, int] = divmod(int(rng.choice(legal)), coloumns)
+            old._do_move(move)
+            new._do_move(move)
+            _assert_same(old, new)
+            while new.next_autotick and (new.check_gameover() == 0):
+                well_defined = old.next_tick_is_well_defined()
+                if not well_defined:
+                    break
+                old.tick()
+                new.autotick()
+                _assert_same(old, new)
+                compared_ticks += 1
+            if (not well_defined) or (new.check_gameover() != 0):
+                break
+    # Every size has to actually get some chain reactions compared
+    assert compared_ticks > 50
+
+
+def test_resolve_cascade_matches_autotick() -> None:
+    rng: np.random.Generator = np.random.default_rng(7)
+    for _ in range(30):
+        ticked: GameLogic = GameLogic(rows=6, coloumns=6)
+        resolved: GameLogic = GameLogic(rows=6, coloumns=6)
+        for _ in range(300):
+            legal: np.ndarray = np.flatnonzero([ticked.is_valid_move(divmod(tile, 6)) for tile in range(36)])
+            move: Tuple[int, int] = divmod(int(rng.choice(legal)), 6)
+            ticked._do_move(move)
+            ticks: int = 0
+            while ticked.next_autotick and (ticked.check_gameover() == 0):
+                ticked.autotick()
+                ticks += 1
+            winner, explosions = resolved.apply_move(move)
+            assert len(explosions) == ticks
+            assert np.array_equal(ticked.board, resolved.board) and np.array_equal(ticked.owners, resolved.owners)
+            assert ticked.white_turn == resolved.white_turn
+            if winner != 0:
+                break
+
+
+def test_every_tile_at_four_or_more_explodes_together_once_per_wave() -> None:
+    # Two pieces explode into the middle in the same wave and push it to 5,
+    # it explodes once in the next wave and the fifth piece is gone
+    board: str = """
+        3w 3w .
+        3w 3w .
+        .  .  1b
+    """
+    game: GameLogic = GameLogic(rows=3, coloumns=3, board=board)
+    winner, explosions = game.apply_move((0, 0))
+    assert winner == 0
+    assert explosions == [[(0, 0)], [(0, 1), (1, 0)], [(1, 1)]]
+    assert game.board.tolist() == [[2, 1, 1], [1, 0, 1], [1, 1, 1]]
+    assert game.owners.tolist() == [[1, 1, 1], [1, 0, 1], [1, 1, 2]]
+    assert not game.white_turn
+
+    # The old loop listed the middle tile twice and exploded it twice
+    old: TickByTickGameLogic = TickByTickGameLogic(3, 3)
+    old.board = [[3, 3, 0], [3, 3, 0], [0, 0, 1]]
+    old.white_pieces = [(0, 0), (0, 1), (1, 0), (1, 1)]
+    old.black_pieces = [(2, 2)]
+    old.first_move_white = old.first_move_black = False
+    old._do_move((0, 0))
+    old.tick()
+    assert not old.next_tick_is_well_defined()
@@ -0,0 +1,9 @@
+import pytest
+
+import tournament
+
+
+@pytest.mark.parametrize('option', ['--seed=-1', f'--seed={2**64}', '--game=-1', '--game=100', '--games=10 --game=10'])
+def test_bad_seeds_and_games_get_refused_while_parsing(option: str, capsys: pytest.CaptureFixture) -> None:
+    assert tournament.main(['tournament.py', *option.split()]) == 1
+    assert capsys.readouterr().err.startswith("[#] --")
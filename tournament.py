@@ -0,0 +1,293 @@
+#!/bin/python3.10
+
+from typing import List, Tuple, Dict, Callable, Iterator, TextIO
+from multiprocessing import Pool
+from time import perf_counter
+
+import json
+import sys
+import os
+
+from main import GameLogic, AIPlayer, SearchAIPlayer, MCTSPlayer, RandomPlayer, CascadeCache, Tablebase, OpeningBook, metrics
+from main import derive_seed, SEED_STREAM_WHITE, SEED_STREAM_BLACK, SEED_STREAM_OPENINGS
+from positions import PositionStore
+from game_records import GameRecord, GameRecordWriter
+
+
+# Runs a lot of headless games between two agents at full speed on every core
+# and writes one JSON line per game, so AI changes can be compared over a big number of games.
+#
+# Usage:
+#   python tournament.py --games=1000 --sizes=5x5,7x7 --white=ai --black=random --output=results.jsonl
+
+
+AGENTS: Dict[str, Callable[[int], AIPlayer | SearchAIPlayer | MCTSPlayer | RandomPlayer]] = {
+    'ai': lambda seed: AIPlayer(),
+    'search': lambda seed: SearchAIPlayer(time_budget=float('inf'), max_depth=2),
+    'mcts': lambda seed: MCTSPlayer(time_budget=float('inf'), playouts=512, seed=seed),
+    'random': lambda seed: RandomPlayer(seed),
+}
+# Every agent gets built from a seed, even if it doesn't use it
+# The search agents are limited by depth or playouts instead of time here so that games are reproducible
+
+GameTask = Tuple[int, int, int, int, str, str, int, int, float, str, bool, str, bool, str]
+# (game index, seed, rows, coloumns, white agent, black agent, random opening moves, max moves, cascade cache MB,
+#  position file or '' for none, whether to send back the moves for a game record file, tablebase file or '' for none,
+#  whether to collect metrics, opening book file or '' for none)
+
+_cascade_cache: CascadeCache | None = None
+# One per worker process, shared by every game it plays so repeated chain reactions across games get reused
+
+_position_stores: Dict[str, PositionStore] = {}
+# Every worker keeps its position files open between games
+
+_tablebases: Dict[str, Tablebase] = {}
+# Same for tablebases, they're memory-mapped so every worker shares the pages anyway
+
+_opening_books: Dict[str, OpeningBook] = {}
+# And opening books
+
+
+def play_game(task: GameTask) -> Dict:
+    """
+        Plays one whole game with no display and no pauses.
+        The seed is split into streams for the random opening moves and each agent, so the same task always plays the same game.
+    """
+    global _cascade_cache
+    (game_index, seed, rows, coloumns, white_name, black_name, opening_moves, max_moves, cache_mb, positions_path, record_moves,
+     tablebase_path, collect_metrics, book_path) = task
+    if collect_metrics:
+        metrics.enable()
+        metrics.reset()
+    players: Dict[bool, AIPlayer | SearchAIPlayer | MCTSPlayer | RandomPlayer] = {
+        True: AGENTS[white_name](derive_seed(seed, SEED_STREAM_WHITE)),
+        False: AGENTS[black_name](derive_seed(seed, SEED_STREAM_BLACK)),
+    }
+    opening_player: RandomPlayer = RandomPlayer(derive_seed(seed, SEED_STREAM_OPENINGS))
+    # Without some random opening moves two deterministic AIs would play the exact same game every time
+
+    game: GameLogic = GameLogic(rows=rows, coloumns=coloumns)
+    if cache_mb > 0:
+        if _cascade_cache is None:
+            _cascade_cache = CascadeCache(size_mb=cache_mb)
+        game.cascade_cache = _cascade_cache
+        cache_hits, cache_misses = _cascade_cache.hits, _cascade_cache.misses
+    store: PositionStore | None = None
+    if positions_path:
+        if positions_path not in _position_stores:
+            _position_stores[positions_path] = PositionStore(positions_path, rows, coloumns)
+        store = _position_stores[positions_path]
+    if tablebase_path:
+        if tablebase_path not in _tablebases:
+            _tablebases[tablebase_path] = Tablebase(tablebase_path)
+        for player in players.values():
+            if isinstance(player, AIPlayer) and _tablebases[tablebase_path].covers(game):
+                player.tablebase = _tablebases[tablebase_path]
+    if book_path:
+        if book_path not in _opening_books:
+            _opening_books[book_path] = OpeningBook(book_path)
+        for player in players.values():
+            if isinstance(player, AIPlayer) and _opening_books[book_path].covers(game):
+                player.opening_book = _opening_books[book_path]
+    players[True].attach_game(game, 1)
+    players[False].attach_game(game, 2)
+    cascades: List[int] = []
+    move_list: List[Tuple[int, int]] = []
+    mcts_playouts: int = 0
+    mcts_time: float = 0.0
+    moves: int = 0
+    winner: int = 0
+
+    start_time: float = perf_counter()
+    while (winner == 0) and (moves < max_moves):
+        white_turn: bool = game.get_white_turn()
+        if moves < opening_moves:
+            pieces: List[Tuple[int, int]] = game.get_whites() if white_turn else game.get_blacks()
+            move: Tuple[int, int] = opening_player.play_turn(current_game_board=game.get_board(), ai_pieces=pieces)
+        else:
+            turn_start: float = perf_counter()
+            move: Tuple[int, int] = players[white_turn].play_live_turn()
+            if isinstance(players[white_turn], MCTSPlayer):
+                mcts_playouts += players[white_turn].playouts
+                mcts_time += perf_counter() - turn_start
+        if store is not None:
+            store.add(game, move)
+        winner, explosions = game.apply_move(move)
+        moves += 1
+        if record_moves:
+            move_list.append(move)
+        if explosions:
+            cascades.append(len(explosions))
+    wall_time: float = perf_counter() - start_time
+    if store is not None:
+        store.end_game(winner)
+
+    result: Dict = {
+        'game': game_index,
+        'seed': seed,
+        'rows': rows,
+        'coloumns': coloumns,
+        'white': white_name,
+        'black': black_name,
+        'winner': winner,  # 0 if it hit max_moves, same numbers as check_gameover otherwise
+        'moves': moves,
+        'cascades': cascades,  # how many waves every chain reaction took
+        'wall_time': wall_time,
+    }
+    if cache_mb > 0:
+        result['cascade_cache_hits'] = _cascade_cache.hits - cache_hits
+        result['cascade_cache_misses'] = _cascade_cache.misses - cache_misses
+    if mcts_time > 0:
+        result['mcts_playouts_per_second'] = mcts_playouts / mcts_time
+    if collect_metrics:
+        result['metrics'] = metrics.to_dict()
+    if record_moves:
+        result['move_list'] = move_list  # Taken back out by run_tournament, it doesn't go in the JSON
+    return result
+
+
+def make_tasks(games: int, base_seed: int, sizes: List[Tuple[int, int]], white_name: str, black_name: str,
+               opening_moves: int, max_moves: int, cache_mb: float = 0.0, positions_path: str = '',
+               record_moves: bool = False, tablebase_path: str = '', collect_metrics: bool = False,
+               book_path: str = '', first_game: int = 0) -> Iterator[GameTask]:
+    # Board sizes are taken in turns so every size gets an even share of the games
+    # A position file only holds one board size, so with more than one the size goes in the file name
+    # Every game's seed only depends on base_seed and its index, so starting at first_game plays the same games as the full set
+    for game_index in range(first_game, games):
+        rows, coloumns = sizes[game_index % len(sizes)]
+        seed: int = derive_seed(base_seed, game_index)
+        size_path: str = positions_path
+        if positions_path and len(sizes) > 1:
+            stem, extension = os.path.splitext(positions_path)
+            size_path = f"{stem}.{rows}x{coloumns}{extension}"
+        yield (game_index, seed, rows, coloumns, white_name, black_name, opening_moves, max_moves, cache_mb, size_path,
+               record_moves, tablebase_path, collect_metrics, book_path)
+
+
+def run_tournament(tasks: Iterator[GameTask], workers: int, output: TextIO, chunksize: int = 16,
+                   records: GameRecordWriter | None = None) -> Dict[int, int]:
+    """
+        Plays every task on a pool of worker processes and writes the results as they come in.
+        Results come back in task order whatever the number of workers, so the same tasks always write the same output
+        (apart from wall_time and anything timed).
+        If the tasks send back their moves, records gets a GameRecord for every game.
+        Returns how many games ended with each check_gameover result.
+    """
+    outcomes: Dict[int, int] = {0: 0, 1: 0, 2: 0}
+    with Pool(processes=workers) as pool:
+        for result in pool.imap(play_game, tasks, chunksize=chunksize):
+            move_list: List[Tuple[int, int]] | None = result.pop('move_list', None)
+            if (records is not None) and (move_list is not None):
+                records.write(GameRecord(result['seed'], result['rows'], result['coloumns'], move_list))
+            output.write(json.dumps(result) + '\n')
+            outcomes[result['winner']] += 1
+    output.flush()
+    return outcomes
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    rows, coloumns = text.split('x')
+    return (int(rows), int(coloumns))
+
+
+def main(launch_args: List[str]) -> int:
+    games: int = 100
+    base_seed: int = 0
+    sizes: List[Tuple[int, int]] = [(5, 5)]
+    white_name: str = 'ai'
+    black_name: str = 'ai'
+    opening_moves: int = 2
+    max_moves: int = 10_000
+    workers: int = os.cpu_count() or 1
+    output_path: str = '-'
+    cache_mb: float = 0.0
+    positions_path: str = ''
+    records_path: str = ''
+    tablebase_path: str = ''
+    collect_metrics: bool = False
+    book_path: str = ''
+    replay_game: int | None = None
+
+    for string in launch_args[1:]:
+        string = string.strip()
+        key, _, value = string.partition('=')
+        key = key.lower()  # Only the option, the value could be a file path
+        try:
+            match key:
+                case '--games':
+                    games = int(value)
+                case '--seed':
+                    base_seed = int(value)
+                    if not (0 <= base_seed < 2**64):
+                        print("[#] --seed needs a whole number from 0 to 2^64 - 1, like --seed=12345", file=sys.stderr)
+                        return 1
+                case '--sizes':
+                    sizes = [_parse_size(size) for size in value.lower().split(',')]
+                case '--white':
+                    white_name = value.lower()
+                case '--black':
+                    black_name = value.lower()
+                case '--openings':
+                    opening_moves = int(value)
+                case '--max-moves':
+                    max_moves = int(value)
+                case '--workers':
+                    workers = int(value)
+                case '--output':
+                    output_path = value
+                case '--cascade-cache':
+                    cache_mb = float(value)
+                case '--positions':
+                    positions_path = value
+                case '--records':
+                    records_path = value
+                case '--tablebase':
+                    tablebase_path = value
+                case '--metrics':
+                    collect_metrics = True
+                case '--book':
+                    book_path = value
+                case '--game':
+                    # Plays only this game of the set again, like one a regression showed up in
+                    replay_game = int(value)
+                case _:
+                    print(f"[#] Unknown option {string}", file=sys.stderr)
+                    return 1
+        except ValueError:
+            print(f"[#] Bad value for {key}: '{value}'", file=sys.stderr)
+            return 1
+
+    first_game: int = 0
+    if (replay_game is not None) and not (0 <= replay_game < games):
+        print(f"[#] --game needs one of the games from 0 to {games - 1}, there are --games={games}", file=sys.stderr)
+        return 1
+    if replay_game is not None:
+        first_game, games = replay_game, replay_game + 1
+    for name in (white_name, black_name):
+        if name not in AGENTS:
+            print(f"[#] Unknown agent '{name}', pick one of: {', '.join(AGENTS)}", file=sys.stderr)
+            return 1
+
+    tasks: Iterator[GameTask] = make_tasks(games, base_seed, sizes, white_name, black_name, opening_moves, max_moves, cache_mb,
+                                          positions_path, records_path != '', tablebase_path, collect_metrics, book_path,
+                                          first_game)
+    records: GameRecordWriter | None = GameRecordWriter(records_path) if records_path else None
+    start_time: float = perf_counter()
+    try:
+        if output_path == '-':
+            outcomes: Dict[int, int] = run_tournament(tasks, workers, sys.stdout, records=records)
+        else:
+            with open(output_path, 'w') as output_file:
+                outcomes: Dict[int, int] = run_tournament(tasks, workers, output_file, records=records)
+    finally:
+        if records is not None:
+            records.close()
+    wall_time: float = perf_counter() - start_time
+
+    print(f"[#] {games - first_game} games in {wall_time:.2f}s ({(games - first_game) / wall_time:.1f} games/s on {workers} workers)", file=sys.stderr)
+    print(f"[#] White ({white_name}) won {outcomes[1]}, Black ({black_name}) won {outcomes[2]}, unfinished {outcomes[0]}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main(sys.argv))